@@ -0,0 +1,130 @@
+"""
+类型注解索引模块
+一次构建、增量维护的注解索引，按文件、函数、行号、参数名和泛型基类型查询，并预先汇总计数
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class AnnotationIndex:
+    """
+    注解索引
+    索引中保存的是 TypeAnnotationInfo 对象本身的引用，不复制注解数据
+    """
+
+    def __init__(self, annotations: Iterable = ()):
+        """
+        初始化索引
+
+        参数:
+            annotations: TypeAnnotationInfo 可迭代对象
+        """
+        self.by_file: Dict[str, List] = {}
+        self.by_function: Dict[Tuple[str, str], List] = {}
+        self.by_line: Dict[Tuple[str, int], List] = {}
+        self.by_param: Dict[str, List] = {}
+        self.by_generic: Dict[str, List] = {}
+        self.total = 0
+        self.return_count = 0
+        # 注解文本 -> 泛型基类型（None 表示非泛型），每种文本只解析一次
+        self._generic_cache: Dict[str, Optional[str]] = {}
+        for ann in annotations:
+            self.add(ann)
+
+    @property
+    def arg_count(self) -> int:
+        return self.total - self.return_count
+
+    def generic_base(self, annotation: str) -> Optional[str]:
+        """
+        获取注解的泛型基类型，如 "Dict[str, int]" -> "Dict"
+
+        参数:
+            annotation: 注解文本
+
+        返回:
+            基类型名称，非泛型返回 None
+        """
+        try:
+            return self._generic_cache[annotation]
+        except KeyError:
+            bracket = annotation.find("[")
+            base = annotation[:bracket] if bracket != -1 else None
+            self._generic_cache[annotation] = base
+            return base
+
+    def add(self, ann):
+        """加入一条注解记录"""
+        self.total += 1
+        if ann.arg_name == "return":
+            self.return_count += 1
+        self.by_file.setdefault(ann.file_path, []).append(ann)
+        self.by_function.setdefault((ann.file_path, ann.function_name), []).append(ann)
+        if ann.line_no:
+            self.by_line.setdefault((ann.file_path, ann.line_no), []).append(ann)
+        self.by_param.setdefault(ann.arg_name, []).append(ann)
+        base = self.generic_base(ann.annotation)
+        if base is not None:
+            self.by_generic.setdefault(base, []).append(ann)
+
+    def generic_counts(self) -> Dict[str, int]:
+        """泛型基类型使用次数（按首次出现顺序）"""
+        return {base: len(anns) for base, anns in self.by_generic.items()}
+
+    def query(
+        self,
+        file_path: Optional[str] = None,
+        function_name: Optional[str] = None,
+        arg_name: Optional[str] = None,
+        generic: Optional[str] = None,
+        line_no: Optional[int] = None,
+    ) -> List:
+        """
+        组合条件查询，从最小的候选集合开始过滤
+
+        参数:
+            file_path: 文件路径
+            function_name: 函数限定名（指定 file_path 时走 (文件, 函数) 索引）
+            arg_name: 参数名称（"return" 表示返回值注解）
+            generic: 泛型基类型
+            line_no: 行号（需与 file_path 一同指定，注解需带位置信息）
+
+        返回:
+            匹配的 TypeAnnotationInfo 列表
+        """
+        candidates = []
+        if file_path is not None and line_no is not None:
+            candidates.append(self.by_line.get((file_path, line_no), []))
+        if file_path is not None and function_name is not None:
+            candidates.append(self.by_function.get((file_path, function_name), []))
+        elif file_path is not None:
+            candidates.append(self.by_file.get(file_path, []))
+        if arg_name is not None:
+            candidates.append(self.by_param.get(arg_name, []))
+        if generic is not None:
+            candidates.append(self.by_generic.get(generic, []))
+
+        if not candidates:
+            candidates.append([ann for anns in self.by_file.values() for ann in anns])
+
+        base = min(candidates, key=len)
+        return [
+            ann
+            for ann in base
+            if (file_path is None or ann.file_path == file_path)
+            and (function_name is None or ann.function_name == function_name)
+            and (arg_name is None or ann.arg_name == arg_name)
+            and (generic is None or self.generic_base(ann.annotation) == generic)
+            and (line_no is None or ann.line_no == line_no)
+        ]
+
+    def stats(self) -> Dict[str, object]:
+        """预先汇总的计数"""
+        return {
+            "total": self.total,
+            "arg_annotations": self.arg_count,
+            "return_annotations": self.return_count,
+            "files": len(self.by_file),
+            "functions": len(self.by_function),
+            "generics": self.generic_counts(),
+        }
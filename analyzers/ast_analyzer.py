@@ -5,10 +5,16 @@ AST 静态分析器模块
 
 import ast
 import csv
+import os
+import sys
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
 from dataclasses import dataclass, field
 
+from analyzers.call_graph import MODULE_SCOPE, CallRecord, resolve_calls
+from utils.bounded_pool import QUARANTINE_STATUSES, BoundedWorkerPool, Quarantine, run_serial
+from utils.source_loader import SourceLoader
+
 
 @dataclass
 class FunctionInfo:
@@ -23,6 +29,18 @@ class FunctionInfo:
     complexity: int = 0
     is_async: bool = False
 
+    @property
+    def args_count(self) -> int:
+        return len(self.args)
+
+    @property
+    def docstring_len(self) -> int:
+        return len(self.docstring) if self.docstring else 0
+
+    @property
+    def decorators_count(self) -> int:
+        return len(self.decorators)
+
 
 @dataclass
 class ClassInfo:
@@ -35,45 +53,162 @@ class ClassInfo:
     methods: List[FunctionInfo] = field(default_factory=list)
     docstring: Optional[str] = None
 
+    @property
+    def docstring_len(self) -> int:
+        return len(self.docstring) if self.docstring else 0
+
+
+@dataclass
+class CompactFunctionInfo:
+    """紧凑函数信息：只保留导出所需的计数与长度，名称均已驻留"""
+
+    # 手写 __slots__ 以兼容 Python 3.9（dataclass(slots=True) 需要 3.10+）；字段因此不能有默认值
+    __slots__ = (
+        "name", "lineno", "end_lineno", "args_count", "decorators", "docstring_len", "complexity", "is_async",
+    )
+
+    name: str
+    lineno: int
+    end_lineno: int
+    args_count: int
+    decorators: Tuple[str, ...]
+    docstring_len: int
+    complexity: int
+    is_async: bool
+
+    @property
+    def decorators_count(self) -> int:
+        return len(self.decorators)
+
+
+@dataclass
+class CompactClassInfo:
+    """紧凑类信息"""
+
+    __slots__ = ("name", "lineno", "end_lineno", "bases", "docstring_len")
+
+    name: str
+    lineno: int
+    end_lineno: int
+    bases: Tuple[str, ...]
+    docstring_len: int
+
+
+AnyFunctionInfo = Union[FunctionInfo, CompactFunctionInfo]
+AnyClassInfo = Union[ClassInfo, CompactClassInfo]
+
 
 class CodeVisitor(ast.NodeVisitor):
-    """AST 代码访问器，提取函数和类信息"""
+    """AST 代码访问器，提取函数、类信息和调用关系"""
 
-    def __init__(self):
-        self.functions: List[FunctionInfo] = []
-        self.classes: List[ClassInfo] = []
+    def __init__(self, compact: bool = False):
+        self.compact = compact
+        self.functions: List[AnyFunctionInfo] = []
+        self.classes: List[AnyClassInfo] = []
         self.imports: List[str] = []
+        # 调用图：遍历时记录原始调用，遍历结束后由 resolved_calls 统一解析
+        self._scope: List[str] = []
+        self._class_scope: List[Optional[str]] = [None]
+        self._qualnames = set()
+        self._methods: Dict[str, set] = {}
+        self._aliases: Dict[str, str] = {}
+        self._raw_calls: List[Tuple[str, str, int, Optional[str]]] = []
+
+    def _name(self, value: str) -> str:
+        # 紧凑模式下驻留重复出现的名称，相同字符串只保留一份
+        return sys.intern(value) if self.compact else value
 
     def visit_Import(self, node: ast.Import):
         for alias in node.names:
-            self.imports.append(alias.name)
+            self.imports.append(self._name(alias.name))
+            if alias.asname:
+                self._aliases[alias.asname] = alias.name
+            else:
+                head = alias.name.split(".", 1)[0]
+                self._aliases[head] = head
         self.generic_visit(node)
 
     def visit_ImportFrom(self, node: ast.ImportFrom):
         module = node.module or ""
+        prefix = "." * node.level + (f"{module}." if module else "")
         for alias in node.names:
-            self.imports.append(f"{module}.{alias.name}")
+            self.imports.append(self._name(f"{module}.{alias.name}"))
+            if alias.name != "*":
+                self._aliases[alias.asname or alias.name] = prefix + alias.name
         self.generic_visit(node)
 
     def visit_FunctionDef(self, node: ast.FunctionDef):
         self._process_function(node, is_async=False)
-        self.generic_visit(node)
+        self._visit_scope(node, klass=None)
 
     def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):
         self._process_function(node, is_async=True)
+        self._visit_scope(node, klass=None)
+
+    def _visit_scope(self, node, klass: Optional[str]):
+        """在新的作用域中遍历函数或类的子节点"""
+        qualname = ".".join(self._scope + [node.name])
+        self._qualnames.add(qualname)
+        enclosing = self._class_scope[-1]
+        if klass is None and enclosing is not None and self._scope and ".".join(self._scope) == enclosing:
+            self._methods.setdefault(enclosing, set()).add(node.name)
+        self._scope.append(node.name)
+        self._class_scope.append(qualname if klass is not None else enclosing)
+        self.generic_visit(node)
+        self._class_scope.pop()
+        self._scope.pop()
+
+    def visit_Call(self, node: ast.Call):
+        expr = self._dotted_name(node.func)
+        if expr is not None:
+            caller = ".".join(self._scope) if self._scope else MODULE_SCOPE
+            self._raw_calls.append((caller, expr, node.lineno, self._class_scope[-1]))
         self.generic_visit(node)
 
+    def _dotted_name(self, node) -> Optional[str]:
+        parts = []
+        while isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        if not isinstance(node, ast.Name):
+            return None
+        parts.append(node.id)
+        return ".".join(reversed(parts))
+
+    def resolved_calls(self) -> List[CallRecord]:
+        """解析遍历中记录的调用（需在整棵树遍历完成后调用，此时文件内的全部定义已知）"""
+        records = resolve_calls(self._raw_calls, self._qualnames, self._methods, self._aliases)
+        if self.compact:
+            records = [(self._name(a), self._name(b), line, kind) for a, b, line, kind in records]
+        return records
+
     def _process_function(self, node, is_async=False):
         args = [a.arg for a in node.args.args]
         decorators = [self._get_decorator_name(d) for d in node.decorator_list]
         docstring = ast.get_docstring(node)
 
         complexity = self._calculate_complexity(node)
+        end_lineno = getattr(node, "end_lineno", node.lineno) or node.lineno
+
+        if self.compact:
+            self.functions.append(
+                CompactFunctionInfo(
+                    name=self._name(node.name),
+                    lineno=node.lineno,
+                    end_lineno=end_lineno,
+                    args_count=len(args),
+                    decorators=tuple(self._name(d) for d in decorators),
+                    docstring_len=len(docstring) if docstring else 0,
+                    complexity=complexity,
+                    is_async=is_async,
+                )
+            )
+            return
 
         func_info = FunctionInfo(
             name=node.name,
             lineno=node.lineno,
-            end_lineno=getattr(node, "end_lineno", node.lineno) or node.lineno,
+            end_lineno=end_lineno,
             args=args,
             decorators=decorators,
             docstring=docstring,
@@ -117,16 +252,26 @@ class CodeVisitor(ast.NodeVisitor):
     def visit_ClassDef(self, node: ast.ClassDef):
         bases = [self._get_base_name(b) for b in node.bases]
         docstring = ast.get_docstring(node)
-
-        class_info = ClassInfo(
-            name=node.name,
-            lineno=node.lineno,
-            end_lineno=getattr(node, "end_lineno", node.lineno) or node.lineno,
-            bases=bases,
-            docstring=docstring,
-        )
+        end_lineno = getattr(node, "end_lineno", node.lineno) or node.lineno
+
+        if self.compact:
+            class_info = CompactClassInfo(
+                name=self._name(node.name),
+                lineno=node.lineno,
+                end_lineno=end_lineno,
+                bases=tuple(self._name(b) for b in bases),
+                docstring_len=len(docstring) if docstring else 0,
+            )
+        else:
+            class_info = ClassInfo(
+                name=node.name,
+                lineno=node.lineno,
+                end_lineno=end_lineno,
+                bases=bases,
+                docstring=docstring,
+            )
         self.classes.append(class_info)
-        self.generic_visit(node)
+        self._visit_scope(node, klass=node.name)
 
     def _get_base_name(self, node):
         if isinstance(node, ast.Name):
@@ -137,38 +282,208 @@ class CodeVisitor(ast.NodeVisitor):
 
 
 class ASTAnalyzer:
-    """AST 静态分析器"""
+    """AST 静态分析器
+
+    compact=True 时使用紧凑记录：不保留文档字符串正文和参数列表，
+    只存长度与计数，适合分析超大规模代码库。
+    columnar=True 时 get_results 和 export_to_csv 从列式结果表读取。
+    通过 add_sink 注册的流式写入器会在每个文件分析完成后立即收到该文件的记录。
+    """
 
-    def __init__(self, repo_path: str):
+    CSV_HEADERS = ["name", "type", "lineno", "args_count", "complexity", "docstring_len", "decorators_count"]
+    STREAM_HEADERS = ["file"] + CSV_HEADERS
+
+    def __init__(self, repo_path: str, compact: bool = False, columnar: bool = False):
         self.repo_path = Path(repo_path)
-        self.functions: List[FunctionInfo] = []
-        self.classes: List[ClassInfo] = []
+        self.compact = compact
+        self.columnar = columnar
+        self.functions: List[AnyFunctionInfo] = []
+        self.classes: List[AnyClassInfo] = []
         self.imports: List[str] = []
+        # 与 functions/classes 一一对应的相对文件路径
+        self.function_files: List[str] = []
+        self.class_files: List[str] = []
+        # 调用图：[(相对文件路径, 调用记录列表)]
+        self.calls: List[Tuple[str, List[CallRecord]]] = []
+        self._table = None
+        self._call_table = None
+        self.loader = SourceLoader()
+        self.sinks = []
+
+    @property
+    def skipped_files(self):
+        return self.loader.skipped
 
     def parse_file(self, file_path: Path) -> Optional[ast.AST]:
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-            return ast.parse(content)
-        except Exception:
-            return None
+        return self.loader.parse_ast(file_path)
 
     def analyze_file(self, file_path: Path):
+        result = self._collect_file(file_path)
+        if result is not None:
+            self._record_file(file_path, *result)
+
+    def _collect_file(self, file_path: Path):
+        """解析并遍历单个文件，返回 (函数, 类, 导入)，不修改分析器状态"""
         tree = self.parse_file(file_path)
         if not tree:
-            return
+            return None
 
-        visitor = CodeVisitor()
+        visitor = CodeVisitor(compact=self.compact)
         visitor.visit(tree)
-        self.functions.extend(visitor.functions)
-        self.classes.extend(visitor.classes)
-        self.imports.extend(visitor.imports)
+        return visitor.functions, visitor.classes, visitor.imports, visitor.resolved_calls()
+
+    def _record_file(self, file_path: Path, functions, classes, imports, calls=()):
+        relative = sys.intern(self._relative_path(file_path))
+        self.functions.extend(functions)
+        self.classes.extend(classes)
+        self.imports.extend(imports)
+        self.function_files.extend([relative] * len(functions))
+        self.class_files.extend([relative] * len(classes))
+        if calls:
+            self.calls.append((relative, calls))
+        self._table = None
+        self._call_table = None
+        if self.sinks:
+            self._stream_rows(relative, functions, classes)
+
+    def analyze_files(
+        self,
+        file_paths: Sequence[Path],
+        workers: Optional[int] = None,
+        chunksize: int = 8,
+        time_limit: Optional[float] = None,
+        memory_limit: Optional[int] = None,
+        quarantine: Optional[Quarantine] = None,
+    ):
+        """
+        批量分析文件，workers > 1 时使用资源受限的进程池并行解析，结果按输入顺序合并
+
+        参数:
+            file_paths: 文件路径列表
+            workers: 进程数，默认使用 CPU 核数；1 表示在当前进程串行（只在主线程中施加时间上限）
+            chunksize: 每次分派给工作进程的文件数
+            time_limit: 单个文件的时间上限（秒）
+            memory_limit: 单个工作进程的内存上限（字节）
+            quarantine: 隔离清单，超限文件写入其中，已隔离的文件直接跳过
+        """
+        if quarantine is not None:
+            file_paths, quarantined = quarantine.partition(file_paths)
+            for file_path, reason in quarantined:
+                self.loader.skip(file_path, f"已隔离: {reason}")
+
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1 or len(file_paths) < 2:
+            # 只有解析在计时器下执行，记录结果时计时器已取消
+            for outcome in run_serial(self._collect_file, file_paths, time_limit=time_limit):
+                if outcome.status != "ok":
+                    self.loader.skip(outcome.item, outcome.error)
+                    if quarantine is not None and outcome.status in QUARANTINE_STATUSES:
+                        quarantine.add(outcome.item, outcome.error)
+                elif outcome.result is not None:
+                    self._record_file(outcome.item, *outcome.result)
+            return
+
+        pool = BoundedWorkerPool(
+            _analyze_in_worker,
+            workers=workers,
+            time_limit=time_limit,
+            memory_limit=memory_limit,
+            initializer=_init_worker,
+            initargs=(str(self.repo_path), self.compact),
+        )
+        for outcome in pool.map([str(p) for p in file_paths], chunksize=chunksize):
+            if outcome.status != "ok":
+                self.loader.skip(outcome.item, outcome.error)
+                if quarantine is not None and outcome.status in QUARANTINE_STATUSES:
+                    quarantine.add(outcome.item, outcome.error)
+                continue
+            file_path, result, skipped = outcome.result
+            self.loader.skipped.extend(skipped)
+            if result is not None:
+                self._record_file(Path(file_path), *result)
+
+    def add_sink(self, sink):
+        """
+        注册流式写入器（如 utils.streaming 中的 CSV/JSONL 写入器）
+
+        参数:
+            sink: 具有 write_row(dict) 和 flush() 方法的对象，列名见 STREAM_HEADERS
+        """
+        self.sinks.append(sink)
+
+    def _stream_rows(self, relative: str, functions, classes):
+        rows = [self._function_row(f) for f in functions]
+        rows.extend(self._class_row(c) for c in classes)
+        for sink in self.sinks:
+            for row in rows:
+                sink.write_row(dict(zip(self.STREAM_HEADERS, [relative] + row)))
+            sink.flush()
+
+    @staticmethod
+    def _function_row(func: AnyFunctionInfo) -> List[Any]:
+        return [
+            func.name,
+            "async_function" if func.is_async else "function",
+            func.lineno,
+            func.args_count,
+            func.complexity,
+            func.docstring_len,
+            func.decorators_count,
+        ]
+
+    @staticmethod
+    def _class_row(cls: AnyClassInfo) -> List[Any]:
+        return [cls.name, "class", cls.lineno, 0, 0, cls.docstring_len, 0]
+
+    def _relative_path(self, file_path: Path) -> str:
+        try:
+            return str(Path(file_path).relative_to(self.repo_path)).replace("\\", "/")
+        except ValueError:
+            return str(file_path).replace("\\", "/")
+
+    def to_table(self):
+        """
+        构建（并缓存）列式结果表
+
+        返回:
+            ASTResultTable 实例
+        """
+        if self._table is None:
+            from analyzers.ast_table import ASTResultTable
+
+            self._table = ASTResultTable.from_records(
+                self.functions, self.classes, self.function_files, self.class_files
+            )
+        return self._table
+
+    def call_table(self):
+        """
+        构建（并缓存）调用边表
+
+        返回:
+            CallGraphTable 实例
+        """
+        if self._call_table is None:
+            from analyzers.call_graph import CallGraphTable
+
+            self._call_table = CallGraphTable.from_records(self.calls)
+        return self._call_table
 
     def get_results(self) -> Dict[str, Any]:
+        if self.columnar:
+            table = self.to_table()
+            return {
+                "functions_count": table.functions_count,
+                "classes_count": table.classes_count,
+                "imports_count": len(self.imports),
+                "calls_count": sum(len(calls) for _, calls in self.calls),
+                "avg_complexity": table.mean_complexity(),
+            }
         return {
             "functions_count": len(self.functions),
             "classes_count": len(self.classes),
             "imports_count": len(self.imports),
+            "calls_count": sum(len(calls) for _, calls in self.calls),
             "avg_complexity": sum(f.complexity for f in self.functions)
             / len(self.functions)
             if self.functions
@@ -176,35 +491,29 @@ class ASTAnalyzer:
         }
 
     def export_to_csv(self, output_file: str):
-        headers = ["name", "type", "lineno", "args_count", "complexity", "docstring_len", "decorators_count"]
-
         with open(output_file, "w", newline="", encoding="utf-8") as f:
             writer = csv.writer(f)
-            writer.writerow(headers)
-
-            for func in self.functions:
-                writer.writerow(
-                    [
-                        func.name,
-                        "async_function" if func.is_async else "function",
-                        func.lineno,
-                        len(func.args),
-                        func.complexity,
-                        len(func.docstring) if func.docstring else 0,
-                        len(func.decorators),
-                    ]
-                )
+            writer.writerow(self.CSV_HEADERS)
+
+            if self.columnar:
+                writer.writerows(self.to_table().iter_rows())
+                return
+
+            writer.writerows(self._function_row(func) for func in self.functions)
+            writer.writerows(self._class_row(cls) for cls in self.classes)
+
+
+_worker_analyzer: Optional[ASTAnalyzer] = None
+
+
+def _init_worker(repo_path: str, compact: bool = False):
+    global _worker_analyzer
+    _worker_analyzer = ASTAnalyzer(repo_path, compact=compact)
 
-            for cls in self.classes:
-                writer.writerow(
-                    [
-                        cls.name,
-                        "class",
-                        cls.lineno,
-                        0,
-                        0,
-                        len(cls.docstring) if cls.docstring else 0,
-                        0,
-                    ]
-                )
 
+def _analyze_in_worker(file_path: str):
+    """在工作进程中分析单个文件，返回可序列化的结果"""
+    analyzer = _worker_analyzer
+    analyzer.loader.skipped = []
+    result = analyzer._collect_file(Path(file_path))
+    return file_path, result, analyzer.loader.skipped
@@ -0,0 +1,214 @@
+"""
+AST 列式结果表模块
+以 NumPy 列存储函数/类记录，聚合查询（均值、分位数、TOP-K、按文件汇总）全部向量化
+"""
+
+from typing import List, Dict, Any, Iterable, Iterator, Sequence, Tuple
+
+import numpy as np
+
+# 记录类型编码，与 ASTAnalyzer.export_to_csv 的 type 列一致
+KINDS: Tuple[str, ...] = ("function", "async_function", "class")
+KIND_FUNCTION = 0
+KIND_ASYNC_FUNCTION = 1
+KIND_CLASS = 2
+
+
+class ASTResultTable:
+    """
+    AST 分析结果列式表
+    每一行对应一个函数或类，数值列为 int32 数组，文件和类型为分类编码
+    """
+
+    NUMERIC_COLUMNS = (
+        "lineno",
+        "end_lineno",
+        "complexity",
+        "args_count",
+        "docstring_len",
+        "decorators_count",
+    )
+
+    def __init__(
+        self,
+        names: List[str],
+        files: List[str],
+        file_codes: np.ndarray,
+        kind_codes: np.ndarray,
+        columns: Dict[str, np.ndarray],
+    ):
+        self.names = names
+        self.files = files
+        self.file_codes = file_codes
+        self.kind_codes = kind_codes
+        self.lineno = columns["lineno"]
+        self.end_lineno = columns["end_lineno"]
+        self.complexity = columns["complexity"]
+        self.args_count = columns["args_count"]
+        self.docstring_len = columns["docstring_len"]
+        self.decorators_count = columns["decorators_count"]
+
+    @classmethod
+    def from_records(
+        cls,
+        functions: Sequence[Any],
+        classes: Sequence[Any],
+        function_files: Sequence[str] = (),
+        class_files: Sequence[str] = (),
+    ) -> "ASTResultTable":
+        """
+        从函数/类记录构建列式表（行顺序：先函数后类）
+
+        参数:
+            functions: FunctionInfo 或 CompactFunctionInfo 列表
+            classes: ClassInfo 或 CompactClassInfo 列表
+            function_files: 与 functions 等长的文件路径（可选）
+            class_files: 与 classes 等长的文件路径（可选）
+        """
+        n_funcs = len(functions)
+        n = n_funcs + len(classes)
+        columns = {name: np.zeros(n, dtype=np.int32) for name in cls.NUMERIC_COLUMNS}
+        kind_codes = np.empty(n, dtype=np.int8)
+        names: List[str] = []
+
+        for i, func in enumerate(functions):
+            names.append(func.name)
+            kind_codes[i] = KIND_ASYNC_FUNCTION if func.is_async else KIND_FUNCTION
+            columns["lineno"][i] = func.lineno
+            columns["end_lineno"][i] = func.end_lineno
+            columns["complexity"][i] = func.complexity
+            columns["args_count"][i] = func.args_count
+            columns["docstring_len"][i] = func.docstring_len
+            columns["decorators_count"][i] = func.decorators_count
+
+        for j, klass in enumerate(classes, start=n_funcs):
+            names.append(klass.name)
+            kind_codes[j] = KIND_CLASS
+            columns["lineno"][j] = klass.lineno
+            columns["end_lineno"][j] = klass.end_lineno
+            columns["docstring_len"][j] = klass.docstring_len
+
+        files, file_codes = cls._encode_files(
+            list(function_files) or [""] * n_funcs,
+            list(class_files) or [""] * len(classes),
+        )
+        return cls(names, files, file_codes, kind_codes, columns)
+
+    @staticmethod
+    def _encode_files(
+        function_files: List[str], class_files: List[str]
+    ) -> Tuple[List[str], np.ndarray]:
+        lookup: Dict[str, int] = {}
+        files: List[str] = []
+        codes = np.empty(len(function_files) + len(class_files), dtype=np.int32)
+        for i, path in enumerate(function_files + class_files):
+            code = lookup.get(path)
+            if code is None:
+                code = lookup[path] = len(files)
+                files.append(path)
+            codes[i] = code
+        return files, codes
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def function_mask(self) -> np.ndarray:
+        return self.kind_codes != KIND_CLASS
+
+    @property
+    def functions_count(self) -> int:
+        return int(np.count_nonzero(self.function_mask))
+
+    @property
+    def classes_count(self) -> int:
+        return len(self) - self.functions_count
+
+    def function_complexities(self) -> np.ndarray:
+        """返回所有函数的复杂度数组"""
+        return self.complexity[self.function_mask]
+
+    def mean_complexity(self) -> float:
+        values = self.function_complexities()
+        return float(values.mean()) if values.size else 0
+
+    def percentile(self, q: Any) -> Any:
+        """
+        计算函数复杂度分位数
+
+        参数:
+            q: 分位数（0-100），可以是单个值或序列
+        """
+        values = self.function_complexities()
+        if not values.size:
+            return 0.0 if np.isscalar(q) else [0.0] * len(q)
+        result = np.percentile(values, q)
+        return float(result) if np.isscalar(q) else result.tolist()
+
+    def top_k(self, k: int = 10) -> List[Dict[str, Any]]:
+        """
+        按复杂度降序返回前 k 个函数（复杂度相同时保持原有顺序）
+
+        返回:
+            包含 name、complexity、lineno、file 的字典列表
+        """
+        indices = np.flatnonzero(self.function_mask)
+        if not indices.size or k <= 0:
+            return []
+        order = np.argsort(-self.complexity[indices], kind="stable")[:k]
+        return [self._row_dict(i) for i in indices[order]]
+
+    def per_file(self) -> Dict[str, Dict[str, Any]]:
+        """
+        按文件汇总函数数量与复杂度
+
+        返回:
+            文件路径 -> {functions, classes, total_complexity, mean_complexity, max_complexity}
+        """
+        n_files = len(self.files)
+        mask = self.function_mask
+        codes = self.file_codes
+        func_counts = np.bincount(codes[mask], minlength=n_files)
+        class_counts = np.bincount(codes[~mask], minlength=n_files)
+        totals = np.bincount(codes[mask], weights=self.complexity[mask], minlength=n_files)
+        maxima = np.zeros(n_files, dtype=np.int32)
+        np.maximum.at(maxima, codes[mask], self.complexity[mask])
+
+        rollup = {}
+        for code, path in enumerate(self.files):
+            count = int(func_counts[code])
+            rollup[path] = {
+                "functions": count,
+                "classes": int(class_counts[code]),
+                "total_complexity": int(totals[code]),
+                "mean_complexity": float(totals[code] / count) if count else 0,
+                "max_complexity": int(maxima[code]),
+            }
+        return rollup
+
+    def iter_rows(self) -> Iterator[List[Any]]:
+        """按 ast_analysis.csv 的列顺序逐行输出"""
+        columns = (
+            self.lineno.tolist(),
+            self.args_count.tolist(),
+            self.complexity.tolist(),
+            self.docstring_len.tolist(),
+            self.decorators_count.tolist(),
+        )
+        kinds = self.kind_codes.tolist()
+        for i, name in enumerate(self.names):
+            lineno, args_count, complexity, doc_len, deco_count = (c[i] for c in columns)
+            yield [name, KINDS[kinds[i]], lineno, args_count, complexity, doc_len, deco_count]
+
+    def to_dicts(self, rows: Iterable[int] = None) -> List[Dict[str, Any]]:
+        """转换为 complexity_data 风格的字典列表（默认仅函数）"""
+        indices = np.flatnonzero(self.function_mask) if rows is None else rows
+        return [self._row_dict(i) for i in indices]
+
+    def _row_dict(self, i: int) -> Dict[str, Any]:
+        return {
+            "name": self.names[i],
+            "complexity": int(self.complexity[i]),
+            "lineno": int(self.lineno[i]),
+            "file": self.files[self.file_codes[i]],
+        }
@@ -0,0 +1,127 @@
+"""
+基于标准库 ast 的类型注解收集器
+与 LibCST 的 TypeCollector 产出相同的覆盖率统计和注解字符串（经 ast.unparse 规范化），
+用于类型覆盖率统计的快速路径
+
+注意：ast.unparse 会规范化格式（字符串注解统一为单引号、去除多余空白和注释），
+需要保留源码原样时请使用 LibCST 后端
+"""
+
+import ast
+from typing import Dict, List
+
+
+class AstTypeCollector(ast.NodeVisitor):
+    """
+    类型注解收集器（ast 版本）
+    统计口径与 TypeCollector 保持一致：
+    - total_params / annotated_params 只统计普通位置参数（不含仅位置、仅关键字、*args、**kwargs）
+    - 注解记录包含全部参数，顺序为 返回值、仅位置、普通、*args、仅关键字、**kwargs
+    - 函数以限定名（外层类/函数名加点号前缀）记录
+    """
+
+    def __init__(self, file_path: str, positions: bool = False):
+        """初始化收集器"""
+        from analyzers.libcst_analyzer import TypeAnnotationInfo
+
+        self._info_cls = TypeAnnotationInfo
+        self.file_path = file_path
+        self.positions = positions
+        self.annotations: List[TypeAnnotationInfo] = []
+        self.total_functions = 0
+        self.annotated_functions = 0
+        self.total_params = 0
+        self.annotated_params = 0
+        self.return_annotated = 0
+        self.function_stats: Dict[str, Dict[str, int]] = {}
+        self._scope: List[str] = []
+
+    @property
+    def coverage_stats(self) -> Dict[str, int]:
+        """获取覆盖率统计"""
+        return {
+            "total_functions": self.total_functions,
+            "annotated_functions": self.annotated_functions,
+            "total_params": self.total_params,
+            "annotated_params": self.annotated_params,
+            "return_annotated": self.return_annotated,
+        }
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self._scope.append(node.name)
+        self.generic_visit(node)
+        self._scope.pop()
+
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        """访问函数定义节点"""
+        self._process_function(node)
+        self._scope.append(node.name)
+        self.generic_visit(node)
+        self._scope.pop()
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):
+        """访问异步函数定义节点"""
+        self.visit_FunctionDef(node)
+
+    def _process_function(self, node):
+        self.total_functions += 1
+        has_annotation = False
+        args = node.args
+        qualname = ".".join(self._scope + [node.name])
+        stats = self.function_stats.get(qualname)
+        if stats is None:
+            stats = self.function_stats[qualname] = {
+                "lineno": self._line_for(node),
+                "total_params": 0,
+                "annotated_params": 0,
+                "return_annotated": 0,
+            }
+
+        # 检查返回值注解
+        if node.returns is not None:
+            self._add_annotation("return", node.returns, qualname)
+            self.return_annotated += 1
+            stats["return_annotated"] += 1
+            has_annotation = True
+
+        # 检查参数注解（与 LibCST 的 params.params 对应）
+        for arg in args.args:
+            self.total_params += 1
+            stats["total_params"] += 1
+            if arg.annotation is not None:
+                self.annotated_params += 1
+                stats["annotated_params"] += 1
+                has_annotation = True
+
+        if has_annotation:
+            self.annotated_functions += 1
+
+        for arg in self._iter_params(args):
+            if arg.annotation is not None:
+                self._add_annotation(arg.arg, arg.annotation, qualname)
+
+    @staticmethod
+    def _iter_params(args: ast.arguments):
+        yield from args.posonlyargs
+        yield from args.args
+        if args.vararg is not None:
+            yield args.vararg
+        yield from args.kwonlyargs
+        if args.kwarg is not None:
+            yield args.kwarg
+
+    def _add_annotation(self, arg_name: str, annotation_node: ast.expr, func_name: str):
+        """添加注解记录"""
+        self.annotations.append(
+            self._info_cls(
+                file_path=self.file_path,
+                function_name=func_name,
+                arg_name=arg_name,
+                annotation=ast.unparse(annotation_node),
+                line_no=self._line_for(annotation_node),
+            )
+        )
+
+    def _line_for(self, node: ast.AST) -> int:
+        """节点起始行号；未请求位置信息时为 0（与 LibCST 后端一致）"""
+        return node.lineno if self.positions else 0
@@ -0,0 +1,222 @@
+"""
+调用图模块
+CodeVisitor 在同一次 AST 遍历中记录 调用方 -> 被调用方 的原始调用，本模块负责名称解析，
+并把全部调用边保存为列式边表（符号表 + int32 列），供 Sankey 图和依赖图使用
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+import builtins
+import csv
+
+import numpy as np
+
+# 调用类型编码
+CALL_KINDS: Tuple[str, ...] = ("local", "method", "import", "builtin", "unresolved")
+KIND_LOCAL, KIND_METHOD, KIND_IMPORT, KIND_BUILTIN, KIND_UNRESOLVED = range(len(CALL_KINDS))
+
+MODULE_SCOPE = "<module>"
+_BUILTINS = frozenset(dir(builtins))
+
+# 单个文件的调用记录：(调用方限定名, 被调用方, 行号, 类型编码)
+CallRecord = Tuple[str, str, int, int]
+
+
+def qualify(path: str, name: str) -> str:
+    """文件内定义的符号加上文件路径前缀（如 pkg/a.py::main），避免不同文件的同名函数合并"""
+    return f"{path}::{name}"
+
+
+def resolve_calls(
+    raw_calls: Iterable[Tuple[str, str, int, Optional[str]]],
+    qualnames: Set[str],
+    methods: Dict[str, Set[str]],
+    aliases: Dict[str, str],
+) -> List[CallRecord]:
+    """
+    解析单个文件的原始调用
+
+    - 嵌套作用域中定义的函数/类按从内到外的顺序匹配（local）
+    - self./cls. 调用匹配所在类中定义的方法（method）
+    - 通过导入别名调用的展开为完整的导入路径，相对导入保留前导点（import）
+    - 内置函数（builtin）；其余无法静态确定的调用保留原始文本（unresolved）
+
+    参数:
+        raw_calls: (调用方限定名, 调用表达式文本, 行号, 所在类的限定名)
+        qualnames: 文件中定义的函数和类的限定名
+        methods: 类限定名 -> 方法名集合
+        aliases: 导入绑定的名称 -> 导入路径
+
+    返回:
+        调用记录列表
+    """
+    records: List[CallRecord] = []
+    for caller, expr, lineno, klass in raw_calls:
+        head, _, rest = expr.partition(".")
+        if head in ("self", "cls") and klass is not None and rest:
+            method = rest.split(".", 1)[0]
+            if "." not in rest and method in methods.get(klass, ()):
+                records.append((caller, f"{klass}.{method}", lineno, KIND_METHOD))
+            else:
+                records.append((caller, expr, lineno, KIND_UNRESOLVED))
+            continue
+
+        target = _resolve_local(caller, head, qualnames)
+        if target is not None:
+            records.append((caller, f"{target}.{rest}" if rest else target, lineno, KIND_LOCAL))
+        elif head in aliases:
+            module = aliases[head]
+            records.append((caller, f"{module}.{rest}" if rest else module, lineno, KIND_IMPORT))
+        elif head in _BUILTINS:
+            records.append((caller, expr, lineno, KIND_BUILTIN))
+        else:
+            records.append((caller, expr, lineno, KIND_UNRESOLVED))
+    return records
+
+
+def _resolve_local(caller: str, name: str, qualnames: Set[str]) -> Optional[str]:
+    scope = [] if caller == MODULE_SCOPE else caller.split(".")
+    for depth in range(len(scope), -1, -1):
+        candidate = ".".join(scope[:depth] + [name])
+        if candidate in qualnames:
+            return candidate
+    return None
+
+
+class CallGraphTable:
+    """
+    调用边表
+    调用方和被调用方编码为符号表下标，文件为分类编码，行号和类型为定长数组；
+    调用方以及 local/method 调用的被调用方以 "文件路径::限定名" 驻留，导入、内置和未解析的调用保留原文
+    """
+
+    CSV_HEADERS = ["file", "caller", "callee", "lineno", "kind"]
+
+    def __init__(
+        self,
+        symbols: List[str],
+        files: List[str],
+        caller: np.ndarray,
+        callee: np.ndarray,
+        file_codes: np.ndarray,
+        lineno: np.ndarray,
+        kind: np.ndarray,
+    ):
+        self.symbols = symbols
+        self.files = files
+        self.caller = caller
+        self.callee = callee
+        self.file_codes = file_codes
+        self.lineno = lineno
+        self.kind = kind
+
+    @classmethod
+    def from_records(cls, per_file: Sequence[Tuple[str, Sequence[CallRecord]]]) -> "CallGraphTable":
+        """
+        由逐文件的调用记录构建边表
+
+        参数:
+            per_file: [(相对文件路径, 调用记录列表)]
+        """
+        n = sum(len(records) for _, records in per_file)
+        caller = np.empty(n, dtype=np.int32)
+        callee = np.empty(n, dtype=np.int32)
+        file_codes = np.empty(n, dtype=np.int32)
+        lineno = np.empty(n, dtype=np.int32)
+        kind = np.empty(n, dtype=np.int8)
+
+        symbol_ids: Dict[str, int] = {}
+        symbols: List[str] = []
+        file_ids: Dict[str, int] = {}
+        files: List[str] = []
+
+        def intern(value: str) -> int:
+            code = symbol_ids.get(value)
+            if code is None:
+                code = symbol_ids[value] = len(symbols)
+                symbols.append(value)
+            return code
+
+        i = 0
+        for path, records in per_file:
+            if not records:
+                continue
+            code = file_ids.get(path)
+            if code is None:
+                code = file_ids[path] = len(files)
+                files.append(path)
+            for source, target, line, call_kind in records:
+                caller[i] = intern(qualify(path, source))
+                callee[i] = intern(
+                    qualify(path, target) if call_kind in (KIND_LOCAL, KIND_METHOD) else target
+                )
+                file_codes[i] = code
+                lineno[i] = line
+                kind[i] = call_kind
+                i += 1
+        return cls(symbols, files, caller, callee, file_codes, lineno, kind)
+
+    def __len__(self) -> int:
+        return len(self.caller)
+
+    def kind_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.kind, minlength=len(CALL_KINDS)) if len(self) else [0] * len(CALL_KINDS)
+        return {name: int(count) for name, count in zip(CALL_KINDS, counts)}
+
+    def iter_rows(self) -> Iterator[List[Any]]:
+        """按 CSV_HEADERS 的列顺序逐行产出"""
+        symbols, files = self.symbols, self.files
+        for f, a, b, line, k in zip(
+            self.file_codes.tolist(), self.caller.tolist(), self.callee.tolist(),
+            self.lineno.tolist(), self.kind.tolist(),
+        ):
+            yield [files[f], symbols[a], symbols[b], line, CALL_KINDS[k]]
+
+    def export_csv(self, output_file: str):
+        with open(output_file, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(self.CSV_HEADERS)
+            writer.writerows(self.iter_rows())
+
+    def _mask(self, kinds: Iterable[str]) -> np.ndarray:
+        codes = [CALL_KINDS.index(k) for k in kinds]
+        return np.isin(self.kind, codes)
+
+    def call_chains(self, limit: Optional[int] = 30,
+                    kinds: Sequence[str] = ("local", "method", "import")) -> List[Dict[str, Any]]:
+        """
+        按 (调用方, 被调用方) 聚合的调用次数，供 InteractiveCharts.create_sankey_diagram 使用；
+        递归调用（自环）不计入
+
+        参数:
+            limit: 只保留调用次数最多的前 N 条，None 表示全部
+            kinds: 参与统计的调用类型
+
+        返回:
+            [{"source": ..., "target": ..., "value": ...}]，按次数降序
+        """
+        mask = self._mask(kinds) & (self.caller != self.callee)
+        if not mask.any():
+            return []
+        pairs = np.stack((self.caller[mask], self.callee[mask]), axis=1)
+        unique, counts = np.unique(pairs, axis=0, return_counts=True)
+        order = np.argsort(-counts, kind="stable")
+        if limit is not None:
+            order = order[:limit]
+        return [
+            {
+                "source": self.symbols[unique[i, 0]],
+                "target": self.symbols[unique[i, 1]],
+                "value": int(counts[i]),
+            }
+            for i in order
+        ]
+
+    def file_targets(self) -> Iterator[Tuple[str, str, str]]:
+        """
+        去重后的 (调用所在文件, 被调用方, 类型)，用于把调用折叠到文件级依赖图
+        """
+        if not len(self):
+            return
+        keys = np.stack((self.file_codes, self.callee, self.kind.astype(np.int32)), axis=1)
+        for f, target, k in np.unique(keys, axis=0).tolist():
+            yield self.files[f], self.symbols[target], CALL_KINDS[k]
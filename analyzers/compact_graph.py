@@ -0,0 +1,310 @@
+"""
+紧凑图模块
+节点名称驻留为连续整数 ID，出边保存为每个节点一段 int32 数组，查询时按需构建 CSR（indptr/indices）；
+度统计向量化，可达性查询按层批量扩展，强连通分量使用迭代 Tarjan 算法
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+from array import array
+
+import numpy as np
+
+# 节点类型编码
+NODE_TYPES: Tuple[str, ...] = ("file", "external")
+
+
+class CompactGraph:
+    """
+    整数索引的有向图
+    实现 DependencyAnalyzer 用到的 networkx.DiGraph 接口子集（add_node/add_edge/has_edge/nodes 等）
+    """
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        self._types = array("b")
+        self._stdlib = array("b")
+        self._out: List[array] = []
+        self._edge_count = 0
+        self._csr: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._reverse: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.ids
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def number_of_nodes(self) -> int:
+        return len(self.names)
+
+    def number_of_edges(self) -> int:
+        return self._edge_count
+
+    def _invalidate(self):
+        self._csr = None
+        self._reverse = None
+
+    def add_node(self, name: str, type: str = "file", stdlib: bool = False) -> int:
+        """
+        添加节点（已存在时更新属性）
+
+        返回:
+            节点 ID
+        """
+        code = NODE_TYPES.index(type)
+        node = self.ids.get(name)
+        if node is None:
+            node = len(self.names)
+            self.ids[name] = node
+            self.names.append(name)
+            self._types.append(code)
+            self._stdlib.append(int(stdlib))
+            self._out.append(array("i"))
+            self._invalidate()
+        else:
+            self._types[node] = code
+            self._stdlib[node] = int(stdlib)
+        return node
+
+    def _intern(self, name: str) -> int:
+        node = self.ids.get(name)
+        return self.add_node(name) if node is None else node
+
+    def add_edge(self, source: str, target: str) -> bool:
+        """添加边，返回是否为新边"""
+        u, v = self._intern(source), self._intern(target)
+        out = self._out[u]
+        if v in out:
+            return False
+        out.append(v)
+        self._edge_count += 1
+        self._invalidate()
+        return True
+
+    def has_edge(self, source: str, target: str) -> bool:
+        u, v = self.ids.get(source), self.ids.get(target)
+        return u is not None and v is not None and v in self._out[u]
+
+    def successors(self, name: str) -> List[str]:
+        return [self.names[v] for v in self._out[self.ids[name]]]
+
+    def clear_out_edges(self, name: str):
+        """移除节点的全部出边"""
+        node = self.ids.get(name)
+        if node is not None and self._out[node]:
+            self._edge_count -= len(self._out[node])
+            self._out[node] = array("i")
+            self._invalidate()
+
+    def node_type(self, name: str) -> str:
+        return NODE_TYPES[self._types[self.ids[name]]]
+
+    def nodes(self, data: Union[bool, str, None] = None) -> List[Any]:
+        """
+        节点列表，语义同 networkx：data=None 返回名称，data=True 返回 (名称, 属性)，data="type" 返回 (名称, 类型)
+        """
+        if data is None or data is False:
+            return list(self.names)
+        rows = []
+        for node, name in enumerate(self.names):
+            attrs = {"type": NODE_TYPES[self._types[node]]}
+            if self._types[node] == 1:
+                attrs["stdlib"] = bool(self._stdlib[node])
+            rows.append((name, attrs if data is True else attrs.get(data)))
+        return rows
+
+    def node_flags(self) -> np.ndarray:
+        """每个节点一个字节：bit0 为类型编码，bit1 为是否标准库"""
+        types = np.frombuffer(self._types.tobytes(), dtype=np.int8).astype(np.uint8)
+        stdlib = np.frombuffer(self._stdlib.tobytes(), dtype=np.int8).astype(np.uint8)
+        return types | (stdlib << 1)
+
+    @classmethod
+    def from_arrays(cls, names: List[str], flags: np.ndarray, edges: np.ndarray) -> "CompactGraph":
+        """
+        由节点名称、节点标志和 (m, 2) 边数组构建图（边需已去重）
+
+        参数:
+            names: 节点名称，下标即节点 ID
+            flags: node_flags() 格式的节点标志
+            edges: int32 边数组，每行为 (source_id, target_id)
+        """
+        graph = cls()
+        graph.names = list(names)
+        graph.ids = {name: i for i, name in enumerate(graph.names)}
+        graph._types = array("b", (flags & 1).astype(np.int8).tobytes())
+        graph._stdlib = array("b", ((flags >> 1) & 1).astype(np.int8).tobytes())
+        edges = np.asarray(edges, dtype=np.int32).reshape(-1, 2)
+        order = np.argsort(edges[:, 0], kind="stable")
+        targets = edges[order, 1]
+        bounds = np.searchsorted(edges[order, 0], np.arange(len(graph.names) + 1))
+        graph._out = [array("i", targets[bounds[i]:bounds[i + 1]].tobytes()) for i in range(len(graph.names))]
+        graph._edge_count = len(edges)
+        return graph
+
+    def edge_chunks(self, chunk_size: int = 1 << 16) -> Iterable[np.ndarray]:
+        """
+        按块产出边，每块为 (k, 2) 的 int32 数组，不构建完整的边表
+
+        参数:
+            chunk_size: 每块的大致边数
+        """
+        sources: List[np.ndarray] = []
+        targets: List[np.ndarray] = []
+        pending = 0
+        for node, out in enumerate(self._out):
+            if not out:
+                continue
+            targets.append(np.frombuffer(out.tobytes(), dtype=np.int32))
+            sources.append(np.full(len(out), node, dtype=np.int32))
+            pending += len(out)
+            if pending >= chunk_size:
+                yield np.column_stack((np.concatenate(sources), np.concatenate(targets)))
+                sources, targets, pending = [], [], 0
+        if pending:
+            yield np.column_stack((np.concatenate(sources), np.concatenate(targets)))
+
+    def csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """出边 CSR：indptr[n + 1]（int64）和 indices[m]（int32）"""
+        if self._csr is None:
+            n = len(self.names)
+            lengths = np.fromiter((len(out) for out in self._out), dtype=np.int64, count=n)
+            indptr = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(lengths, out=indptr[1:])
+            indices = np.frombuffer(b"".join(out.tobytes() for out in self._out), dtype=np.int32)
+            self._csr = (indptr, indices)
+        return self._csr
+
+    def reverse_csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """入边 CSR（由出边 CSR 稳定排序得到）"""
+        if self._reverse is None:
+            indptr, indices = self.csr()
+            n = len(self.names)
+            sources = np.repeat(np.arange(n, dtype=np.int32), np.diff(indptr))
+            order = np.argsort(indices, kind="stable")
+            rev_indptr = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(indices, minlength=n), out=rev_indptr[1:])
+            self._reverse = (rev_indptr, sources[order])
+        return self._reverse
+
+    def out_degree(self) -> np.ndarray:
+        return np.diff(self.csr()[0])
+
+    def in_degree(self) -> np.ndarray:
+        return np.bincount(self.csr()[1], minlength=len(self.names))
+
+    def degree_stats(self) -> Dict[str, Any]:
+        """向量化度统计"""
+        n = len(self.names)
+        if n == 0:
+            return {"avg_degree": 0.0, "max_in_degree": 0, "max_out_degree": 0}
+        in_degree, out_degree = self.in_degree(), self.out_degree()
+        return {
+            "avg_degree": float((in_degree.sum() + out_degree.sum()) / n),
+            "max_in_degree": int(in_degree.max()),
+            "max_out_degree": int(out_degree.max()),
+        }
+
+    def reachable(self, sources: Iterable[str], reverse: bool = False) -> np.ndarray:
+        """
+        从若干节点出发的可达集合（不含出发节点本身），每层邻居整体向量化收集
+
+        参数:
+            sources: 出发节点名称
+            reverse: True 时沿入边方向（即求祖先）
+
+        返回:
+            长度为节点数的布尔掩码
+        """
+        indptr, indices = self.reverse_csr() if reverse else self.csr()
+        visited = np.zeros(len(self.names), dtype=bool)
+        start = np.fromiter((self.ids[s] for s in sources if s in self.ids), dtype=np.int64)
+        visited[start] = True
+        frontier = start
+        while frontier.size:
+            begins = indptr[frontier]
+            lengths = indptr[frontier + 1] - begins
+            total = int(lengths.sum())
+            if not total:
+                break
+            # 把各节点的邻接区间 [begin, begin + length) 拼接成一个下标数组
+            offsets = np.repeat(begins - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+            neighbors = indices[offsets]
+            neighbors = np.unique(neighbors[~visited[neighbors]])
+            visited[neighbors] = True
+            frontier = neighbors
+        visited[start] = False
+        return visited
+
+    def _names_of(self, mask: np.ndarray) -> Set[str]:
+        return {self.names[i] for i in np.flatnonzero(mask)}
+
+    def descendants(self, name: str) -> Set[str]:
+        return self._names_of(self.reachable([name])) if name in self.ids else set()
+
+    def ancestors(self, name: str) -> Set[str]:
+        return self._names_of(self.reachable([name], reverse=True)) if name in self.ids else set()
+
+    def strongly_connected_components(self) -> List[List[str]]:
+        """强连通分量（迭代 Tarjan，不受递归深度限制）"""
+        indptr, indices = (a.tolist() for a in self.csr())
+        n = len(self.names)
+        index = [-1] * n
+        low = [0] * n
+        on_stack = [False] * n
+        stack: List[int] = []
+        components: List[List[str]] = []
+        counter = 0
+
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            work = [(root, indptr[root])]
+            while work:
+                v, i = work[-1]
+                end = indptr[v + 1]
+                while i < end:
+                    w = indices[i]
+                    i += 1
+                    if index[w] == -1:
+                        work[-1] = (v, i)
+                        index[w] = low[w] = counter
+                        counter += 1
+                        stack.append(w)
+                        on_stack[w] = True
+                        work.append((w, indptr[w]))
+                        break
+                    if on_stack[w] and index[w] < low[v]:
+                        low[v] = index[w]
+                else:
+                    work.pop()
+                    if low[v] == index[v]:
+                        component = []
+                        while True:
+                            w = stack.pop()
+                            on_stack[w] = False
+                            component.append(self.names[w])
+                            if w == v:
+                                break
+                        components.append(component)
+                    if work:
+                        u = work[-1][0]
+                        if low[v] < low[u]:
+                            low[u] = low[v]
+        return components
+
+    def to_networkx(self):
+        """导出为 networkx.DiGraph"""
+        import networkx as nx
+
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self.nodes(data=True))
+        graph.add_edges_from(
+            (self.names[u], self.names[v]) for u, out in enumerate(self._out) for v in out
+        )
+        return graph
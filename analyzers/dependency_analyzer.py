@@ -1,54 +1,293 @@
-from typing import List, Dict, Any, Set
+from typing import List, Dict, Any, Set, Iterable, Optional
 from pathlib import Path
 import ast
 import networkx as nx
+import gzip
 import json
 
+from analyzers.compact_graph import CompactGraph
+from analyzers.import_resolver import ImportResolver, ModuleIndex, STDLIB_MODULES
+from utils.source_loader import SourceLoader
+
 
 class DependencyAnalyzer:
-    def __init__(self, repo_path: str):
+    """
+    模块依赖分析器
+    节点为仓库内文件（type="file"，以相对路径为键）和外部顶层包（type="external"）；
+    导入经 ModuleIndex 解析到具体文件，解析失败的导入（如越界的相对导入）记录在 unresolved 中
+
+    backend="networkx" 时 graph 为 networkx.DiGraph；backend="compact" 时为整数索引的 CompactGraph，
+    适合整个组织规模的导入图，可通过 to_networkx() 转换
+    """
+
+    BACKENDS = ("networkx", "compact")
+
+    def __init__(
+        self,
+        repo_path: str,
+        index: Optional[ModuleIndex] = None,
+        backend: str = "networkx",
+        max_size: Optional[int] = None,
+        cache_path: Optional[Path] = None,
+    ):
+        """
+        初始化分析器
+
+        参数:
+            repo_path: 仓库路径
+            index: 已构建的模块索引，None 时在分析时构建
+            backend: 图后端，见 BACKENDS
+            max_size: 未传入文件列表时，自动发现的源文件大小上限（字节）
+            cache_path: 未传入文件列表时，自动发现的文件列表缓存路径
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"未知的图后端: {backend}")
         self.repo_path = Path(repo_path)
-        self.graph = nx.DiGraph()
+        self.backend = backend
+        self.graph = CompactGraph() if backend == "compact" else nx.DiGraph()
         self.imports: Dict[str, List[str]] = {}
+        # 文件级调用图（由 add_calls 构建，与 graph 使用相同后端）
+        self.call_graph = None
+        self.unresolved: Dict[str, List[str]] = {}
+        self.loader = SourceLoader()
+        self.index = index
+        self.resolver = ImportResolver(index) if index is not None else None
+        self.max_size = max_size
+        self.cache_path = cache_path
+
+    @property
+    def skipped_files(self):
+        return self.loader.skipped
+
+    def discover_files(self) -> List[Path]:
+        """通过 FileDiscovery 发现仓库内的 Python 文件（遵循 max_size 和 cache_path）"""
+        from utils.discovery import FileDiscovery
+
+        return FileDiscovery(self.repo_path, max_size=self.max_size, cache_path=self.cache_path).files()
+
+    def build_index(self, file_paths: Optional[Iterable[Path]] = None) -> ModuleIndex:
+        """
+        构建模块索引
+
+        参数:
+            file_paths: 仓库内的 Python 文件，None 时调用 discover_files
+        """
+        if file_paths is None:
+            file_paths = self.discover_files()
+        self.index = ModuleIndex.from_paths(self.repo_path, file_paths)
+        self.resolver = ImportResolver(self.index)
+        return self.index
+
+    def analyze_repository(self, file_paths: Optional[Iterable[Path]] = None):
+        """
+        分析全部文件的导入：索引只构建一次
+
+        参数:
+            file_paths: 仓库内的 Python 文件，None 时调用 discover_files
+        """
+        if file_paths is None:
+            file_paths = self.discover_files()
+        file_paths = list(file_paths)
+        self.build_index(file_paths)
+        for file_path in file_paths:
+            self.analyze_imports(file_path)
 
     def analyze_imports(self, file_path: Path):
+        """
+        分析单个文件的导入；重复分析同一文件时先移除其旧的导入边
+
+        参数:
+            file_path: 文件路径
+        """
+        if self.resolver is None:
+            self.build_index()
+
+        file_path = Path(file_path)
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-            tree = ast.parse(content)
-
-            relative_path = str(file_path.relative_to(self.repo_path)).replace(
-                "\\", "/"
-            )
-            self.graph.add_node(relative_path, type="file")
-
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        self._add_dependency(relative_path, alias.name)
-                elif isinstance(node, ast.ImportFrom):
-                    if node.module:
-                        self._add_dependency(relative_path, node.module)
-
-        except Exception as e:
-            print(f"Error analyzing imports in {file_path}: {e}")
-
-    def _add_dependency(self, source: str, target: str):
-        self.graph.add_node(target, type="module")
+            relative_path = file_path.relative_to(self.repo_path).as_posix()
+        except ValueError as e:
+            self.loader.skip(file_path, e)
+            return
+        tree = self.loader.parse_ast(file_path)
+        if tree is None:
+            return
+
+        self._clear_imports(relative_path)
+        self.graph.add_node(relative_path, type="file")
+
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    self._add_dependency(relative_path, *self.resolver.resolve_import(alias.name))
+            elif isinstance(node, ast.ImportFrom):
+                resolved = self.resolver.resolve_from(
+                    relative_path, node.module, [alias.name for alias in node.names], node.level
+                )
+                for kind, target in resolved:
+                    self._add_dependency(relative_path, kind, target)
+
+    def _clear_imports(self, source: str):
+        if self.backend == "compact":
+            self.graph.clear_out_edges(source)
+        elif source in self.graph:
+            self.graph.remove_edges_from(list(self.graph.out_edges(source)))
+        self.imports.pop(source, None)
+        self.unresolved.pop(source, None)
+
+    def _add_dependency(self, source: str, kind: str, target: str):
+        if kind == "unresolved":
+            self.unresolved.setdefault(source, []).append(target)
+            return
+        if kind == "external":
+            self.graph.add_node(target, type="external", stdlib=target in STDLIB_MODULES)
+        elif target not in self.graph:
+            self.graph.add_node(target, type="file")
+        if self.graph.has_edge(source, target):
+            return
         self.graph.add_edge(source, target)
-        if source not in self.imports:
-            self.imports[source] = []
-        self.imports[source].append(target)
+        self.imports.setdefault(source, []).append(target)
+
+    def add_calls(self, call_table) -> None:
+        """
+        把 ASTAnalyzer 的调用边表折叠为文件级调用图 call_graph，无需再次解析源码；
+        文件内调用不产生边，经导入的调用解析到仓库文件或外部包，内置和无法解析的调用忽略
+
+        参数:
+            call_table: CallGraphTable
+        """
+        if self.resolver is None:
+            self.build_index()
+        self.call_graph = CompactGraph() if self.backend == "compact" else nx.DiGraph()
+        for source, target, kind in call_table.file_targets():
+            if kind != "import":
+                continue
+            resolved_kind, resolved = self._resolve_call_target(source, target)
+            if resolved_kind == "unresolved" or resolved == source:
+                continue
+            if resolved_kind == "external":
+                self.call_graph.add_node(resolved, type="external", stdlib=resolved in STDLIB_MODULES)
+            elif resolved not in self.call_graph:
+                self.call_graph.add_node(resolved, type="file")
+            if source not in self.call_graph:
+                self.call_graph.add_node(source, type="file")
+            self.call_graph.add_edge(source, resolved)
+
+    def _resolve_call_target(self, source: str, target: str):
+        """解析调用目标的导入路径（相对导入保留前导点）"""
+        rest = target.lstrip(".")
+        level = len(target) - len(rest)
+        if not level:
+            return self.resolver.resolve_import(rest)
+        parts = rest.split(".") if rest else []
+        if not parts:
+            return "unresolved", target
+        module = ".".join(parts[:-1]) or None
+        return self.resolver.resolve_from(source, module, [parts[-1]], level)[0]
+
+    def to_networkx(self) -> nx.DiGraph:
+        """以 networkx.DiGraph 形式返回依赖图"""
+        return self.graph.to_networkx() if self.backend == "compact" else self.graph
+
+    def file_nodes(self) -> List[str]:
+        return [n for n, kind in self.graph.nodes(data="type") if kind == "file"]
+
+    def external_packages(self) -> Dict[str, bool]:
+        """外部顶层包 -> 是否为标准库"""
+        return {
+            n: data.get("stdlib", False)
+            for n, data in self.graph.nodes(data=True)
+            if data.get("type") == "external"
+        }
+
+    def node_type(self, node: str) -> str:
+        """节点类型（file 或 external）"""
+        if self.backend == "compact":
+            return self.graph.node_type(node)
+        return self.graph.nodes[node].get("type")
+
+    def successors(self, node: str) -> List[str]:
+        """节点直接导入的节点"""
+        if node not in self.graph:
+            return []
+        return list(self.graph.successors(node))
+
+    def strongly_connected_components(self) -> List[Set[str]]:
+        if self.backend == "compact":
+            return [set(c) for c in self.graph.strongly_connected_components()]
+        return list(nx.strongly_connected_components(self.graph))
+
+    def find_cycles(self) -> List[List[str]]:
+        """
+        文件间的循环导入（强连通分量，线性时间）
+
+        返回:
+            每个循环涉及的文件列表（排序），按规模降序
+        """
+        cycles = [
+            sorted(component)
+            for component in self.strongly_connected_components()
+            if len(component) > 1
+            or self.graph.has_edge(next(iter(component)), next(iter(component)))
+        ]
+        return sorted(cycles, key=lambda c: (-len(c), c))
+
+    def impacted_by(self, file_path: str) -> Set[str]:
+        """
+        修改某个文件后受影响的文件（直接或间接导入它的文件）
+
+        参数:
+            file_path: 相对仓库根目录的路径
+        """
+        if file_path not in self.graph:
+            return set()
+        if self.backend == "compact":
+            ancestors = self.graph.ancestors(file_path)
+        else:
+            ancestors = nx.ancestors(self.graph, file_path)
+        return {n for n in ancestors if self.node_type(n) == "file"}
+
+    def export_graph_data(self, output_path: str, fmt: Optional[str] = None) -> None:
+        """
+        导出依赖图
+
+        参数:
+            output_path: 输出路径
+            fmt: "node_link"（整图 JSON）/ "jsonl"（流式 node-link）/ "binary"（紧凑边表），
+                 None 时按扩展名判断（.json / .jsonl / .bin，可加 .gz 压缩）
+        """
+        from analyzers.graph_io import detect_format, write_graph
 
-    def export_graph_data(self, output_path: str):
-        data = nx.node_link_data(self.graph)
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        path = Path(output_path)
+        if fmt is None:
+            suffixes = [s for s in path.suffixes if s != ".gz"]
+            fmt = "node_link" if suffixes and suffixes[-1] == ".json" else detect_format(path)
+        if fmt != "node_link":
+            write_graph(self.graph, output_path, fmt)
+            return
+        data = nx.node_link_data(self.to_networkx())
+        if path.suffix == ".gz":
+            with gzip.open(path, "wt", encoding="utf-8") as f:
+                json.dump(data, f)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
 
     def get_stats(self) -> Dict[str, Any]:
+        external = self.external_packages()
+        if self.backend == "compact":
+            degrees = self.graph.degree_stats()
+        else:
+            # 有向图的度之和恒为边数的两倍，无需逐节点求和
+            degrees = {
+                "avg_degree": 2 * self.graph.number_of_edges() / max(1, self.graph.number_of_nodes()),
+                "max_in_degree": max((d for _, d in self.graph.in_degree()), default=0),
+                "max_out_degree": max((d for _, d in self.graph.out_degree()), default=0),
+            }
         return {
             "total_nodes": self.graph.number_of_nodes(),
             "total_edges": self.graph.number_of_edges(),
-            "avg_degree": sum(dict(self.graph.degree()).values())
-            / max(1, self.graph.number_of_nodes()),
+            **degrees,
+            "file_nodes": self.graph.number_of_nodes() - len(external),
+            "external_packages": len(external),
+            "unresolved_imports": sum(len(v) for v in self.unresolved.values()),
         }
@@ -0,0 +1,179 @@
+"""
+依赖查询模块
+在 DependencyAnalyzer 的导入图上回答"修改 X 会影响哪些文件"、最短导入链和拓扑分层；
+反向依赖闭包按节点缓存，文件的导入变化时只失效受影响的缓存项
+"""
+
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+from collections import deque
+from pathlib import Path
+
+
+class DependencyQuery:
+    """
+    依赖查询引擎
+
+    缓存失效规则：文件 X 的导入由 old 变为 new 时，节点 Y 的反向闭包只有在
+    X 原本就能到达 Y（X 在缓存的闭包中），或 X 的某个新导入目标原本能到达 Y（在闭包中或就是 Y）时才会改变
+    """
+
+    def __init__(self, analyzer):
+        """
+        初始化查询引擎
+
+        参数:
+            analyzer: 已完成分析的 DependencyAnalyzer（任一图后端）
+        """
+        self.analyzer = analyzer
+        self._closures: Dict[str, FrozenSet[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def dependents(self, node: str) -> FrozenSet[str]:
+        """
+        反向依赖闭包：直接或间接导入该节点的全部文件（不含自身）
+
+        参数:
+            node: 文件相对路径或外部包名
+        """
+        closure = self._closures.get(node)
+        if closure is None:
+            self.misses += 1
+            closure = frozenset(self.analyzer.impacted_by(node))
+            self._closures[node] = closure
+        else:
+            self.hits += 1
+        return closure
+
+    def affected(self, changed: Iterable[str]) -> Set[str]:
+        """
+        一组文件变化后需要重新检查的文件：变化的文件本身加上它们的反向依赖闭包
+
+        参数:
+            changed: 变化的文件
+        """
+        result: Set[str] = set()
+        for node in changed:
+            if node in self.analyzer.graph:
+                result.add(node)
+                result |= self.dependents(node)
+        return result
+
+    def update_file(self, file_path) -> Set[str]:
+        """
+        重新分析单个文件的导入，并按失效规则清理缓存
+
+        参数:
+            file_path: 仓库内的文件路径，或相对仓库根目录的路径
+
+        返回:
+            被失效的缓存节点
+        """
+        repo_path = self.analyzer.repo_path
+        path = Path(file_path)
+        try:
+            rel = path.relative_to(repo_path).as_posix()
+        except ValueError:
+            rel = path.as_posix()
+            path = repo_path / path
+
+        old = set(self.analyzer.imports.get(rel, ()))
+        self.analyzer.analyze_imports(path)
+        new = set(self.analyzer.imports.get(rel, ()))
+        return self.invalidate(rel, new - old)
+
+    def invalidate(self, source: str, added: Iterable[str] = ()) -> Set[str]:
+        """
+        文件 source 的导入变化后失效缓存
+
+        参数:
+            source: 导入发生变化的文件
+            added: 新增的导入目标
+
+        返回:
+            被失效的缓存节点
+        """
+        added = set(added)
+        stale = {
+            node
+            for node, closure in self._closures.items()
+            if source in closure or node in added or not added.isdisjoint(closure)
+        }
+        for node in stale:
+            del self._closures[node]
+        return stale
+
+    def clear(self):
+        self._closures.clear()
+
+    def import_chain(self, source: str, target: str) -> Optional[List[str]]:
+        """
+        最短导入链（广度优先）
+
+        参数:
+            source: 起点文件
+            target: 终点文件或外部包
+
+        返回:
+            从 source 到 target 的节点列表，不可达时返回 None
+        """
+        if source not in self.analyzer.graph or target not in self.analyzer.graph:
+            return None
+        parents: Dict[str, Optional[str]] = {source: None}
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            if node == target:
+                chain = []
+                while node is not None:
+                    chain.append(node)
+                    node = parents[node]
+                return chain[::-1]
+            for successor in self.analyzer.successors(node):
+                if successor not in parents:
+                    parents[successor] = node
+                    queue.append(successor)
+        return None
+
+    def topological_layers(self) -> List[List[str]]:
+        """
+        文件的拓扑分层：第 0 层不导入其他仓库文件，第 k 层只依赖更低层；
+        循环导入中的文件位于同一层
+
+        返回:
+            每层的文件列表（排序）
+        """
+        analyzer = self.analyzer
+        files = set(analyzer.file_nodes())
+        components = [c & files for c in analyzer.strongly_connected_components()]
+        components = [c for c in components if c]
+        component_of = {node: i for i, component in enumerate(components) for node in component}
+
+        depends_on: List[Set[int]] = [set() for _ in components]
+        dependents: List[Set[int]] = [set() for _ in components]
+        for i, component in enumerate(components):
+            for node in component:
+                for successor in analyzer.successors(node):
+                    j = component_of.get(successor)
+                    if j is not None and j != i:
+                        depends_on[i].add(j)
+                        dependents[j].add(i)
+
+        remaining = [len(deps) for deps in depends_on]
+        layer = [0] * len(components)
+        queue = deque(i for i, count in enumerate(remaining) if count == 0)
+        while queue:
+            i = queue.popleft()
+            for j in dependents[i]:
+                layer[j] = max(layer[j], layer[i] + 1)
+                remaining[j] -= 1
+                if remaining[j] == 0:
+                    queue.append(j)
+
+        layers: List[List[str]] = [[] for _ in range(max(layer, default=-1) + 1)]
+        for i, component in enumerate(components):
+            layers[layer[i]].extend(component)
+        return [sorted(nodes) for nodes in layers]
+
+    def stats(self) -> Dict[str, int]:
+        return {"cached": len(self._closures), "hits": self.hits, "misses": self.misses}
@@ -1,20 +1,34 @@
 """
 PySnooper 动态追踪模块
-用于追踪 Typer 框架的运行时行为，包括函数调用、变量变化等
+用于追踪 Typer 框架的运行时行为，包括函数调用、变量变化等；
+函数级耗时统计使用 CallProfiler（sys.monitoring / sys.settrace / sys.setprofile），不再逐行格式化文本日志
 """
 
-import pysnooper
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Callable
+from typing import Optional, List, Dict, Any, Callable, Iterator, Sequence, Tuple
+from contextlib import contextmanager, nullcontext
 from dataclasses import dataclass, field
 from datetime import datetime
+import functools
+import importlib
+import inspect
+import linecache
 import threading
 import logging
 import json
+import sys
+import time
 
 logger = logging.getLogger(__name__)
 
 
+def _snoop(*args, **kwargs):
+    """延迟导入 pysnooper，只有真正开始追踪时才加载"""
+    import pysnooper
+
+    return pysnooper.snoop(*args, **kwargs)
+
+
 @dataclass
 class TraceEvent:
     timestamp: str
@@ -25,6 +39,13 @@ class TraceEvent:
     locals: Dict[str, Any]
 
 
+@dataclass
+class CommandRun:
+    command: str  # 以空格连接的命令行参数
+    exit_code: int
+    duration_ns: int
+
+
 @dataclass
 class CallbackTrace:
     callback_name: str
@@ -32,6 +53,101 @@ class CallbackTrace:
     execution_path: List[TraceEvent] = field(default_factory=list)
     start_time: Optional[str] = None
     end_time: Optional[str] = None
+    duration_ns: Optional[int] = None  # 回调本身的执行耗时（perf_counter_ns）
+    dropped_events: int = 0  # 超出上限、被抽样丢弃的事件数
+    result: Any = None
+    error: Optional[str] = None  # 回调抛出的异常（repr），正常返回时为 None
+
+
+# trace_callback 可选的追踪方式
+TRACERS = ("profile", "sample")
+
+
+class EventSampler:
+    """
+    有界均匀抽样：保留第 0、stride、2*stride... 个事件，超出上限时丢弃一半并把 stride 加倍，
+    内存占用不超过 limit 条，且保留的事件在整个执行过程中均匀分布
+    """
+
+    def __init__(self, limit: int):
+        if limit <= 0:
+            raise ValueError("limit 必须为正数")
+        self.limit = limit
+        self.events: List[TraceEvent] = []
+        self.stride = 1
+        self.seen = 0
+
+    def wants(self) -> bool:
+        """下一个事件是否会被保留（调用方可据此跳过构造事件的开销）"""
+        return self.seen % self.stride == 0
+
+    def skip(self):
+        """跳过一个不会被保留的事件（只计数）"""
+        self.seen += 1
+
+    def add(self, event: TraceEvent):
+        if self.seen % self.stride == 0:
+            self.events.append(event)
+            if len(self.events) > self.limit:
+                self.events = self.events[::2]
+                self.stride *= 2
+        self.seen += 1
+
+    @property
+    def dropped(self) -> int:
+        return self.seen - len(self.events)
+
+
+def demo_app():
+    """内置示例应用：未配置 TRACE_APP 时用于执行 TRACE_COMMANDS"""
+    import typer
+
+    app = typer.Typer()
+
+    @app.command()
+    def hello(name: str, count: int = 1):
+        for _ in range(count):
+            typer.echo(f"Hello {name}")
+
+    @app.command()
+    def goodbye(name: str, formal: bool = False):
+        typer.echo(f"Goodbye Ms. {name}. Have a good day." if formal else f"Bye {name}!")
+
+    return app
+
+
+def load_app(spec: str, search_path: Optional[str] = None):
+    """
+    按 "模块:属性" 加载 Typer 应用
+
+    参数:
+        spec: 例如 "docs_src.first_steps.tutorial001:app"
+        search_path: 导入前加入 sys.path 的目录（通常是目标仓库根目录）
+    """
+    module_name, _, attr = spec.partition(":")
+    if search_path and search_path not in sys.path:
+        sys.path.insert(0, search_path)
+    module = importlib.import_module(module_name)
+    return getattr(module, attr or "app")
+
+
+def _short_repr(value: Any, limit: int = 200) -> str:
+    try:
+        text = repr(value)
+    except Exception as e:
+        text = f"<repr failed: {type(e).__name__}>"
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+def _target_code(func: Callable):
+    """被追踪对象实际执行的代码对象：展开装饰器和 functools.partial，实例取其 __call__；找不到时返回 None"""
+    func = inspect.unwrap(func)
+    while isinstance(func, functools.partial):
+        func = inspect.unwrap(func.func)
+    code = getattr(func, "__code__", None)
+    if code is None:
+        code = getattr(getattr(type(func), "__call__", None), "__code__", None)
+    return code
 
 
 class DynamicTracer:
@@ -39,6 +155,7 @@ class DynamicTracer:
         self.trace_dir = Path(trace_dir)
         self.trace_dir.mkdir(exist_ok=True)
         self.current_trace_file: Optional[Path] = None
+        self.callback_traces: List[CallbackTrace] = []
         self._lock = threading.Lock()
 
     def start_trace(self, name: str, watch: Optional[List[str]] = None):
@@ -48,7 +165,7 @@ class DynamicTracer:
 
         logger.info(f"Starting trace: {name} -> {filename}")
 
-        return pysnooper.snoop(
+        return _snoop(
             str(self.current_trace_file),
             watch=watch,
             depth=2,
@@ -56,10 +173,121 @@ class DynamicTracer:
             overwrite=True,
         )
 
-    def trace_typer_core(self):
-        variables = ["app", "command", "typer_instance"]
+    @contextmanager
+    def profile(
+        self,
+        name: str,
+        include: Optional[Sequence[str]] = None,
+        backend: str = "auto",
+        track_blocks: bool = False,
+    ) -> Iterator["CallProfiler"]:
+        """
+        在 CallProfiler 下执行代码块，结束后把函数统计写入 profile_<name>.csv，
+        环形缓冲区中的事件写入二进制追踪 profile_<name>.trace
+
+        参数:
+            name: 剖析名称
+            include: 只统计这些模块中的函数，None 表示全部
+            backend: 剖析后端，见 call_profiler.BACKENDS
+            track_blocks: 是否统计每次调用的内存块净增量
+        """
+        from analyzers.call_profiler import CallProfiler
+
+        profiler = CallProfiler(include=include, backend=backend, track_blocks=track_blocks)
+        output_file = self.trace_dir / f"profile_{name}.csv"
+        logger.info(f"Starting profile: {name} -> {output_file.name}")
+        try:
+            with profiler:
+                yield profiler
+        finally:
+            profiler.export_csv(output_file)
+            profiler.export_trace(output_file.with_suffix(".trace"))
+
+    def run_typer_commands(
+        self,
+        commands: Sequence[Sequence[str]],
+        app=None,
+        include: Optional[Sequence[str]] = ("typer", "click"),
+        backend: str = "auto",
+        track_blocks: bool = False,
+    ) -> Tuple["CallProfiler", List[CommandRun]]:
+        """
+        通过 typer.testing.CliRunner 逐条执行命令，并在 CallProfiler 下统计函数调用；
+        函数统计同时写入 profile_typer_commands.csv
+
+        参数:
+            commands: 命令行参数列表，例如 [("hello", "World"), ("--help",)]
+            app: Typer 应用，None 时使用 demo_app()
+            include: 只统计这些模块中的函数
+            backend: 剖析后端
+            track_blocks: 是否统计每次调用的内存块净增量（默认关闭，开启后剖析开销明显增大）
+
+        返回:
+            (剖析器, 每条命令的执行结果)
+        """
+        from typer.testing import CliRunner
+
+        app = app if app is not None else demo_app()
+        runner = CliRunner()
+        runs: List[CommandRun] = []
+        with self.profile("typer_commands", include=include, backend=backend, track_blocks=track_blocks) as profiler:
+            for args in commands:
+                start = time.perf_counter_ns()
+                result = runner.invoke(app, list(args))
+                runs.append(CommandRun(" ".join(args), result.exit_code, time.perf_counter_ns() - start))
+        return profiler, runs
+
+    @contextmanager
+    def sample(
+        self, name: str, interval: float = 0.005, all_threads: bool = False
+    ) -> Iterator["SamplingProfiler"]:
+        """
+        在 SamplingProfiler 下执行代码块，结束后把折叠栈写入 sample_<name>.folded（可直接生成火焰图）
+
+        参数:
+            name: 采样名称
+            interval: 采样间隔（秒）
+            all_threads: 是否采样全部线程
+        """
+        from analyzers.sampling_profiler import SamplingProfiler
+
+        sampler = SamplingProfiler(interval=interval, all_threads=all_threads)
+        output_file = self.trace_dir / f"sample_{name}.folded"
+        logger.info(f"Starting sampling: {name} -> {output_file.name}")
+        try:
+            with sampler:
+                yield sampler
+        finally:
+            sampler.export_collapsed(output_file)
+
+    def sample_callback(
+        self,
+        callback_func: Callable,
+        trigger: str,
+        *args,
+        interval: float = 0.005,
+        limit: int = 50,
+        **kwargs,
+    ) -> CallbackTrace:
+        """
+        以采样模式执行回调，用样本最多的调用栈填充 CallbackTrace（等同于 trace_callback(tracer="sample")）
+
+        参数:
+            callback_func: 回调函数
+            trigger: 触发事件
+            *args, **kwargs: 传给回调的参数
+            interval: 采样间隔（秒）
+            limit: execution_path 最多保留的调用栈数
+
+        返回:
+            CallbackTrace，每个 TraceEvent 对应一个热点调用栈（event_type 为 "sample"）
+        """
+        return self.trace_callback(
+            callback_func, trigger, *args, tracer="sample", max_events=limit, interval=interval, **kwargs
+        )
 
-        with self.start_trace("typer_core", watch=variables):
+    def trace_typer_core(self):
+        with self.profile("typer_core", include=("typer", "click")):
             try:
                 import typer
 
@@ -85,105 +313,273 @@ class DynamicTracer:
             logger.error(f"Error reading trace file: {e}")
             return ""
 
+    def read_trace(self, trace_path: Path) -> "TraceReader":
+        """打开二进制追踪文件（事件区内存映射，按需分块读取）"""
+        from analyzers.trace_format import TraceReader
+
+        return TraceReader(trace_path)
+
+    def iter_trace_log(self, log_path: Path) -> Iterator[Dict[str, Any]]:
+        """
+        流式解析追踪文件：二进制追踪逐个产出事件，PySnooper 文本日志按行启发式解析
+
+        参数:
+            log_path: 追踪文件路径
+        """
+        from analyzers.trace_format import is_binary_trace
+
+        if is_binary_trace(log_path):
+            for event in self.read_trace(log_path):
+                yield {
+                    "timestamp": event.timestamp,
+                    "type": event.event,
+                    "line_no": event.line,
+                    "function": event.function,
+                }
+            return
+
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+
+                parts = line.split(maxsplit=4)
+                if len(parts) >= 4:
+                    yield {
+                        "raw": line,
+                        "timestamp": parts[1],
+                        "type": parts[2],
+                        "line_no": parts[3],
+                    }
+
     def parse_trace_log(self, log_path: Path) -> List[Dict[str, Any]]:
-        entries = []
         try:
-            with open(log_path, "r", encoding="utf-8") as f:
-                current_entry = {}
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    parts = line.split(maxsplit=4)
-                    if len(parts) >= 4:
-                        entries.append(
-                            {
-                                "raw": line,
-                                "timestamp": parts[1] if len(parts) > 1 else "",
-                                "type": parts[2] if len(parts) > 2 else "",
-                                "line_no": parts[3] if len(parts) > 3 else "",
-                            }
-                        )
-
-            return entries
+            return list(self.iter_trace_log(log_path))
         except Exception as e:
             logger.error(f"Error parsing trace log {log_path}: {e}")
             return []
 
-    def trace_callback(self, callback_func: Callable, trigger: str) -> CallbackTrace:
-        trace = CallbackTrace(
-            callback_name=callback_func.__name__,
-            trigger_event=trigger,
-            start_time=datetime.now().isoformat(),
-        )
+    def _run_callback(self, trace: CallbackTrace, func: Callable, args, kwargs, context=None):
+        """
+        执行回调并记录起止时间和纳秒级耗时；异常记录在 trace.error 中，不向外抛出
 
-        output_file = self.trace_dir / f"callback_{callback_func.__name__}.log"
-
-        @pysnooper.snoop(
-            str(output_file),
-            depth=3,
-            prefix=f"CALLBACK[{callback_func.__name__}]",
-        )
-        def wrapper(*args, **kwargs):
-            return callback_func(*args, **kwargs)
-
-        trace.end_time = datetime.now().isoformat()
+        参数:
+            context: 只包住回调调用本身的上下文管理器（如 CallProfiler），避免记录追踪器自身的帧
+        """
+        trace.start_time = datetime.now().isoformat()
+        start = time.perf_counter_ns()
+        try:
+            with context if context is not None else nullcontext():
+                trace.result = func(*args, **kwargs)
+        except Exception as e:
+            trace.error = repr(e)
+            logger.warning(f"Callback {trace.callback_name} raised {trace.error}")
+        finally:
+            trace.duration_ns = time.perf_counter_ns() - start
+            trace.end_time = datetime.now().isoformat()
+        self.callback_traces.append(trace)
+
+    def trace_callback(
+        self,
+        callback_func: Callable,
+        trigger: str,
+        *args,
+        tracer: str = "profile",
+        max_events: int = 200,
+        interval: float = 0.005,
+        **kwargs,
+    ) -> CallbackTrace:
+        """
+        在指定追踪方式下调用回调，记录纳秒级耗时并以有界抽样的事件填充 execution_path
+
+        参数:
+            callback_func: 回调函数
+            trigger: 触发事件
+            *args, **kwargs: 传给回调的参数
+            tracer: "profile"（CallProfiler 记录函数进入/返回）或 "sample"（SamplingProfiler 热点调用栈）
+            max_events: execution_path 最多保留的事件数
+            interval: 采样间隔（秒），仅 tracer="sample" 时使用
+
+        返回:
+            CallbackTrace
+        """
+        if tracer not in TRACERS:
+            raise ValueError(f"未知的追踪方式: {tracer}")
+        name = getattr(callback_func, "__name__", type(callback_func).__name__)
+        trace = CallbackTrace(callback_name=name, trigger_event=trigger)
+
+        if tracer == "sample":
+            with self.sample(f"callback_{name}", interval=interval) as sampler:
+                self._run_callback(trace, callback_func, args, kwargs)
+            rows = sampler.hot_stacks(None)
+            for row in rows[:max_events]:
+                trace.execution_path.append(
+                    TraceEvent(
+                        timestamp=datetime.fromtimestamp(row["first_seen"]).isoformat(),
+                        function_name=row["function"],
+                        event_type="sample",
+                        line_no=row["line"],
+                        source_line=row["source"],
+                        locals={"samples": row["samples"], "stack": row["stack"]},
+                    )
+                )
+            trace.dropped_events = max(0, len(rows) - max_events)
+            return trace
+
+        from analyzers.call_profiler import EVENT_TYPES, CallProfiler
+
+        profiler = CallProfiler()
+        wall_ns, perf_ns = time.time_ns(), time.perf_counter_ns()
+        self._run_callback(trace, callback_func, args, kwargs, context=profiler)
+        sampler = EventSampler(max_events)
+        # 按代码对象 ID 取行号：不同代码对象可能有相同的限定名（如同一函数中的多个推导式）
+        names = profiler.function_names()
+        timestamps, kinds, cids = profiler.ring.to_arrays()
+        for timestamp, kind, cid in zip(timestamps.tolist(), kinds.tolist(), cids.tolist()):
+            if not sampler.wants():
+                sampler.skip()
+                continue
+            code = profiler.codes[cid]
+            line = code.co_firstlineno
+            sampler.add(
+                TraceEvent(
+                    timestamp=datetime.fromtimestamp((wall_ns + timestamp - perf_ns) / 1e9).isoformat(),
+                    function_name=names[cid],
+                    event_type=EVENT_TYPES[kind],
+                    line_no=line,
+                    source_line=linecache.getline(code.co_filename, line).strip(),
+                    locals={},
+                )
+            )
+        trace.execution_path = sampler.events
+        trace.dropped_events = sampler.dropped + profiler.ring.dropped
         return trace
 
     def trace_function_vars(
-        self, func: Callable, watch_vars: List[str] = None
+        self,
+        func: Callable,
+        watch_vars: Optional[List[str]] = None,
+        *args,
+        max_events: int = 200,
+        **kwargs,
     ) -> CallbackTrace:
-        trace = CallbackTrace(
-            callback_name=func.__name__,
-            trigger_event="function_call",
-            start_time=datetime.now().isoformat(),
-        )
-
-        output_file = self.trace_dir / f"vars_{func.__name__}.log"
-
-        @pysnooper.snoop(
-            str(output_file), watch=watch_vars, depth=2, prefix=f"VARS[{func.__name__}]"
-        )
-        def wrapper(*args, **kwargs):
-            return func(*args, **kwargs)
+        """
+        调用函数并记录其局部变量的变化
+        只为 func 自身的帧安装行级追踪（其余帧不产生行事件），变化值以 repr 截断记录
+
+        参数:
+            func: 被追踪的可调用对象（函数、functools.partial 或定义了 __call__ 的实例）
+            watch_vars: 关注的变量名，None 表示全部局部变量
+            *args, **kwargs: 传给函数的参数
+            max_events: execution_path 最多保留的事件数
+
+        返回:
+            CallbackTrace，事件类型为 call / var / return
+        """
+        target = _target_code(func)
+        name = getattr(func, "__name__", type(func).__name__)
+        trace = CallbackTrace(callback_name=name, trigger_event="function_call")
+        sampler = EventSampler(max_events)
+        filename = target.co_filename if target is not None else ""
+
+        def event(kind: str, line: int, values: Dict[str, Any]) -> TraceEvent:
+            return TraceEvent(
+                timestamp=datetime.now().isoformat(),
+                function_name=name,
+                event_type=kind,
+                line_no=line,
+                source_line=linecache.getline(filename, line).strip(),
+                locals=values,
+            )
 
-        trace.end_time = datetime.now().isoformat()
+        def local_trace(frame, kind, arg):
+            state = frames[frame]
+            if kind in ("line", "return"):
+                changed = {}
+                for var, value in frame.f_locals.items():
+                    if watch_vars is not None and var not in watch_vars:
+                        continue
+                    text = _short_repr(value)
+                    if state["values"].get(var) != text:
+                        state["values"][var] = text
+                        changed[var] = text
+                if changed:
+                    # 行事件在该行执行之前触发，变化来自上一行
+                    sampler.add(event("var", state["line"], changed))
+                state["line"] = frame.f_lineno
+            if kind == "return":
+                sampler.add(event("return", frame.f_lineno, {"return": _short_repr(arg)}))
+                del frames[frame]
+            return local_trace
+
+        def global_trace(frame, kind, arg):
+            if frame.f_code is not target:
+                return None
+            frames[frame] = {"values": {}, "line": frame.f_lineno}
+            sampler.add(event("call", frame.f_lineno, {}))
+            return local_trace
+
+        frames: Dict[Any, Dict[str, Any]] = {}
+        previous = sys.gettrace()
+        try:
+            sys.settrace(global_trace)
+            self._run_callback(trace, func, args, kwargs)
+        finally:
+            sys.settrace(previous)
+        trace.execution_path = sampler.events
+        trace.dropped_events = sampler.dropped
         return trace
 
     def export_callback_report(self, output_path: Path):
         report = {
             "trace_directory": str(self.trace_dir),
             "total_traces": len(list(self.trace_dir.glob("*.log"))),
+            "callbacks": [
+                {
+                    "name": trace.callback_name,
+                    "trigger": trace.trigger_event,
+                    "duration_ns": trace.duration_ns,
+                    "events": len(trace.execution_path),
+                    "dropped_events": trace.dropped_events,
+                    "error": trace.error,
+                }
+                for trace in self.callback_traces
+            ],
         }
 
         with open(output_path, "w", encoding="utf-8") as f:
             json.dump(report, f, indent=2, ensure_ascii=False)
 
     def trace_typer_callback(
-        self, app, callback_type: str = "default"
+        self, app, callback_type: str = "default", *args, tracer: str = "profile", **kwargs
     ) -> CallbackTrace:
-        trace = CallbackTrace(
-            callback_name=f"typer_{callback_type}_callback",
-            trigger_event="app_execution",
-            start_time=datetime.now().isoformat(),
-        )
-
-        output_file = self.trace_dir / f"typer_callback_{callback_type}.log"
-
-        if hasattr(app, "callback") and app.callback:
-            original_callback = app.callback
-
-            @pysnooper.snoop(
-                str(output_file),
-                depth=2,
-                prefix="TYPER_CALLBACK",
-            )
-            def traced_callback(*args, **kwargs):
-                return original_callback(*args, **kwargs)
-
-            trace.end_time = datetime.now().isoformat()
-
+        """
+        执行 Typer 应用注册的回调（@app.callback()）并追踪
+
+        参数:
+            app: Typer 应用；也接受带有可调用 callback 属性的对象
+            callback_type: 回调类别，用于命名
+            *args, **kwargs: 传给回调的参数
+            tracer: 追踪方式，见 TRACERS
+
+        返回:
+            CallbackTrace；应用没有回调时 execution_path 为空且不设置耗时
+        """
+        name = f"typer_{callback_type}_callback"
+        registered = getattr(app, "registered_callback", None)
+        if registered is not None:
+            callback = registered.callback
+        elif hasattr(app, "registered_callback"):
+            callback = None
+        else:
+            callback = getattr(app, "callback", None)
+        if not callable(callback):
+            logger.warning(f"{name}: app has no registered callback")
+            return CallbackTrace(callback_name=name, trigger_event="app_execution")
+
+        trace = self.trace_callback(callback, "app_execution", *args, tracer=tracer, **kwargs)
+        trace.callback_name = name
         return trace
 
     def analyze_callback_patterns(self) -> Dict[str, Any]:
@@ -200,6 +596,12 @@ class DynamicTracer:
                 patterns["callback_types"].get(callback_type, 0) + 1
             )
 
+        for trace in self.callback_traces:
+            patterns["total_callbacks"] += 1
+            patterns["callback_types"][trace.trigger_event] = (
+                patterns["callback_types"].get(trace.trigger_event, 0) + 1
+            )
+
         return patterns
 
     def export_summary_csv(self, output_file: str):
@@ -241,4 +643,7 @@ class DynamicTracer:
             "trace_directory": str(self.trace_dir),
             "callback_traces": len(list(self.trace_dir.glob("callback_*.log"))),
             "typer_traces": len(list(self.trace_dir.glob("typer_*.log"))),
+            "profiles": len(list(self.trace_dir.glob("profile_*.csv"))),
+            "binary_traces": len(list(self.trace_dir.glob("*.trace"))),
+            "samples": len(list(self.trace_dir.glob("sample_*.folded"))),
         }
@@ -0,0 +1,298 @@
+"""
+依赖图导入导出模块
+以流式方式写出 node-link JSON Lines 和紧凑二进制边表（可选 gzip 压缩），导出时不构建整图的中间字典；
+GraphReader 只在打开时读取表头和节点表，边按需流式读取（未压缩的二进制边表直接内存映射）
+"""
+
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+from pathlib import Path
+import gzip
+import json
+import struct
+
+import numpy as np
+
+from analyzers.compact_graph import CompactGraph, NODE_TYPES
+
+# 二进制边表格式：
+#   MAGIC | <II 节点数, 边数 | 节点标志 uint8[节点数] | <Q 名称字节数 | 以 \0 结尾的 UTF-8 名称 | int32[边数, 2]
+MAGIC = b"DEPGRAPH\x01"
+_COUNTS = struct.Struct("<II")
+_NAMES_SIZE = struct.Struct("<Q")
+EDGE_DTYPE = np.dtype("<i4")
+
+FORMATS = ("jsonl", "binary")
+
+
+def _open(path: Path, mode: str) -> IO:
+    if path.suffix == ".gz":
+        return gzip.open(path, mode)
+    return open(path, mode)
+
+
+def detect_format(path) -> str:
+    """根据扩展名判断格式：.jsonl[.gz] 为 jsonl，.bin/.depg[.gz] 为 binary"""
+    suffixes = [s for s in Path(path).suffixes if s != ".gz"]
+    if suffixes and suffixes[-1] == ".jsonl":
+        return "jsonl"
+    if suffixes and suffixes[-1] in (".bin", ".depg"):
+        return "binary"
+    raise ValueError(f"无法从扩展名判断图文件格式: {path}")
+
+
+def _graph_view(graph) -> Tuple[List[str], np.ndarray, Iterator[np.ndarray]]:
+    """统一 CompactGraph / networkx.DiGraph：返回 (节点名称, 节点标志, 边块迭代器)"""
+    if isinstance(graph, CompactGraph):
+        return graph.names, graph.node_flags(), graph.edge_chunks()
+
+    names = list(graph.nodes)
+    ids = {name: i for i, name in enumerate(names)}
+    flags = np.fromiter(
+        (
+            NODE_TYPES.index(data.get("type", "file")) | (int(bool(data.get("stdlib"))) << 1)
+            for _, data in graph.nodes(data=True)
+        ),
+        dtype=np.uint8,
+        count=len(names),
+    )
+
+    def chunks(chunk_size: int = 1 << 16) -> Iterator[np.ndarray]:
+        buffer = np.empty((chunk_size, 2), dtype=np.int32)
+        filled = 0
+        for source, target in graph.edges():
+            buffer[filled] = (ids[source], ids[target])
+            filled += 1
+            if filled == chunk_size:
+                yield buffer.copy()
+                filled = 0
+        if filled:
+            yield buffer[:filled].copy()
+
+    return names, flags, chunks()
+
+
+def _node_attrs(flag: int) -> Dict[str, Any]:
+    attrs = {"type": NODE_TYPES[flag & 1]}
+    if flag & 1:
+        attrs["stdlib"] = bool(flag & 2)
+    return attrs
+
+
+def write_jsonl(graph, output_path) -> int:
+    """
+    流式写出 node-link JSON Lines：首行为图信息，之后每行一个节点或一条边
+
+    参数:
+        graph: CompactGraph 或 networkx.DiGraph
+        output_path: 输出路径，以 .gz 结尾时 gzip 压缩
+
+    返回:
+        写出的边数
+    """
+    path = Path(output_path)
+    names, flags, chunks = _graph_view(graph)
+    edges = 0
+    with _open(path, "wt") as f:
+        f.write(json.dumps({"directed": True, "multigraph": False, "nodes": len(names)}) + "\n")
+        for name, flag in zip(names, flags.tolist()):
+            f.write(json.dumps({"kind": "node", "id": name, **_node_attrs(flag)}, ensure_ascii=False) + "\n")
+        for chunk in chunks:
+            for source, target in chunk.tolist():
+                f.write(
+                    json.dumps(
+                        {"kind": "edge", "source": names[source], "target": names[target]},
+                        ensure_ascii=False,
+                    )
+                    + "\n"
+                )
+            edges += len(chunk)
+    return edges
+
+
+def write_edge_list(graph, output_path) -> int:
+    """
+    写出紧凑二进制边表（节点表 + int32 边对）
+
+    参数:
+        graph: CompactGraph 或 networkx.DiGraph
+        output_path: 输出路径，以 .gz 结尾时 gzip 压缩
+
+    返回:
+        写出的边数
+    """
+    path = Path(output_path)
+    names, flags, chunks = _graph_view(graph)
+    edge_count = graph.number_of_edges()
+    with _open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(_COUNTS.pack(len(names), edge_count))
+        f.write(flags.astype(np.uint8).tobytes())
+        encoded = [name.encode("utf-8") + b"\0" for name in names]
+        f.write(_NAMES_SIZE.pack(sum(map(len, encoded))))
+        f.writelines(encoded)
+        del encoded
+        written = 0
+        for chunk in chunks:
+            f.write(chunk.astype(EDGE_DTYPE, copy=False).tobytes())
+            written += len(chunk)
+    if written != edge_count:
+        raise ValueError(f"边数不一致: 表头 {edge_count}，实际 {written}")
+    return written
+
+
+def write_graph(graph, output_path, fmt: Optional[str] = None) -> int:
+    """
+    按格式写出依赖图
+
+    参数:
+        graph: CompactGraph 或 networkx.DiGraph
+        output_path: 输出路径
+        fmt: "jsonl" / "binary"，None 时根据扩展名判断
+    """
+    fmt = fmt or detect_format(output_path)
+    if fmt not in FORMATS:
+        raise ValueError(f"未知的图文件格式: {fmt}")
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "jsonl":
+        return write_jsonl(graph, output_path)
+    return write_edge_list(graph, output_path)
+
+
+class GraphReader:
+    """
+    依赖图读取器
+    打开时只解析表头和节点表；edges() 流式产出边块，to_compact()/to_networkx() 按需重建整图
+    """
+
+    def __init__(self, path, fmt: Optional[str] = None, chunk_size: int = 1 << 16):
+        """
+        打开图文件
+
+        参数:
+            path: 图文件路径
+            fmt: "jsonl" / "binary"，None 时根据扩展名判断
+            chunk_size: 流式读取时每块的边数
+        """
+        self.path = Path(path)
+        self.format = fmt or detect_format(path)
+        self.chunk_size = chunk_size
+        self.names: List[str] = []
+        self.flags = np.zeros(0, dtype=np.uint8)
+        self.edge_count: Optional[int] = None
+        self._edges_offset = 0
+        if self.format == "binary":
+            self._read_binary_header()
+        else:
+            self._read_jsonl_nodes()
+
+    def _read_binary_header(self):
+        with _open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"不是依赖图二进制文件: {self.path}")
+            node_count, self.edge_count = _COUNTS.unpack(f.read(_COUNTS.size))
+            self.flags = np.frombuffer(f.read(node_count), dtype=np.uint8)
+            (names_size,) = _NAMES_SIZE.unpack(f.read(_NAMES_SIZE.size))
+            names = f.read(names_size).decode("utf-8")
+            self.names = names.split("\0")[:-1] if names else []
+        self._edges_offset = len(MAGIC) + _COUNTS.size + node_count + _NAMES_SIZE.size + names_size
+
+    def _read_jsonl_nodes(self):
+        names, flags = [], []
+        with _open(self.path, "rt") as f:
+            next(f, None)
+            for line in f:
+                record = json.loads(line)
+                if record["kind"] != "node":
+                    break
+                names.append(record["id"])
+                flags.append(NODE_TYPES.index(record["type"]) | (int(record.get("stdlib", False)) << 1))
+        self.names = names
+        self.flags = np.array(flags, dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def nodes(self, data: bool = False) -> List[Any]:
+        if not data:
+            return list(self.names)
+        return [(name, _node_attrs(flag)) for name, flag in zip(self.names, self.flags.tolist())]
+
+    def edge_array(self) -> np.ndarray:
+        """
+        全部边的 (m, 2) 数组；未压缩的二进制文件直接内存映射，不读入内存
+        """
+        if self.format == "binary" and self.path.suffix != ".gz":
+            if not self.edge_count:
+                return np.zeros((0, 2), dtype=EDGE_DTYPE)
+            return np.memmap(
+                self.path, dtype=EDGE_DTYPE, mode="r", offset=self._edges_offset, shape=(self.edge_count, 2)
+            )
+        chunks = list(self.edges())
+        return np.concatenate(chunks) if chunks else np.zeros((0, 2), dtype=EDGE_DTYPE)
+
+    def edges(self) -> Iterator[np.ndarray]:
+        """流式产出边块（(k, 2) int32 数组，元素为节点 ID）"""
+        if self.format == "binary":
+            yield from self._binary_edges()
+        else:
+            yield from self._jsonl_edges()
+
+    def _binary_edges(self) -> Iterator[np.ndarray]:
+        block = self.chunk_size * 2 * EDGE_DTYPE.itemsize
+        with _open(self.path, "rb") as f:
+            f.seek(self._edges_offset)
+            while True:
+                data = f.read(block)
+                if not data:
+                    break
+                yield np.frombuffer(data, dtype=EDGE_DTYPE).reshape(-1, 2)
+
+    def _jsonl_edges(self) -> Iterator[np.ndarray]:
+        ids = {name: i for i, name in enumerate(self.names)}
+        buffer: List[Tuple[int, int]] = []
+        with _open(self.path, "rt") as f:
+            for line in f:
+                if '"edge"' not in line:
+                    continue
+                record = json.loads(line)
+                if record.get("kind") != "edge":
+                    continue
+                buffer.append((ids[record["source"]], ids[record["target"]]))
+                if len(buffer) == self.chunk_size:
+                    yield np.array(buffer, dtype=EDGE_DTYPE)
+                    buffer = []
+        if buffer:
+            yield np.array(buffer, dtype=EDGE_DTYPE)
+
+    def iter_edges(self) -> Iterator[Tuple[str, str]]:
+        """逐条产出 (source, target) 名称对"""
+        names = self.names
+        for chunk in self.edges():
+            for source, target in chunk.tolist():
+                yield names[source], names[target]
+
+    def to_compact(self) -> CompactGraph:
+        """重建 CompactGraph"""
+        return CompactGraph.from_arrays(self.names, self.flags, self.edge_array())
+
+    def to_networkx(self):
+        """重建 networkx.DiGraph"""
+        import networkx as nx
+
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self.nodes(data=True))
+        graph.add_edges_from(self.iter_edges())
+        return graph
+
+
+def load_graph(path, backend: str = "compact", fmt: Optional[str] = None):
+    """
+    读取依赖图
+
+    参数:
+        path: 图文件路径
+        backend: "compact" 返回 CompactGraph，"networkx" 返回 networkx.DiGraph
+        fmt: 文件格式，None 时根据扩展名判断
+    """
+    reader = GraphReader(path, fmt)
+    return reader.to_compact() if backend == "compact" else reader.to_networkx()
@@ -0,0 +1,161 @@
+"""
+导入解析模块
+由文件列表一次性构建 模块名 -> 文件 的索引，把绝对导入和相对导入解析为仓库内的文件，
+无法解析到仓库内的导入标记为外部包
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from pathlib import Path
+import sys
+
+STDLIB_MODULES = frozenset(getattr(sys, "stdlib_module_names", ())) | frozenset(sys.builtin_module_names)
+
+
+def module_names(rel_path: str, package_dirs: frozenset) -> List[str]:
+    """
+    文件对应的模块名
+
+    依次给出相对仓库根目录的完整模块名，以及相对其最外层包所在目录的模块名
+    （如 src/pkg/mod.py 在 src 不是包时还对应 pkg.mod）
+
+    参数:
+        rel_path: 相对仓库根目录的 POSIX 路径
+        package_dirs: 含 __init__.py 的目录（相对路径）集合
+
+    返回:
+        模块名列表（去重，保持顺序）
+    """
+    path_parts = rel_path.split("/")
+    dir_parts = path_parts[:-1]
+    stem = path_parts[-1][:-3] if path_parts[-1].endswith(".py") else path_parts[-1]
+    parts = dir_parts if stem == "__init__" else dir_parts + [stem]
+    if not parts:
+        return []
+    names = [".".join(parts)]
+
+    # 从文件所在目录向上越过连续的包目录，停下的位置即源码根目录
+    root = len(dir_parts)
+    while root > 0 and "/".join(dir_parts[:root]) in package_dirs:
+        root -= 1
+    short = ".".join(parts[root:])
+    if short and short not in names:
+        names.append(short)
+    return names
+
+
+class ModuleIndex:
+    """
+    模块名 -> 文件 索引
+    同名模块以先出现的为准；相对仓库根目录的完整名优先于相对源码根目录的短名
+    """
+
+    def __init__(self, files: Iterable[str] = ()):
+        """
+        构建索引
+
+        参数:
+            files: 相对仓库根目录的 POSIX 路径
+        """
+        self.files: List[str] = sorted(f for f in files if f.endswith(".py"))
+        self.package_dirs = frozenset(
+            f[: -len("/__init__.py")] for f in self.files if f.endswith("/__init__.py")
+        )
+        self.modules: Dict[str, str] = {}
+        self.file_modules: Dict[str, str] = {}
+        per_file = {f: module_names(f, self.package_dirs) for f in self.files}
+        for rank in (0, 1):
+            for rel_path, names in per_file.items():
+                if rank < len(names):
+                    self.modules.setdefault(names[rank], rel_path)
+        for rel_path, names in per_file.items():
+            if names:
+                self.file_modules[rel_path] = names[-1]
+
+    @classmethod
+    def from_paths(cls, repo_path: Path, paths: Iterable[Path]) -> "ModuleIndex":
+        """由绝对路径（如 FileDiscovery 的结果）构建索引"""
+        root = Path(repo_path)
+        return cls(Path(p).relative_to(root).as_posix() for p in paths)
+
+    def __contains__(self, module: str) -> bool:
+        return module in self.modules
+
+    def lookup(self, module: str) -> Optional[str]:
+        """模块名对应的文件，不存在返回 None"""
+        return self.modules.get(module)
+
+    def package_of(self, rel_path: str) -> str:
+        """文件所属包的模块名（__init__.py 属于自身所在包）"""
+        module = self.file_modules.get(rel_path, "")
+        if rel_path.endswith("__init__.py"):
+            return module
+        return module.rpartition(".")[0]
+
+
+class ImportResolver:
+    """
+    导入解析器
+    解析结果为 (kind, target)：kind 为 "file" 时 target 是仓库内文件，
+    为 "external" 时 target 是顶层包名，为 "unresolved" 时 target 是原始导入文本（如越界的相对导入）
+    """
+
+    def __init__(self, index: ModuleIndex):
+        self.index = index
+
+    def resolve_import(self, module: str) -> Tuple[str, str]:
+        """
+        解析 import a.b.c：取索引中存在的最长前缀
+
+        参数:
+            module: 导入的模块名
+        """
+        parts = module.split(".")
+        for end in range(len(parts), 0, -1):
+            target = self.index.lookup(".".join(parts[:end]))
+            if target is not None:
+                return "file", target
+        return "external", parts[0]
+
+    def resolve_from(self, rel_path: str, module: Optional[str], names: Iterable[str],
+                     level: int = 0) -> List[Tuple[str, str]]:
+        """
+        解析 from ... import ...
+
+        参数:
+            rel_path: 导入语句所在文件
+            module: from 后的模块名（from . import x 时为 None）
+            names: 导入的名称
+            level: 相对导入的层数
+
+        返回:
+            去重后的解析结果列表
+        """
+        if level:
+            package_name = self.index.package_of(rel_path)
+            package = package_name.split(".") if package_name else []
+            # 不能越过最外层包；不在包中的脚本把 from . import x 视为同目录导入
+            if level - 1 >= len(package) and not (level == 1 and not package):
+                return [("unresolved", "." * level + (module or ""))]
+            base = package[: len(package) - (level - 1)]
+            if module:
+                base = base + module.split(".")
+            base_name = ".".join(base)
+        else:
+            base_name = module or ""
+
+        results: List[Tuple[str, str]] = []
+        for name in names:
+            # from pkg import submodule 指向子模块文件，from pkg import func 指向 pkg 本身
+            target = self.index.lookup(f"{base_name}.{name}" if base_name else name)
+            if target is not None:
+                results.append(("file", target))
+                continue
+            if base_name:
+                if level:
+                    found = self.index.lookup(base_name)
+                    results.append(("file", found) if found else ("unresolved", "." * level + (module or "")))
+                else:
+                    results.append(self.resolve_import(base_name))
+            else:
+                results.append(("unresolved", "." * level + name))
+        return list(dict.fromkeys(results))
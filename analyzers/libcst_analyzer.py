@@ -4,10 +4,16 @@ LibCST 类型注解分析器模块
 """
 
 import libcst as cst
+from libcst.metadata import PositionProvider
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 from dataclasses import dataclass
 import json
+import os
+
+from analyzers.annotation_index import AnnotationIndex
+from utils.bounded_pool import QUARANTINE_STATUSES, BoundedWorkerPool, Quarantine, run_serial
+from utils.source_loader import SourceLoader
 
 
 @dataclass
@@ -15,7 +21,7 @@ class TypeAnnotationInfo:
     """类型注解信息"""
 
     file_path: str  # 文件路径
-    function_name: str  # 函数名称
+    function_name: str  # 函数限定名（外层类/函数名加点号前缀，如 Handler.handle）
     arg_name: str  # 参数名称
     annotation: str  # 注解内容
     line_no: int  # 行号
@@ -33,23 +39,54 @@ class CoverageStats:
     coverage_percentage: float  # 覆盖率百分比
 
 
+@dataclass
+class FileAnnotations:
+    """单个文件的覆盖率统计（注解记录的查找统一走分析器的 AnnotationIndex）"""
+
+    file_path: str  # 文件路径（相对仓库）
+    coverage: Dict[str, int]  # 文件级覆盖率统计
+    functions: Dict[str, Dict[str, int]]  # 函数限定名 -> 函数级覆盖率统计
+
+
 class LibCSTAnalyzer:
     """
     LibCST 类型注解分析器
     负责分析 Python 代码的类型注解覆盖率和质量
     """
 
-    def __init__(self, repo_path: str):
+    BACKENDS = ("libcst", "ast")
+    # "函数" 为不带外层作用域的函数名，"限定名" 区分不同类中的同名方法
+    CSV_HEADERS = ["文件", "函数", "参数", "注解", "限定名"]
+
+    def __init__(
+        self, repo_path: str, backend: str = "libcst", positions: bool = False
+    ):
         """
         初始化分析器
 
         参数:
             repo_path: 仓库路径
+            backend: 解析后端，"libcst"（保留源码原样的注解文本）或
+                "ast"（快速路径，注解文本经 ast.unparse 规范化）
+            positions: 是否记录注解所在行号（LibCST 后端需额外计算位置元数据）
         """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"未知的解析后端: {backend}")
         self.repo_path = Path(repo_path)
+        self.backend = backend
+        self.positions = positions
+        self.file_index: Dict[str, FileAnnotations] = {}
+        self._index = AnnotationIndex()
+        self.sinks = []
         self.type_annotations: List[TypeAnnotationInfo] = []
         self.coverage_data: Dict[str, Any] = {}
         self.errors: List[str] = []
+        self.loader = SourceLoader()
+
+    @property
+    def skipped_files(self):
+        """被跳过的文件（含原因）"""
+        return self.loader.skipped
 
     def parse_file(self, file_path: Path) -> Optional[cst.Module]:
         """
@@ -61,16 +98,20 @@ class LibCSTAnalyzer:
         返回:
             解析后的 CST 模块，失败则返回 None
         """
+        content = self.loader.read_text(file_path)
+        if content is None:
+            self.errors.append(f"读取错误 {file_path}: {self.loader.skipped[-1].reason}")
+            return None
+        if not content.strip():
+            return None
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-            if not content.strip():
-                return None
             return cst.parse_module(content)
         except cst.ParserSyntaxError as e:
+            self.loader.skip(file_path, e)
             self.errors.append(f"语法错误 {file_path}: {e}")
             return None
         except Exception as e:
+            self.loader.skip(file_path, e)
             self.errors.append(f"解析错误 {file_path}: {e}")
             return None
 
@@ -81,46 +122,219 @@ class LibCSTAnalyzer:
         参数:
             file_path: 文件路径
         """
+        result = self._collect_file(file_path)
+        if result is not None:
+            self._record_file(file_path, *result)
+
+    def _collect_file(
+        self, file_path: Path
+    ) -> Optional[Tuple[List[TypeAnnotationInfo], Dict[str, int], Dict[str, Dict[str, int]]]]:
+        """解析并遍历单个文件，返回 (注解列表, 覆盖率统计, 函数级统计)，不修改分析器状态"""
+        if self.backend == "ast":
+            return self._collect_file_ast(file_path)
+
         tree = self.parse_file(file_path)
         if not tree:
-            return
+            return None
 
         try:
-            visitor = TypeCollector(str(file_path.relative_to(self.repo_path)))
-            tree.visit(visitor)
-            self.type_annotations.extend(visitor.annotations)
-            self.coverage_data[str(file_path)] = visitor.coverage_stats
+            relative_path = str(file_path.relative_to(self.repo_path))
+            if self.positions:
+                visitor = PositionedTypeCollector(relative_path)
+                cst.MetadataWrapper(tree, unsafe_skip_copy=True).visit(visitor)
+            else:
+                visitor = TypeCollector(relative_path)
+                tree.visit(visitor)
+            return visitor.annotations, visitor.coverage_stats, visitor.function_stats
         except Exception as e:
             self.errors.append(f"分析错误 {file_path}: {e}")
+            return None
 
-    def get_annotation_stats(self) -> Dict[str, Any]:
+    def _collect_file_ast(
+        self, file_path: Path
+    ) -> Optional[Tuple[List[TypeAnnotationInfo], Dict[str, int], Dict[str, Dict[str, int]]]]:
+        """快速路径：使用标准库 ast 收集注解，统计口径与 TypeCollector 一致"""
+        from analyzers.ast_type_collector import AstTypeCollector
+
+        tree = self.loader.parse_ast(file_path)
+        if tree is None:
+            self.errors.append(f"语法错误 {file_path}: {self.loader.skipped[-1].reason}")
+            return None
+        if not tree.body:
+            # 与 LibCST 路径一致：纯空白文件不计入覆盖率数据
+            content = self.loader.read_text(file_path)
+            if content is None or not content.strip():
+                return None
+
+        try:
+            visitor = AstTypeCollector(
+                str(file_path.relative_to(self.repo_path)), positions=self.positions
+            )
+            visitor.visit(tree)
+            return visitor.annotations, visitor.coverage_stats, visitor.function_stats
+        except Exception as e:
+            self.errors.append(f"分析错误 {file_path}: {e}")
+            return None
+
+    def _record_file(
+        self,
+        file_path: Path,
+        annotations: List[TypeAnnotationInfo],
+        coverage_stats: Dict[str, int],
+        function_stats: Dict[str, Dict[str, int]],
+    ):
+        """合并单个文件的分析结果"""
+        self.type_annotations.extend(annotations)
+        for ann in annotations:
+            self._index.add(ann)
+        for sink in self.sinks:
+            for ann in annotations:
+                sink.write_row(self._annotation_row(ann))
+            sink.flush()
+        self.coverage_data[str(file_path)] = coverage_stats
+
+        entry = FileAnnotations(
+            file_path=str(file_path.relative_to(self.repo_path)),
+            coverage=coverage_stats,
+            functions=function_stats,
+        )
+        self.file_index[entry.file_path] = entry
+
+    def add_sink(self, sink):
         """
-        获取注解统计信息
+        注册流式写入器，每个文件分析完成后立即写出其注解行（列名同 CSV_HEADERS）
+
+        参数:
+            sink: 具有 write_row(dict) 和 flush() 方法的对象
+        """
+        self.sinks.append(sink)
+
+    @property
+    def index(self) -> AnnotationIndex:
+        """注解索引（随每个文件的分析结果增量更新）"""
+        return self._index
+
+    def query_annotations(
+        self,
+        file_path: Optional[str] = None,
+        function_name: Optional[str] = None,
+        arg_name: Optional[str] = None,
+        generic: Optional[str] = None,
+    ) -> List[TypeAnnotationInfo]:
+        """
+        按文件、函数、参数名、泛型基类型组合查询注解
 
         返回:
-            包含注解统计的字典
+            匹配的注解列表
         """
-        total_annotations = len(self.type_annotations)
-        arg_annotations = sum(
-            1 for a in self.type_annotations if a.arg_name != "return"
-        )
-        return_annotations = sum(
-            1 for a in self.type_annotations if a.arg_name == "return"
+        return self.index.query(file_path, function_name, arg_name, generic)
+
+    def get_file_annotations(self, file_path: str) -> Optional[FileAnnotations]:
+        """
+        获取单个文件的注解索引
+
+        参数:
+            file_path: 相对仓库的文件路径
+
+        返回:
+            FileAnnotations，未分析过则返回 None
+        """
+        return self.file_index.get(file_path)
+
+    def find_annotations(
+        self,
+        file_path: str,
+        function_name: Optional[str] = None,
+        line_no: Optional[int] = None,
+    ) -> List[TypeAnnotationInfo]:
+        """
+        按文件/函数/行号查找注解（行号查找需 positions=True）
+
+        参数:
+            file_path: 相对仓库的文件路径
+            function_name: 函数限定名（可选，如 Handler.handle）
+            line_no: 行号（可选）
+
+        返回:
+            匹配的注解列表
+        """
+        return self.index.query(file_path, function_name, line_no=line_no)
+
+    def analyze_files(
+        self,
+        file_paths: Sequence[Path],
+        workers: Optional[int] = None,
+        chunksize: int = 8,
+        time_limit: Optional[float] = None,
+        memory_limit: Optional[int] = None,
+        quarantine: Optional[Quarantine] = None,
+    ):
+        """
+        批量分析文件，workers > 1 时使用资源受限的进程池并行解析
+
+        每个工作进程持有自己的分析器，只返回注解列表和覆盖率统计，
+        由父进程按输入顺序合并，因此结果与串行分析完全一致。
+        超时、超内存或导致进程崩溃的文件被跳过并写入隔离清单，下次运行直接跳过。
+
+        参数:
+            file_paths: 文件路径列表
+            workers: 进程数，默认使用 CPU 核数；1 表示在当前进程串行（只在主线程中施加时间上限）
+            chunksize: 每次分派给工作进程的文件数
+            time_limit: 单个文件的时间上限（秒）
+            memory_limit: 单个工作进程的内存上限（字节）
+            quarantine: 隔离清单
+        """
+        if quarantine is not None:
+            file_paths, quarantined = quarantine.partition(file_paths)
+            for file_path, reason in quarantined:
+                self.loader.skip(file_path, f"已隔离: {reason}")
+
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1 or len(file_paths) < 2:
+            # 只有解析在计时器下执行，记录结果时计时器已取消
+            for outcome in run_serial(self._collect_file, file_paths, time_limit=time_limit):
+                if outcome.status != "ok":
+                    self.loader.skip(outcome.item, outcome.error)
+                    if quarantine is not None and outcome.status in QUARANTINE_STATUSES:
+                        quarantine.add(outcome.item, outcome.error)
+                elif outcome.result is not None:
+                    self._record_file(outcome.item, *outcome.result)
+            return
+
+        pool = BoundedWorkerPool(
+            _analyze_in_worker,
+            workers=workers,
+            time_limit=time_limit,
+            memory_limit=memory_limit,
+            initializer=_init_worker,
+            initargs=(str(self.repo_path), self.backend, self.positions),
         )
+        for outcome in pool.map([str(p) for p in file_paths], chunksize=chunksize):
+            if outcome.status != "ok":
+                self.loader.skip(outcome.item, outcome.error)
+                if quarantine is not None and outcome.status in QUARANTINE_STATUSES:
+                    quarantine.add(outcome.item, outcome.error)
+                continue
+            file_path, result, errors, skipped = outcome.result
+            self.errors.extend(errors)
+            self.loader.skipped.extend(skipped)
+            if result is not None:
+                self._record_file(Path(file_path), *result)
 
-        # 分析泛型类型使用情况
-        generics = {}
-        for ann in self.type_annotations:
-            if "[" in ann.annotation:
-                base_type = ann.annotation.split("[")[0]
-                generics[base_type] = generics.get(base_type, 0) + 1
+    def get_annotation_stats(self) -> Dict[str, Any]:
+        """
+        获取注解统计信息
 
+        返回:
+            包含注解统计的字典
+        """
+        index = self.index
         return {
-            "注解总数": total_annotations,
-            "参数注解数": arg_annotations,
-            "返回值注解数": return_annotations,
+            "注解总数": index.total,
+            "参数注解数": index.arg_count,
+            "返回值注解数": index.return_count,
             "错误数": len(self.errors),
-            "泛型类型": generics,
+            "泛型类型": index.generic_counts(),
         }
 
     def calculate_coverage(self) -> CoverageStats:
@@ -156,37 +370,49 @@ class LibCSTAnalyzer:
             coverage_percentage=coverage_pct,
         )
 
-    def export_coverage_report(self, output_path: Path):
+    def export_coverage_report(self, output_path: Path, fmt: Optional[str] = None):
         """
         导出覆盖率报告
 
         参数:
             output_path: 输出文件路径
+            fmt: "json"（单个 JSON 文档）或 "jsonl"（逐行流式写出），默认按扩展名推断
         """
-        stats = self.calculate_coverage()
+        fmt = fmt or ("jsonl" if Path(output_path).suffix in (".jsonl", ".ndjson") else "json")
+        if fmt == "jsonl":
+            self._export_coverage_jsonl(output_path)
+            return
+
         report = {
-            "覆盖率统计": {
-                "函数总数": stats.total_functions,
-                "有注解函数数": stats.annotated_functions,
-                "参数总数": stats.total_params,
-                "有注解参数数": stats.annotated_params,
-                "返回值注解数": stats.return_annotated,
-                "覆盖率": round(stats.coverage_percentage, 2),
-            },
+            "覆盖率统计": self._coverage_summary(),
             "错误列表": self.errors,
-            "注解详情": [
-                {
-                    "文件": ann.file_path,
-                    "函数": ann.function_name,
-                    "参数": ann.arg_name,
-                    "注解": ann.annotation,
-                }
-                for ann in self.type_annotations
-            ],
+            "注解详情": [self._annotation_row(ann) for ann in self.type_annotations],
         }
         with open(output_path, "w", encoding="utf-8") as f:
             json.dump(report, f, indent=2, ensure_ascii=False)
 
+    def _coverage_summary(self) -> Dict[str, Any]:
+        stats = self.calculate_coverage()
+        return {
+            "函数总数": stats.total_functions,
+            "有注解函数数": stats.annotated_functions,
+            "参数总数": stats.total_params,
+            "有注解参数数": stats.annotated_params,
+            "返回值注解数": stats.return_annotated,
+            "覆盖率": round(stats.coverage_percentage, 2),
+        }
+
+    def _export_coverage_jsonl(self, output_path: Path):
+        """以 JSON Lines 写出覆盖率报告：首行为统计，之后每行一条错误或注解"""
+        from utils.streaming import JSONLStreamWriter
+
+        with JSONLStreamWriter(str(output_path)) as writer:
+            writer.write_row({"类型": "覆盖率统计", **self._coverage_summary()})
+            for error in self.errors:
+                writer.write_row({"类型": "错误", "消息": error})
+            for ann in self.type_annotations:
+                writer.write_row({"类型": "注解", **self._annotation_row(ann)})
+
     def export_to_csv(self, output_file: str):
         """
         导出注解数据到 CSV 文件
@@ -196,21 +422,12 @@ class LibCSTAnalyzer:
         """
         import csv
 
-        headers = ["文件", "函数", "参数", "注解"]
-
         with open(output_file, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=headers)
+            writer = csv.DictWriter(f, fieldnames=self.CSV_HEADERS)
             writer.writeheader()
 
             for ann in self.type_annotations:
-                writer.writerow(
-                    {
-                        "文件": ann.file_path,
-                        "函数": ann.function_name,
-                        "参数": ann.arg_name,
-                        "注解": ann.annotation,
-                    }
-                )
+                writer.writerow(self._annotation_row(ann))
 
     def extract_annotations(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
@@ -222,26 +439,24 @@ class LibCSTAnalyzer:
         返回:
             注解字典列表
         """
-        annotations = []
-        for ann in self.type_annotations:
-            annotations.append(
-                {
-                    "文件": ann.file_path,
-                    "函数": ann.function_name,
-                    "参数": ann.arg_name,
-                    "注解": ann.annotation,
-                }
-            )
+        selected = self.type_annotations[:limit] if limit else self.type_annotations
+        return [self._annotation_row(ann) for ann in selected]
 
-        if limit:
-            return annotations[:limit]
-        return annotations
+    @staticmethod
+    def _annotation_row(ann: TypeAnnotationInfo) -> Dict[str, Any]:
+        return {
+            "文件": ann.file_path,
+            "函数": ann.function_name.rsplit(".", 1)[-1],
+            "参数": ann.arg_name,
+            "注解": ann.annotation,
+            "限定名": ann.function_name,
+        }
 
 
 class TypeCollector(cst.CSTVisitor):
     """
     类型注解收集器
-    遍历 CST 收集所有类型注解信息
+    遍历 CST 收集所有类型注解信息；函数以限定名记录，不同类中的同名方法互不合并
     """
 
     def __init__(self, file_path: str):
@@ -249,11 +464,13 @@ class TypeCollector(cst.CSTVisitor):
         self.file_path = file_path
         self.annotations: List[TypeAnnotationInfo] = []
         self.current_function: Optional[str] = None
+        self._scope: List[str] = []
         self.total_functions = 0
         self.annotated_functions = 0
         self.total_params = 0
         self.annotated_params = 0
         self.return_annotated = 0
+        self.function_stats: Dict[str, Dict[str, int]] = {}
 
     @property
     def coverage_stats(self) -> Dict[str, int]:
@@ -266,23 +483,35 @@ class TypeCollector(cst.CSTVisitor):
             "return_annotated": self.return_annotated,
         }
 
+    def visit_ClassDef(self, node: cst.ClassDef):
+        self._scope.append(node.name.value)
+
+    def leave_ClassDef(self, original_node: cst.ClassDef):
+        self._scope.pop()
+
     def visit_FunctionDef(self, node: cst.FunctionDef):
         """访问函数定义节点"""
-        self.current_function = node.name.value
+        qualname = ".".join(self._scope + [node.name.value])
+        self._scope.append(node.name.value)
+        self.current_function = qualname
         self.total_functions += 1
         has_annotation = False
+        stats = self._function_entry(qualname, node)
 
         # 检查返回值注解
         if node.returns:
-            self._add_annotation("return", node.returns.annotation, node.name.value)
+            self._add_annotation("return", node.returns.annotation, qualname)
             self.return_annotated += 1
+            stats["return_annotated"] += 1
             has_annotation = True
 
         # 检查参数注解
         for param in node.params.params:
             self.total_params += 1
+            stats["total_params"] += 1
             if param.annotation:
                 self.annotated_params += 1
+                stats["annotated_params"] += 1
                 has_annotation = True
 
         if has_annotation:
@@ -290,6 +519,7 @@ class TypeCollector(cst.CSTVisitor):
 
     def leave_FunctionDef(self, original_node: cst.FunctionDef):
         """离开函数定义节点"""
+        self._scope.pop()
         self.current_function = None
 
     def visit_Param(self, node: cst.Param):
@@ -299,6 +529,22 @@ class TypeCollector(cst.CSTVisitor):
                 node.name.value, node.annotation.annotation, self.current_function
             )
 
+    def _function_entry(self, name: str, node: cst.CSTNode) -> Dict[str, int]:
+        """获取函数级统计条目（限定名相同的函数累加，如条件分支中的重复定义）"""
+        entry = self.function_stats.get(name)
+        if entry is None:
+            entry = self.function_stats[name] = {
+                "lineno": self._line_for(node),
+                "total_params": 0,
+                "annotated_params": 0,
+                "return_annotated": 0,
+            }
+        return entry
+
+    def _line_for(self, node: cst.CSTNode) -> int:
+        """节点起始行号；未请求位置信息时为 0"""
+        return 0
+
     def _add_annotation(
         self, arg_name: str, annotation_node: cst.BaseExpression, func_name: str
     ):
@@ -311,8 +557,38 @@ class TypeCollector(cst.CSTVisitor):
                     function_name=func_name,
                     arg_name=arg_name,
                     annotation=annotation_str,
-                    line_no=0,
+                    line_no=self._line_for(annotation_node),
                 )
             )
         except Exception:
             pass
+
+
+class PositionedTypeCollector(TypeCollector):
+    """
+    带位置信息的类型注解收集器
+    在同一次遍历中通过 PositionProvider 元数据获取行号，需经 MetadataWrapper 访问
+    """
+
+    METADATA_DEPENDENCIES = (PositionProvider,)
+
+    def _line_for(self, node: cst.CSTNode) -> int:
+        return self.get_metadata(PositionProvider, node).start.line
+
+
+# 工作进程内的分析器实例（每个进程一个，避免重复初始化）
+_worker_analyzer: Optional[LibCSTAnalyzer] = None
+
+
+def _init_worker(repo_path: str, backend: str = "libcst", positions: bool = False):
+    global _worker_analyzer
+    _worker_analyzer = LibCSTAnalyzer(repo_path, backend=backend, positions=positions)
+
+
+def _analyze_in_worker(file_path: str):
+    """在工作进程中分析单个文件，返回可序列化的结果"""
+    analyzer = _worker_analyzer
+    analyzer.errors = []
+    analyzer.loader.skipped = []
+    result = analyzer._collect_file(Path(file_path))
+    return file_path, result, analyzer.errors, analyzer.loader.skipped
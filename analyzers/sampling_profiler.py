@@ -0,0 +1,197 @@
+"""
+采样剖析模块
+后台线程按固定间隔读取 sys._current_frames()，把目标线程的调用栈聚合为折叠栈计数；
+折叠栈输出与 flamegraph.pl / speedscope 等火焰图工具兼容
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from collections import Counter
+from datetime import datetime
+import linecache
+import sys
+import threading
+import time
+
+from analyzers.call_profiler import qualified_names
+
+
+class SamplingProfiler:
+    """
+    统计采样剖析器
+    采样线程只记录代码对象元组和叶子帧行号，函数名在导出时才解析；
+    被剖析线程不安装任何钩子，开销只来自采样线程持有 GIL 的时间
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.005,
+        all_threads: bool = False,
+        max_depth: int = 256,
+    ):
+        """
+        初始化采样剖析器
+
+        参数:
+            interval: 采样间隔（秒）
+            all_threads: True 时采样除采样线程外的全部线程，否则只采样调用 start() 的线程
+            max_depth: 每个调用栈最多记录的帧数（从叶子向上）
+        """
+        if interval <= 0:
+            raise ValueError("interval 必须为正数")
+        self.interval = interval
+        self.all_threads = all_threads
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.leaf_lines: Dict[Tuple[Any, ...], int] = {}
+        self.first_seen: Dict[Tuple[Any, ...], float] = {}
+        self.samples = 0
+        self.sample_time_ns = 0
+        self.start_time: Optional[datetime] = None
+        self.end_time: Optional[datetime] = None
+        self._targets: Set[int] = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> "SamplingProfiler":
+        if self.running:
+            return self
+        self._targets = {threading.get_ident()}
+        self._stop.clear()
+        self.start_time = datetime.now()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        if not self.running:
+            return self
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.end_time = datetime.now()
+        return self
+
+    def __enter__(self) -> "SamplingProfiler":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def profile(self, func: Callable, *args, **kwargs) -> Any:
+        """在采样下调用 func 并返回其结果"""
+        with self:
+            return func(*args, **kwargs)
+
+    def _run(self):
+        me = threading.get_ident()
+        wait = self._stop.wait
+        while not wait(self.interval):
+            self.sample(exclude=me)
+
+    def sample(self, exclude: Optional[int] = None):
+        """采集一次全部目标线程的调用栈"""
+        start = time.perf_counter_ns()
+        max_depth = self.max_depth
+        for ident, frame in sys._current_frames().items():
+            if ident == exclude or (not self.all_threads and ident not in self._targets):
+                continue
+            line = frame.f_lineno
+            codes = []
+            while frame is not None and len(codes) < max_depth:
+                code = frame.f_code
+                # 跳过 profile() 等剖析器自身的帧
+                if code.co_filename != __file__:
+                    codes.append(code)
+                frame = frame.f_back
+            if not codes:
+                continue
+            # 折叠栈按从根到叶的顺序
+            key = tuple(reversed(codes))
+            self.stacks[key] += 1
+            self.leaf_lines[key] = line
+            self.first_seen.setdefault(key, time.time())
+            self.samples += 1
+        self.sample_time_ns += time.perf_counter_ns() - start
+
+    def reset(self):
+        self.stacks.clear()
+        self.leaf_lines.clear()
+        self.first_seen.clear()
+        self.samples = 0
+        self.sample_time_ns = 0
+
+    # ---- 结果 ----
+
+    def _names(self) -> Dict[Any, str]:
+        codes = list({code for stack in self.stacks for code in stack})
+        return dict(zip(codes, qualified_names(codes)))
+
+    def collapsed(self) -> Dict[str, int]:
+        """折叠栈计数：{"根;...;叶": 样本数}，名称相同的栈合并"""
+        names = self._names()
+        result: Counter = Counter()
+        for stack, count in self.stacks.items():
+            result[";".join(names[code] for code in stack)] += count
+        return dict(result)
+
+    def export_collapsed(self, output_file) -> int:
+        """
+        写出 flamegraph 折叠栈格式（每行 "根;...;叶 样本数"），返回行数
+        """
+        rows = sorted(self.collapsed().items(), key=lambda item: (-item[1], item[0]))
+        with open(output_file, "w", encoding="utf-8") as f:
+            for stack, count in rows:
+                f.write(f"{stack} {count}\n")
+        return len(rows)
+
+    def function_counts(self) -> List[Tuple[str, int, int]]:
+        """
+        每个函数的 (名称, 自身样本数, 包含样本数)，按包含样本数降序；
+        递归函数在同一个栈中只计一次包含样本
+        """
+        names = self._names()
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            own[names[stack[-1]]] += count
+            for name in {names[code] for code in stack}:
+                total[name] += count
+        return sorted(
+            ((name, own[name], count) for name, count in total.items()),
+            key=lambda row: (-row[2], row[0]),
+        )
+
+    def hot_stacks(self, limit: Optional[int] = 20) -> List[Dict[str, Any]]:
+        """
+        样本最多的调用栈
+
+        返回:
+            [{"stack", "function", "line", "source", "samples", "first_seen"}]
+        """
+        names = self._names()
+        ranked = self.stacks.most_common(limit)
+        rows = []
+        for stack, count in ranked:
+            leaf = stack[-1]
+            line = self.leaf_lines[stack]
+            rows.append({
+                "stack": ";".join(names[code] for code in stack),
+                "function": names[leaf],
+                "line": line,
+                "source": linecache.getline(leaf.co_filename, line).strip(),
+                "samples": count,
+                "first_seen": self.first_seen[stack],
+            })
+        return rows
+
+    def overhead(self) -> float:
+        """采样耗时占剖析墙钟时间的比例"""
+        if self.start_time is None:
+            return 0.0
+        end = self.end_time or datetime.now()
+        elapsed = (end - self.start_time).total_seconds()
+        return self.sample_time_ns / 1e9 / elapsed if elapsed > 0 else 0.0
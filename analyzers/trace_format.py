@@ -0,0 +1,234 @@
+"""
+二进制追踪格式模块
+事件为定长记录（时间戳 ns、事件类型、代码对象 ID、行号），函数名和文件名驻留在文件末尾的字符串表中；
+TraceReader 以 NumPy 结构化数组内存映射事件区，分块迭代和聚合都不把事件转换为 Python 对象
+
+文件布局：
+    MAGIC | 事件记录[count] | 字符串表 | 代码表 | 尾部
+    字符串表：<I 字符串数，之后每个字符串为 <I 字节数 + UTF-8
+    代码表：<I 代码对象数，之后为 int32[n, 3]（函数名字符串 ID、文件名字符串 ID、首行号）
+    尾部：<QQ 事件数, 字符串表偏移 | MAGIC
+"""
+
+from typing import Any, Dict, IO, Iterator, List, NamedTuple, Optional, Tuple
+from pathlib import Path
+import struct
+
+import numpy as np
+
+from analyzers.call_profiler import EVENT_TYPES as _CALL_EVENTS
+
+MAGIC = b"TRACEBIN\x01"
+
+# 事件类型编码：前两项与 CallProfiler 的环形缓冲区一致
+EVENT_TYPES: Tuple[str, ...] = _CALL_EVENTS + ("line", "exception")
+EVENT_CALL, EVENT_RETURN, EVENT_LINE, EVENT_EXCEPTION = range(len(EVENT_TYPES))
+
+# 紧凑定长记录（17 字节，无对齐填充）
+RECORD_DTYPE = np.dtype(
+    [("timestamp", "<i8"), ("code", "<i4"), ("line", "<i4"), ("event", "u1")]
+)
+
+_RECORD = struct.Struct("<qiiB")
+_COUNT = struct.Struct("<I")
+_FOOTER = struct.Struct("<QQ")
+
+
+class TraceEvent(NamedTuple):
+    """流式迭代时产出的单个事件"""
+
+    timestamp: int
+    event: str
+    function: str
+    line: int
+
+
+def is_binary_trace(path) -> bool:
+    """文件是否为二进制追踪格式"""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class TraceWriter:
+    """
+    二进制追踪写入器
+    事件先打包进内存缓冲区，达到 buffer_size 条后整块落盘；字符串和代码对象在写入时驻留，关闭时写出
+    """
+
+    def __init__(self, path, buffer_size: int = 1 << 14):
+        """
+        创建追踪文件
+
+        参数:
+            path: 输出路径
+            buffer_size: 缓冲区事件数
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: Optional[IO] = open(self.path, "wb")
+        self._file.write(MAGIC)
+        self._buffer = bytearray()
+        self._limit = buffer_size * RECORD_DTYPE.itemsize
+        self._pack = _RECORD.pack
+        self.count = 0
+        self.strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        self.codes: List[Tuple[int, int, int]] = []
+        self._code_ids: Dict[Tuple[str, str, int], int] = {}
+
+    def __enter__(self) -> "TraceWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def intern(self, value: str) -> int:
+        sid = self._string_ids.get(value)
+        if sid is None:
+            sid = self._string_ids[value] = len(self.strings)
+            self.strings.append(value)
+        return sid
+
+    def code_id(self, function: str, filename: str = "", lineno: int = 0) -> int:
+        """登记代码对象（函数名、文件名、首行号），返回代码 ID"""
+        key = (function, filename, lineno)
+        cid = self._code_ids.get(key)
+        if cid is None:
+            cid = self._code_ids[key] = len(self.codes)
+            self.codes.append((self.intern(function), self.intern(filename), lineno))
+        return cid
+
+    def write(self, timestamp: int, event: int, code: int, line: int = 0):
+        """追加单个事件"""
+        self._buffer += self._pack(timestamp, code, line, event)
+        if len(self._buffer) >= self._limit:
+            self.flush()
+
+    def write_array(self, records: np.ndarray):
+        """追加一批 RECORD_DTYPE 事件"""
+        self.flush()
+        self._file.write(np.ascontiguousarray(records, dtype=RECORD_DTYPE).tobytes())
+        self.count += len(records)
+
+    def flush(self):
+        if self._buffer:
+            self._file.write(self._buffer)
+            self.count += len(self._buffer) // RECORD_DTYPE.itemsize
+            self._buffer = bytearray()
+
+    def close(self):
+        if self._file is None:
+            return
+        self.flush()
+        f = self._file
+        table_offset = f.tell()
+        f.write(_COUNT.pack(len(self.strings)))
+        for value in self.strings:
+            encoded = value.encode("utf-8")
+            f.write(_COUNT.pack(len(encoded)))
+            f.write(encoded)
+        f.write(_COUNT.pack(len(self.codes)))
+        f.write(np.array(self.codes, dtype="<i4").reshape(-1, 3).tobytes())
+        f.write(_FOOTER.pack(self.count, table_offset))
+        f.write(MAGIC)
+        f.close()
+        self._file = None
+
+
+class TraceReader:
+    """
+    二进制追踪读取器
+    打开时只读取尾部、字符串表和代码表；records() 返回内存映射的结构化数组
+    """
+
+    def __init__(self, path, chunk_size: int = 1 << 20):
+        """
+        打开追踪文件
+
+        参数:
+            path: 追踪文件路径
+            chunk_size: 分块迭代时每块的事件数
+        """
+        self.path = Path(path)
+        self.chunk_size = chunk_size
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"不是二进制追踪文件: {self.path}")
+            f.seek(-(_FOOTER.size + len(MAGIC)), 2)
+            self.count, table_offset = _FOOTER.unpack(f.read(_FOOTER.size))
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"追踪文件不完整（写入未正常关闭）: {self.path}")
+            f.seek(table_offset)
+            (n_strings,) = _COUNT.unpack(f.read(_COUNT.size))
+            strings = []
+            for _ in range(n_strings):
+                (size,) = _COUNT.unpack(f.read(_COUNT.size))
+                strings.append(f.read(size).decode("utf-8"))
+            (n_codes,) = _COUNT.unpack(f.read(_COUNT.size))
+            self.codes = np.frombuffer(f.read(n_codes * 12), dtype="<i4").reshape(-1, 3)
+        self.strings = strings
+        self._records: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def function_names(self) -> List[str]:
+        """代码 ID -> 函数名"""
+        return [self.strings[i] for i in self.codes[:, 0].tolist()]
+
+    def code_info(self, code: int) -> Dict[str, Any]:
+        name, filename, lineno = self.codes[code].tolist()
+        return {"function": self.strings[name], "filename": self.strings[filename], "lineno": lineno}
+
+    def records(self) -> np.ndarray:
+        """全部事件的 RECORD_DTYPE 数组（内存映射，不读入内存）"""
+        if self._records is None:
+            if not self.count:
+                self._records = np.zeros(0, dtype=RECORD_DTYPE)
+            else:
+                self._records = np.memmap(
+                    self.path, dtype=RECORD_DTYPE, mode="r", offset=len(MAGIC), shape=(self.count,)
+                )
+        return self._records
+
+    def chunks(self) -> Iterator[np.ndarray]:
+        """按 chunk_size 分块产出事件（内存映射的切片）"""
+        records = self.records()
+        for start in range(0, self.count, self.chunk_size):
+            yield records[start:start + self.chunk_size]
+
+    def __iter__(self) -> Iterator[TraceEvent]:
+        """逐个产出 TraceEvent；只有迭代到的事件才会转换为 Python 对象"""
+        names = self.function_names()
+        for chunk in self.chunks():
+            for timestamp, code, line, event in zip(
+                chunk["timestamp"].tolist(), chunk["code"].tolist(),
+                chunk["line"].tolist(), chunk["event"].tolist(),
+            ):
+                yield TraceEvent(timestamp, EVENT_TYPES[event], names[code], line)
+
+    def event_counts(self) -> Dict[str, int]:
+        """各事件类型的数量（分块向量化统计）"""
+        counts = np.zeros(len(EVENT_TYPES), dtype=np.int64)
+        for chunk in self.chunks():
+            counts += np.bincount(chunk["event"], minlength=len(EVENT_TYPES))[: len(EVENT_TYPES)]
+        return {name: int(count) for name, count in zip(EVENT_TYPES, counts)}
+
+    def call_counts(self) -> Dict[str, int]:
+        """每个函数的调用次数（分块向量化统计）"""
+        counts = np.zeros(len(self.codes), dtype=np.int64)
+        for chunk in self.chunks():
+            calls = chunk["code"][chunk["event"] == EVENT_CALL]
+            counts += np.bincount(calls, minlength=len(self.codes))
+        names = self.function_names()
+        return {names[i]: int(counts[i]) for i in np.flatnonzero(counts)}
+
+    def time_range(self) -> Tuple[int, int]:
+        """首尾事件的时间戳（ns），空文件返回 (0, 0)"""
+        if not self.count:
+            return 0, 0
+        records = self.records()
+        return int(records[0]["timestamp"]), int(records[-1]["timestamp"])
@@ -0,0 +1,178 @@
+"""
+多仓库批量分析模块
+在共享的进程池中逐个分析仓库，每个仓库写入独立的输出目录，最后汇总成跨仓库摘要
+"""
+
+from typing import Any, Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import csv
+import hashlib
+import json
+import multiprocessing
+import time
+
+
+def _init_worker():
+    """
+    工作进程初始化：预先导入各阶段依赖的重型模块，
+    同一进程处理后续仓库时不再重复支付导入开销
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+    import main  # noqa: F401
+    import analyzers.ast_analyzer  # noqa: F401
+    import analyzers.libcst_analyzer  # noqa: F401
+    import collectors.commit_collector  # noqa: F401
+    import visualizers.generator  # noqa: F401
+
+
+def _analyze_repository(repo_path: str, work_dir: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    在工作进程中分析单个仓库（模块级函数，可被序列化提交到进程池）
+
+    参数:
+        repo_path: 仓库路径
+        work_dir: 该仓库的输出根目录
+        options: 传给 RepositoryAnalyzer.analyze 的参数
+
+    返回:
+        仓库摘要，失败时包含 error
+    """
+    from main import RepositoryAnalyzer
+
+    started = time.perf_counter()
+    work = Path(work_dir)
+    record = {"repo_path": repo_path, "work_dir": work_dir, "status": "完成", "error": ""}
+    try:
+        analyzer = RepositoryAnalyzer(
+            repo_path,
+            output_dir=str(work / "output"),
+            data_dir=str(work / "data"),
+            traces_dir=str(work / "traces"),
+            use_processes=False,
+        )
+        analyzer.analyze(**options)
+        record.update(analyzer.summary())
+    except Exception as e:
+        record["status"] = "失败"
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["duration"] = time.perf_counter() - started
+    return record
+
+
+class BatchAnalyzer:
+    """
+    批量分析器
+    进程池中的工作进程被多个仓库复用；仓库内部的阶段在线程中执行，不再嵌套子进程
+    （动态追踪阶段除外：它会替换全局 sys.stdout，始终在独立进程中执行）
+    """
+
+    SUMMARY_FIELDS = [
+        "repo_path", "status", "total_commits", "total_functions", "total_classes",
+        "type_coverage", "unique_authors", "duration", "work_dir", "error",
+    ]
+
+    def __init__(
+        self,
+        repo_paths: List[str],
+        output_root: str = "batch_output",
+        workers: Optional[int] = None,
+        stage_workers: int = 2,
+        **analyze_options,
+    ):
+        """
+        初始化批量分析器
+
+        参数:
+            repo_paths: 仓库路径列表
+            output_root: 输出根目录，每个仓库写入其下的独立子目录
+            workers: 进程池大小，默认为 CPU 数
+            stage_workers: 每个仓库内同时运行的阶段数
+            analyze_options: 其余传给 RepositoryAnalyzer.analyze 的参数（stages/skip/resume/force）
+        """
+        self.repo_paths = list(dict.fromkeys(str(p) for p in repo_paths))
+        self.output_root = Path(output_root)
+        self.workers = workers
+        self.options = {"max_workers": stage_workers, **analyze_options}
+        self.results: List[Dict[str, Any]] = []
+
+    @staticmethod
+    def repo_slug(repo_path: str) -> str:
+        """仓库输出目录名：目录名加路径哈希，避免同名仓库冲突"""
+        path = Path(repo_path).resolve()
+        digest = hashlib.sha1(str(path).encode()).hexdigest()[:8]
+        return f"{path.name}-{digest}"
+
+    def run(self) -> Dict[str, Any]:
+        """
+        分析全部仓库并写出汇总
+
+        返回:
+            跨仓库汇总（totals + 每个仓库的摘要）
+        """
+        self.output_root.mkdir(parents=True, exist_ok=True)
+        self.results = []
+
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        ) as pool:
+            futures = {
+                pool.submit(
+                    _analyze_repository,
+                    path,
+                    str(self.output_root / self.repo_slug(path)),
+                    self.options,
+                ): path
+                for path in self.repo_paths
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                print(f"[{len(self.results) + 1}/{len(futures)}] {result['repo_path']}: {result['status']}")
+                self.results.append(result)
+
+        order = {path: i for i, path in enumerate(self.repo_paths)}
+        self.results.sort(key=lambda r: order[r["repo_path"]])
+        summary = {"totals": self.totals(), "repos": self.results}
+        self.export(summary)
+        return summary
+
+    def totals(self) -> Dict[str, Any]:
+        """跨仓库汇总"""
+        done = [r for r in self.results if r["status"] == "完成"]
+        return {
+            "repos": len(self.results),
+            "succeeded": len(done),
+            "failed": len(self.results) - len(done),
+            "total_commits": sum(r.get("total_commits", 0) for r in done),
+            "total_functions": sum(r.get("total_functions", 0) for r in done),
+            "total_classes": sum(r.get("total_classes", 0) for r in done),
+            "mean_type_coverage": (
+                sum(r.get("type_coverage", 0) for r in done) / len(done) if done else 0
+            ),
+        }
+
+    def export(self, summary: Dict[str, Any]):
+        """写出 batch_summary.json 和 batch_summary.csv"""
+        with open(self.output_root / "batch_summary.json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        with open(self.output_root / "batch_summary.csv", "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=self.SUMMARY_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(self.results)
+
+
+def read_repo_list(list_file: str) -> List[str]:
+    """
+    读取仓库列表文件：每行一个路径，忽略空行和 # 注释
+
+    参数:
+        list_file: 列表文件路径
+    """
+    with open(list_file, "r", encoding="utf-8") as f:
+        lines = (line.split("#", 1)[0].strip() for line in f)
+        return [line for line in lines if line]
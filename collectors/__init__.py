@@ -1,21 +1,35 @@
 """
 数据采集器模块
 提供 Git 提交、GitHub Issues/PRs、贡献者信息的采集功能
+
+子模块在首次访问对应名称时才导入（PEP 562），
+只采集提交数据时不会加载 requests 等其他采集器的依赖
 """
 
-from .commit_collector import CommitCollector, CommitInfo
-from .github_collector import GitHubCollector, IssueInfo
-from .pr_collector import PRsCollector, PRInfo
-from .contributors_collector import ContributorsCollector
-from .data_exporter import DataExporter
-
-__all__ = [
-    "CommitCollector",
-    "CommitInfo",
-    "GitHubCollector",
-    "IssueInfo",
-    "PRsCollector",
-    "PRInfo",
-    "ContributorsCollector",
-    "DataExporter",
-]
+import importlib
+
+_EXPORTS = {
+    "CommitCollector": ".commit_collector",
+    "CommitInfo": ".commit_collector",
+    "GitHubCollector": ".github_collector",
+    "IssueInfo": ".github_collector",
+    "PRsCollector": ".pr_collector",
+    "PRInfo": ".pr_collector",
+    "ContributorsCollector": ".contributors_collector",
+    "DataExporter": ".data_exporter",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
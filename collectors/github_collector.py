@@ -47,6 +47,13 @@ class GitHubCollector:
             self.headers["Authorization"] = f"token {token}"
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        # 已完成的 HTTP 请求数（包括失败响应），用于流水线指标
+        self.request_count = 0
+        self.session.hooks["response"].append(self._count_response)
+
+    def _count_response(self, response, *args, **kwargs):
+        self.request_count += 1
+        return response
 
     def get_issues(self, owner: str, repo: str, state: str = "all") -> List[IssueInfo]:
         """
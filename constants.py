@@ -25,3 +25,20 @@ TARGET_REPO_PATH = "C:/Users/l/Desktop/opensource/group3/typer"
 OUTPUT_DIR = "output"  # 图表输出目录
 DATA_DIR = "data"  # 数据文件目录
 TRACES_DIR = "traces"  # 追踪日志目录
+
+# 单文件资源上限（AST / 类型注解分析的工作进程）
+FILE_TIME_LIMIT = 60  # 单个文件的分析时间上限（秒）
+FILE_MEMORY_LIMIT = 2 * 1024 ** 3  # 单个工作进程的地址空间上限（字节）
+MAX_SOURCE_FILE_SIZE = 5 * 1024 ** 2  # 超过该大小的源文件（多为生成代码）不参与分析（字节）
+
+# 动态追踪：通过 typer.testing.CliRunner 执行并剖析的命令
+TRACE_APP = None  # "模块:属性"（相对目标仓库根目录导入），None 时使用内置示例应用
+TRACE_COMMANDS = (
+    ("hello", "World"),
+    ("hello", "World", "--count", "3"),
+    ("goodbye", "World", "--formal"),
+    ("--help",),
+    ("hello", "--help"),
+)
+TRACE_INCLUDE = ("typer", "click")  # 只统计这些包中的函数
+TRACE_TRACK_BLOCKS = False  # 统计每次调用的内存块净增量（每个事件多两次 sys.getallocatedblocks，开销显著）
@@ -5,25 +5,60 @@ Typer 仓库分析器 - 主程序入口
 """
 
 import sys
+import re
 import json
+import argparse
+import subprocess
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
 from collections import Counter
+from functools import partial
 
 from config import BASE_DIR, WARM_COLORS, WARM_PALETTE
-from constants import TARGET_REPO_PATH, OUTPUT_DIR, DATA_DIR, TRACES_DIR
+from constants import (
+    TARGET_REPO_PATH, OUTPUT_DIR, DATA_DIR, TRACES_DIR, FILE_TIME_LIMIT, FILE_MEMORY_LIMIT,
+    MAX_SOURCE_FILE_SIZE, TRACE_APP, TRACE_COMMANDS, TRACE_INCLUDE, TRACE_TRACK_BLOCKS,
+)
 from exceptions import AnalyzerError, ConfigurationError
+from utils.metrics import PipelineMetrics
 
 
 class RepositoryAnalyzer:
     """仓库分析器主类"""
 
-    def __init__(self, repo_path: Optional[str] = None):
+    # 各阶段产出、需要写入检查点的属性；只产出文件的阶段检查点为空
+    STAGE_STATE = {
+        "collect_commits": ("commits",),
+        "collect_contributors": ("contributors",),
+        "analyze_ast": ("ast_results", "ast_table", "complexity_data", "call_table"),
+        "analyze_types": ("type_coverage",),
+        "analyze_dependencies": ("dependency_stats",),
+    }
+
+    def __init__(
+        self,
+        repo_path: Optional[str] = None,
+        output_dir: Optional[str] = None,
+        data_dir: Optional[str] = None,
+        traces_dir: Optional[str] = None,
+        use_processes: bool = True,
+    ):
+        """
+        初始化分析器
+
+        参数:
+            repo_path: 目标仓库路径，默认 constants.TARGET_REPO_PATH
+            output_dir: 图表输出目录，默认 constants.OUTPUT_DIR
+            data_dir: 数据文件目录，默认 constants.DATA_DIR
+            traces_dir: 追踪日志目录，默认 constants.TRACES_DIR
+            use_processes: 阶段内部是否启动子进程（批量模式下由外层进程池并行，应关闭）
+        """
         self.repo_path = Path(repo_path) if repo_path else Path(TARGET_REPO_PATH)
-        self.output_dir = Path(OUTPUT_DIR)
-        self.data_dir = Path(DATA_DIR)
-        self.traces_dir = Path(TRACES_DIR)
+        self.output_dir = Path(output_dir or OUTPUT_DIR)
+        self.data_dir = Path(data_dir or DATA_DIR)
+        self.traces_dir = Path(traces_dir or TRACES_DIR)
+        self.use_processes = use_processes
         self._validate_paths()
         self._setup_directories()
         self.commits = []
@@ -31,6 +66,12 @@ class RepositoryAnalyzer:
         self.ast_results = {}
         self.type_coverage = {}
         self.complexity_data = []
+        self.ast_table = None
+        self.call_table = None
+        self.dependency_stats = {}
+        self.metrics = PipelineMetrics()
+        self.manifest = None
+        self.force = False
 
     def _validate_paths(self) -> None:
         if not self.repo_path.exists():
@@ -51,34 +92,23 @@ class RepositoryAnalyzer:
 
     def collect_commits(self) -> None:
         cache_file = self.data_dir / "json" / "commits_full.json"
-        if cache_file.exists():
+        if cache_file.exists() and not self.force:
             print("读取缓存的提交数据...")
             with open(cache_file, "r", encoding="utf-8") as f:
                 cached = json.load(f)
             print(f"  从缓存读取 {len(cached)} 个提交")
+            self.metrics.count("commits_read", len(cached))
 
-            from collectors import CommitCollector
-            from dataclasses import dataclass
+            from collectors.commit_collector import CommitInfo
             from datetime import datetime as dt
 
-            @dataclass
-            class CacheCommit:
-                hash: str
-                author: str
-                email: str
-                date: dt
-                message: str
-                files_changed: int
-                insertions: int
-                deletions: int
-
             self.commits = []
             for c in cached:
                 try:
                     date = dt.fromisoformat(c.get("date", c.get("日期", "")))
                 except:
                     date = dt.now()
-                self.commits.append(CacheCommit(
+                self.commits.append(CommitInfo(
                     hash=c.get("hash", c.get("哈希", "")),
                     author=c.get("author", c.get("作者", "")),
                     email=c.get("email", c.get("邮箱", "")),
@@ -94,37 +124,47 @@ class RepositoryAnalyzer:
         from collectors import CommitCollector, DataExporter
 
         collector = CommitCollector(str(self.repo_path))
-        self.commits = collector.collect()
+        with self.metrics.step("collect"):
+            self.commits = collector.collect()
         print(f"  采集到 {len(self.commits)} 个提交")
+        self.metrics.count("commits_read", len(self.commits))
 
-        exporter = DataExporter(str(self.data_dir / "csv"))
-        exporter.export_commits_csv(self.commits, "commits.csv")
-        print(f"  导出 commits.csv")
+        with self.metrics.step("export"):
+            exporter = DataExporter(str(self.data_dir / "csv"))
+            exporter.export_commits_csv(self.commits, "commits.csv")
+            print(f"  导出 commits.csv")
 
-        commits_data = [collector.to_dict(c) for c in self.commits]
-        with open(cache_file, "w", encoding="utf-8") as f:
-            json.dump(commits_data, f, ensure_ascii=False, indent=2, default=str)
-        print(f"  导出 commits_full.json")
+            commits_data = [collector.to_dict(c) for c in self.commits]
+            with open(cache_file, "w", encoding="utf-8") as f:
+                json.dump(commits_data, f, ensure_ascii=False, indent=2, default=str)
+            print(f"  导出 commits_full.json")
 
     def collect_contributors(self) -> None:
         """采集 GitHub 贡献者数据"""
         cache_file = self.data_dir / "json" / "contributors.json"
-        if cache_file.exists():
+        if cache_file.exists() and not self.force:
             print("读取缓存的贡献者数据...")
             with open(cache_file, "r", encoding="utf-8") as f:
                 self.contributors = json.load(f)
             print(f"  从缓存读取 {len(self.contributors)} 个贡献者")
+            self.metrics.count("contributors_read", len(self.contributors))
             return
 
         print("采集 GitHub 贡献者数据...")
         from collectors.github_collector import GitHubCollector
         import os
 
+        slug = self._github_repo()
+        if slug is None:
+            print("  origin 不是 GitHub 仓库，跳过")
+            self.contributors = []
+            return
+
         token = os.environ.get("GITHUB_TOKEN")
         collector = GitHubCollector(token=token)
 
         try:
-            self.contributors = collector.get_contributors("fastapi", "typer", max_count=200)
+            self.contributors = collector.get_contributors(*slug, max_count=200)
             print(f"  采集到 {len(self.contributors)} 个贡献者")
 
             with open(cache_file, "w", encoding="utf-8") as f:
@@ -133,71 +173,160 @@ class RepositoryAnalyzer:
         except Exception as e:
             print(f"  采集失败: {e}")
             self.contributors = []
+        finally:
+            self.metrics.count("http_requests", collector.request_count)
+        self.metrics.count("contributors_read", len(self.contributors))
 
+    def _github_repo(self) -> Optional[Tuple[str, str]]:
+        """从 origin 远程地址解析 GitHub 的 (owner, repo)，无法解析时返回 None"""
+        try:
+            url = subprocess.run(
+                ["git", "-C", str(self.repo_path), "remote", "get-url", "origin"],
+                capture_output=True, text=True, check=True, timeout=30,
+            ).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return None
+        match = re.search(r"github\.com[:/]([^/]+)/([^/]+?)(?:\.git)?/?$", url)
+        return (match.group(1), match.group(2)) if match else None
 
     def analyze_ast(self) -> None:
         print("执行 AST 静态分析...")
-        from analyzers.ast_analyzer import ASTAnalyzer
-
-        analyzer = ASTAnalyzer(str(self.repo_path))
-        python_files = list(self.repo_path.rglob("*.py"))
-
-        for py_file in python_files:
-            if ".git" not in str(py_file):
-                try:
-                    analyzer.analyze_file(py_file)
-                except Exception:
-                    pass
-
-        self.ast_results = analyzer.get_results()
-        self.complexity_data = [
-            {"name": f.name, "complexity": f.complexity, "lineno": f.lineno}
-            for f in analyzer.functions
-        ]
-        print(f"  分析 {len(python_files)} 个文件，发现 {self.ast_results['functions_count']} 个函数")
-
-        analyzer.export_to_csv(str(self.data_dir / "csv" / "ast_analysis.csv"))
-        print(f"  导出 ast_analysis.csv")
+        self._apply_ast_results(
+            _analyze_ast_files(
+                str(self.repo_path), str(self.data_dir), workers=None if self.use_processes else 1
+            )
+        )
 
+    def _apply_ast_results(self, result: Dict[str, Any]) -> None:
+        """接收 AST 分析结果（可能来自子进程）"""
+        self.ast_results = result["results"]
+        self.ast_table = result["table"]
+        self.call_table = result["calls"]
+        self.metrics.merge(result["metrics"])
+        self.complexity_data = self.ast_table.to_dicts()
+        print(f"  分析 {result['files_count']} 个文件，发现 {self.ast_results['functions_count']} 个函数")
+        self._report_skipped(result["skipped"])
+        print(f"  导出 ast_analysis.csv, call_graph.csv")
+
+    def analyze_dependencies(self) -> None:
+        """
+        模块依赖分析：与 AST/类型注解阶段使用同一个文件发现助手（同样的大小上限和缓存），
+        导入图写入 data/json/dependency_graph.jsonl.gz，AST 阶段的调用边表折叠为文件级调用图
+        """
+        from analyzers.dependency_analyzer import DependencyAnalyzer
+
+        print("执行模块依赖分析...")
+        python_files = _python_files(self.repo_path, self.data_dir)
+        analyzer = DependencyAnalyzer(str(self.repo_path), backend="compact")
+        with self.metrics.step("imports"):
+            analyzer.analyze_repository(python_files)
+        if self.call_table is not None:
+            with self.metrics.step("calls"):
+                analyzer.add_calls(self.call_table)
+        with self.metrics.step("export"):
+            analyzer.export_graph_data(str(self.data_dir / "json" / "dependency_graph.jsonl.gz"))
+
+        self.dependency_stats = analyzer.get_stats()
+        self.metrics.count("files_parsed", len(python_files) - len(analyzer.skipped_files))
+        self.metrics.count("files_skipped", len(analyzer.skipped_files))
+        self.metrics.count("edges", self.dependency_stats["total_edges"])
+        print(
+            f"  {self.dependency_stats['file_nodes']} 个文件，"
+            f"{self.dependency_stats['external_packages']} 个外部包，{self.dependency_stats['total_edges']} 条导入边"
+        )
+        self._report_skipped(analyzer.skipped_files)
+        print(f"  导出 dependency_graph.jsonl.gz")
 
     def analyze_types(self) -> None:
         print("执行 LibCST 类型注解分析...")
-        from analyzers.libcst_analyzer import LibCSTAnalyzer
-
-        analyzer = LibCSTAnalyzer(str(self.repo_path))
-        python_files = list(self.repo_path.rglob("*.py"))
+        python_files = _python_files(self.repo_path, self.data_dir)
+        csv_path = str(self.data_dir / "csv" / "type_coverage.csv")
 
-        for py_file in python_files:
-            try:
-                analyzer.analyze_file(py_file)
-            except Exception:
-                pass
+        try:
+            with self.metrics.step("parse"):
+                analyzer = self._run_type_analysis(
+                    python_files, csv_path, workers=None if self.use_processes else 1
+                )
+        except Exception as e:
+            print(f"  并行分析失败，改为串行: {e}")
+            with self.metrics.step("parse_serial"):
+                analyzer = self._run_type_analysis(python_files, csv_path, workers=1)
 
+        self.metrics.count("files_parsed", len(python_files) - len(analyzer.skipped_files))
+        self.metrics.count("files_skipped", len(analyzer.skipped_files))
+        self.metrics.count("annotations", len(analyzer.type_annotations))
         self.type_coverage = analyzer.calculate_coverage()
         print(f"  类型注解覆盖率: {self.type_coverage.coverage_percentage:.1f}%")
-
-        analyzer.export_to_csv(str(self.data_dir / "csv" / "type_coverage.csv"))
+        self._report_skipped(analyzer.skipped_files)
         print(f"  导出 type_coverage.csv")
 
+    def _run_type_analysis(self, python_files, csv_path: str, workers: Optional[int] = None):
+        """分析类型注解，边分析边把注解行流式写入 CSV"""
+        from analyzers.libcst_analyzer import LibCSTAnalyzer
+        from utils.bounded_pool import Quarantine
+        from utils.streaming import CSVStreamWriter
+
+        # 覆盖率统计只需要规范化的注解文本，默认走 ast 快速路径
+        analyzer = LibCSTAnalyzer(str(self.repo_path), backend="ast")
+        quarantine = Quarantine(self.data_dir / "json" / "quarantine_types.json")
+        with CSVStreamWriter(csv_path, LibCSTAnalyzer.CSV_HEADERS) as sink:
+            analyzer.add_sink(sink)
+            analyzer.analyze_files(
+                python_files,
+                workers=workers,
+                time_limit=FILE_TIME_LIMIT,
+                memory_limit=FILE_MEMORY_LIMIT,
+                quarantine=quarantine,
+            )
+        quarantine.save()
+        return analyzer
+
+    def _report_skipped(self, skipped, limit: int = 10) -> None:
+        """打印被跳过的文件及原因"""
+        if not skipped:
+            return
+        print(f"  跳过 {len(skipped)} 个文件:")
+        for item in skipped[:limit]:
+            print(f"    {item.path}: {item.reason}")
+        if len(skipped) > limit:
+            print(f"    ... 其余 {len(skipped) - limit} 个省略")
+
     def run_dynamic_tracing(self) -> None:
-        print("执行 PySnooper 动态追踪...")
-        from analyzers.dynamic_tracer import DynamicTracer
+        print("执行动态追踪...")
+        from analyzers.dynamic_tracer import DynamicTracer, load_app
 
         tracer = DynamicTracer(str(self.data_dir / "traces"))
+        profiler, runs = None, []
 
         try:
-            tracer.trace_typer_core()
-            print(f"  生成追踪日志")
+            with self.metrics.step("trace_typer_commands"):
+                app = load_app(TRACE_APP, str(self.repo_path)) if TRACE_APP else None
+                profiler, runs = tracer.run_typer_commands(
+                    TRACE_COMMANDS, app=app, include=TRACE_INCLUDE, track_blocks=TRACE_TRACK_BLOCKS
+                )
+            print(f"  执行 {len(runs)} 条命令，剖析 {len(profiler.stats())} 个函数")
         except Exception as e:
             print(f"  追踪跳过: {e}")
 
-        self._export_extended_execution_summary(tracer)
+        with self.metrics.step("export"):
+            self._export_extended_execution_summary(tracer, profiler, runs)
         print(f"  导出 execution_summary.csv")
 
-    def _export_extended_execution_summary(self, tracer) -> None:
-        """生成扩展版执行摘要CSV"""
+    def _apply_tracing_results(self, result: Dict[str, Any]) -> None:
+        """接收动态追踪阶段（子进程）的指标"""
+        self.metrics.merge(result["metrics"])
+
+    def _export_extended_execution_summary(self, tracer, profiler=None, runs=(), limit: int = 20) -> None:
+        """
+        生成扩展版执行摘要CSV，函数统计和命令结果均来自实际执行的剖析数据
+
+        参数:
+            tracer: DynamicTracer
+            profiler: 执行 TRACE_COMMANDS 时的 CallProfiler，None 表示未能执行
+            runs: 每条命令的 CommandRun
+            limit: 按总耗时保留的函数行数
+        """
         import csv
-        from datetime import datetime
 
         summary = tracer.get_trace_summary()
         output_file = self.data_dir / "csv" / "execution_summary.csv"
@@ -206,41 +335,14 @@ class RepositoryAnalyzer:
             ("Total Traces", summary.get("total_traces", 0), "Total execution traces captured"),
             ("Callback Traces", summary.get("callback_traces", 0), "Callback function traces"),
             ("Typer Traces", summary.get("typer_traces", 0), "Typer-specific traces"),
+            ("Profiles", summary.get("profiles", 0), "Function-level profiles captured"),
+            ("Binary Traces", summary.get("binary_traces", 0), "Binary event traces captured"),
             ("Trace Directory", summary.get("trace_directory", ""), "Trace output directory"),
         ]
-
-        # 模拟的函数执行统计
-        func_stats = [
-            ("typer.Typer.__init__", 45, 0.023),
-            ("typer.main.run", 38, 0.156),
-            ("typer.core.TyperCommand.invoke", 32, 0.089),
-            ("typer.params.Option.__init__", 28, 0.012),
-            ("typer.params.Argument.__init__", 25, 0.008),
-            ("typer.core.TyperGroup.invoke", 22, 0.067),
-            ("click.core.Context.__init__", 18, 0.034),
-            ("click.core.Command.main", 15, 0.112),
-            ("typer.rich_utils.rich_format_help", 12, 0.045),
-            ("typer.completion.get_completion", 8, 0.028),
-            ("typer.testing.CliRunner.invoke", 6, 0.234),
-            ("click.decorators.command", 5, 0.003),
-            ("click.decorators.option", 4, 0.002),
-            ("click.decorators.argument", 3, 0.002),
-            ("typer.models.CommandInfo.__init__", 2, 0.001),
-        ]
-
-        # 变量变化追踪
-        var_changes = [
-            ("app", "Typer", "initialized", "Typer instance created"),
-            ("ctx", "Context", "initialized", "Click context initialized"),
-            ("command", "Command", "registered", "Command registered to app"),
-            ("callback", "function", "bound", "Callback function bound"),
-            ("params", "list", "populated", "Parameters list populated"),
-            ("result", "Any", "returned", "Command result returned"),
-            ("exit_code", "int", "set", "Exit code determined"),
-            ("exception", "None", "checked", "Exception handling checked"),
-            ("help_text", "str", "generated", "Help text generated"),
-            ("completion", "list", "computed", "Completions computed"),
-        ]
+        func_stats = profiler.stats()[:limit] if profiler is not None else []
+        if profiler is not None:
+            rows.append(("Profiler Backend", profiler.backend, "Call profiler event source"))
+            rows.append(("Profiled Time", f"{profiler.elapsed_ns / 1e9:.6f}", "Wall time under profiler (s)"))
 
         with open(output_file, "w", newline="", encoding="utf-8") as f:
             writer = csv.writer(f)
@@ -249,14 +351,21 @@ class RepositoryAnalyzer:
             for metric, value, desc in rows:
                 writer.writerow(["Summary", metric, value, desc])
 
-            for func_name, call_count, avg_time in func_stats:
-                writer.writerow(["Function Call", func_name, call_count, f"avg {avg_time:.3f}s"])
-
-            for var_name, var_type, state, desc in var_changes:
-                writer.writerow(["Variable Change", var_name, f"{var_type} -> {state}", desc])
+            for stat in func_stats:
+                desc = (
+                    f"total {stat.inclusive_ns / 1e9:.6f}s, mean {stat.mean_ns / 1e9:.6f}s, "
+                    f"p95 {stat.p95_ns / 1e9:.6f}s"
+                )
+                if profiler.track_blocks:
+                    desc += f", net blocks delta {stat.net_blocks:+d}"
+                writer.writerow(["Function Call", stat.name, stat.calls, desc])
 
-        print(f"  生成 {len(rows) + len(func_stats) + len(var_changes)} 条追踪记录")
+            for run in runs:
+                writer.writerow([
+                    "Command Run", run.command, run.exit_code, f"duration {run.duration_ns / 1e9:.6f}s",
+                ])
 
+        print(f"  生成 {len(rows) + len(func_stats) + len(runs)} 条追踪记录")
 
     def run_z3_analysis(self) -> None:
         print("执行 Z3 符号约束分析...")
@@ -365,6 +474,7 @@ class RepositoryAnalyzer:
 
         analyzer.export_analysis_csv(str(self.data_dir / "csv" / "z3_analysis.csv"), results)
         print(f"  生成 {len(results)} 条约束分析结果")
+        self.metrics.count("constraints_checked", len(results))
         print(f"  导出 z3_analysis.csv")
 
 
@@ -375,9 +485,67 @@ class RepositoryAnalyzer:
             print("  无提交数据，跳过")
             return
 
+        generator = self._visualization_generator()
+        generated = generator.generate_all(
+            commits=self.commits,
+            commits_data=self._commits_data(),
+            complexity_data=self._complexity_source(),
+            repo_path=self.repo_path,
+            contributors=self.contributors,
+        )
+
+        print(f"  共生成 {generated} 张图表")
+        self.metrics.count("charts_rendered", generated)
+
+    def generate_commit_visualizations(self) -> None:
+        """生成只依赖提交数据的图表"""
+        print("生成提交图表...")
+        if not self.commits:
+            print("  无提交数据，跳过")
+            return
+        generated = self._visualization_generator().generate_commit_charts(
+            self.commits, self._commits_data(), self.repo_path
+        )
+        print(f"  共生成 {generated} 张提交图表")
+        self.metrics.count("charts_rendered", generated)
+
+    def generate_analysis_visualizations(self) -> None:
+        """生成依赖 AST / Contributors / Z3 结果的图表"""
+        print("生成分析图表...")
+        if not self.commits:
+            print("  无提交数据，跳过")
+            return
+        generated = self._visualization_generator().generate_analysis_charts(
+            self._complexity_source(), self.repo_path, self.contributors
+        )
+        print(f"  共生成 {generated} 张分析图表")
+        self.metrics.count("charts_rendered", generated)
+        self._generate_call_sankey()
+
+    def _generate_call_sankey(self) -> None:
+        """由 AST 阶段的调用边表生成调用链 Sankey 图"""
+        if self.call_table is None or not len(self.call_table):
+            return
+        from visualizers.charts_plotly import InteractiveCharts
+
+        chains = self.call_table.call_chains(limit=40)
+        if not chains:
+            return
+        output_file = self.output_dir / "33_call_chain_sankey.html"
+        InteractiveCharts().create_sankey_diagram(chains, str(output_file))
+        print(f"  生成 {output_file.name}（{len(chains)} 条调用链）")
+        self.metrics.count("charts_rendered")
+
+    def _visualization_generator(self):
         from visualizers.generator import VisualizationGenerator
 
-        commits_data = [
+        return VisualizationGenerator(
+            output_dir=str(self.output_dir),
+            data_dir=str(self.data_dir),
+        )
+
+    def _commits_data(self) -> List[Dict]:
+        return [
             {
                 "author": c.author,
                 "date": c.date.isoformat(),
@@ -387,21 +555,8 @@ class RepositoryAnalyzer:
             for c in self.commits
         ]
 
-        generator = VisualizationGenerator(
-            output_dir=str(self.output_dir),
-            data_dir=str(self.data_dir),
-        )
-
-        generated = generator.generate_all(
-            commits=self.commits,
-            commits_data=commits_data,
-            complexity_data=self.complexity_data,
-            repo_path=self.repo_path,
-            contributors=self.contributors,
-        )
-
-        print(f"  共生成 {generated} 张图表")
-
+    def _complexity_source(self):
+        return self.ast_table if self.ast_table is not None else self.complexity_data
 
     def _get_file_stats(self) -> List[Dict]:
         """获取文件修改统计"""
@@ -446,11 +601,12 @@ class RepositoryAnalyzer:
         """生成文件类型分布饼图"""
         import matplotlib.pyplot as plt
 
+        from utils.discovery import FileDiscovery
+
         file_types = Counter()
-        for f in self.repo_path.rglob("*"):
-            if f.is_file() and not ".git" in str(f):
-                ext = f.suffix or "无扩展名"
-                file_types[ext] += 1
+        for f in FileDiscovery(self.repo_path, include=("*",)).files():
+            ext = f.suffix or "无扩展名"
+            file_types[ext] += 1
 
         top_types = dict(file_types.most_common(10))
         others = sum(file_types.values()) - sum(top_types.values())
@@ -721,7 +877,15 @@ class RepositoryAnalyzer:
     def generate_summary(self) -> None:
         """生成分析摘要"""
         print("生成分析摘要...")
-        summary = {
+        summary = self.summary()
+
+        with open(self.data_dir / "json" / "analysis_summary.json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"  导出 analysis_summary.json")
+
+    def summary(self) -> Dict[str, Any]:
+        """当前分析结果的摘要"""
+        return {
             "repo_path": str(self.repo_path),
             "analysis_time": datetime.now().isoformat(),
             "total_commits": len(self.commits),
@@ -731,33 +895,314 @@ class RepositoryAnalyzer:
             "unique_authors": len(set(c.author for c in self.commits)) if self.commits else 0,
         }
 
-        with open(self.data_dir / "json" / "analysis_summary.json", "w", encoding="utf-8") as f:
-            json.dump(summary, f, ensure_ascii=False, indent=2)
-        print(f"  导出 analysis_summary.json")
+    def build_pipeline(self) -> List["Stage"]:
+        """
+        构建分析流水线
+        AST 分析是纯 CPU 计算，放到独立进程（use_processes=False 时在线程中）；
+        动态追踪期间 CliRunner 会替换全局 sys.stdout，无论 use_processes 如何都在独立进程中执行；
+        其余阶段读写 self，在线程中执行。
+        两个图表阶段共享 pyplot 全局状态，通过互斥组串行；
+        AST 分析和类型分析各自启动 CPU 数个工作进程，同时运行会超额占用 CPU 并使内存翻倍，也放入同一互斥组
+        """
+        from utils.scheduler import Stage
+
+        # use_processes=False 时两者都在当前进程串行解析，不需要互斥
+        cpu_pool = "cpu_pool" if self.use_processes else None
+        return [
+            Stage("collect_commits", self.collect_commits, outputs=("commits",)),
+            Stage("collect_contributors", self.collect_contributors, outputs=("contributors",)),
+            Stage(
+                "analyze_ast",
+                partial(
+                    _analyze_ast_files,
+                    str(self.repo_path),
+                    str(self.data_dir),
+                    workers=None if self.use_processes else 1,
+                ),
+                outputs=("ast",),
+                executor="process" if self.use_processes else "thread",
+                on_result=self._apply_ast_results,
+                exclusive=cpu_pool,
+            ),
+            Stage("analyze_types", self.analyze_types, outputs=("types",), exclusive=cpu_pool),
+            Stage(
+                "analyze_dependencies",
+                self.analyze_dependencies,
+                inputs=("ast",),
+                outputs=("dependencies",),
+            ),
+            Stage(
+                "run_dynamic_tracing",
+                partial(
+                    _run_dynamic_tracing,
+                    str(self.repo_path),
+                    str(self.output_dir),
+                    str(self.data_dir),
+                    str(self.traces_dir),
+                ),
+                outputs=("traces",),
+                # CliRunner.invoke 替换进程全局的 sys.stdout/sys.stdin，始终在独立进程中执行
+                executor="process",
+                on_result=self._apply_tracing_results,
+            ),
+            Stage("run_z3_analysis", self.run_z3_analysis, outputs=("z3",)),
+            Stage(
+                "commit_charts",
+                self.generate_commit_visualizations,
+                inputs=("commits",),
+                outputs=("commit_charts",),
+                exclusive="pyplot",
+            ),
+            Stage(
+                "analysis_charts",
+                self.generate_analysis_visualizations,
+                inputs=("commits", "contributors", "ast", "z3"),
+                outputs=("analysis_charts",),
+                exclusive="pyplot",
+            ),
+            Stage("summary", self.generate_summary, inputs=("commits", "ast", "types")),
+        ]
+
+    def _instrument(self, stage, fingerprint: str) -> None:
+        """为阶段加上指标度量和检查点写入"""
+        if stage.on_result is None:
+            stage.func = partial(self._run_stage, stage.name, stage.func, fingerprint)
+        else:
+            # 返回结果的阶段（可能在子进程中执行）自行度量，指标随结果返回
+            stage.on_result = partial(self._apply_stage_result, stage.name, stage.on_result, fingerprint)
+
+    def _run_stage(self, name: str, func, fingerprint: str) -> None:
+        with self.metrics.stage(name) as record:
+            func()
+        self._checkpoint(name, fingerprint, record.wall_time)
+
+    def _apply_stage_result(self, name: str, apply, fingerprint: str, result) -> None:
+        apply(result)
+        self._checkpoint(name, fingerprint)
+
+    def _checkpoint(self, name: str, fingerprint: str, duration: Optional[float] = None) -> None:
+        if self.manifest is None:
+            return
+        state = {attr: getattr(self, attr) for attr in self.STAGE_STATE.get(name, ())}
+        self.manifest.record_completed(name, fingerprint, state, duration)
+
+    def _restore_stage(self, name: str) -> bool:
+        """从检查点恢复阶段状态，失败时返回 False"""
+        try:
+            state = self.manifest.load_checkpoint(name)
+        except Exception as e:
+            print(f"  检查点 {name} 无法读取: {e}")
+            return False
+        for attr, value in state.items():
+            setattr(self, attr, value)
+        print(f"从检查点恢复 {name}")
+        return True
+
+    def analyze(
+        self,
+        max_workers: int = 4,
+        stages: Optional[List[str]] = None,
+        skip: Optional[List[str]] = None,
+        resume: bool = False,
+        force: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        按依赖关系执行分析阶段
+
+        参数:
+            max_workers: 同时运行的阶段数，1 表示串行
+            stages: 只运行这些阶段（依赖的上游阶段优先从检查点恢复）
+            skip: 跳过这些阶段
+            resume: 输入指纹未变的阶段从检查点恢复
+            force: 忽略检查点和提交/贡献者缓存，全部重新计算
+
+        返回:
+            提交数、状态、各阶段耗时和被恢复的阶段
+        """
+        from utils.checkpoint import RunManifest, pipeline_fingerprints, plan_stages, repo_fingerprint
+        from utils.scheduler import StageScheduler
 
-    def analyze(self) -> Dict[str, Any]:
         print(f"Typer 仓库分析器")
         print(f"目标仓库: {self.repo_path}")
         print(f"输出目录: {self.output_dir.absolute()}")
         print("-" * 40)
 
-        self.collect_commits()
-        self.collect_contributors()
-        self.analyze_ast()
-        self.analyze_types()
-        self.run_dynamic_tracing()
-        self.run_z3_analysis()
-        self.generate_all_visualizations()
-        self.generate_summary()
+        self.manifest = RunManifest(self.data_dir)
+        previous = self.manifest.repo_fingerprint
+        self.manifest.repo_fingerprint = repo_fingerprint(self.repo_path)
+        # 仓库内容变化后，提交/贡献者的 JSON 缓存也视为过期
+        self.force = force or bool(previous and previous != self.manifest.repo_fingerprint)
+
+        pipeline = self.build_pipeline()
+        fingerprints = pipeline_fingerprints(pipeline, self.manifest.repo_fingerprint)
+        to_run, to_restore = plan_stages(
+            pipeline, self.manifest, fingerprints,
+            only=stages, skip=skip or (), resume=resume, force=force,
+        )
+        restored = [s.name for s in to_restore if self._restore_stage(s.name)]
+        to_run += [s for s in to_restore if s.name not in restored]
+
+        for stage in to_run:
+            self._instrument(stage, fingerprints[stage.name])
+        order = {s.name: i for i, s in enumerate(pipeline)}
+        scheduler = StageScheduler(
+            sorted(to_run, key=lambda s: order[s.name]), max_workers=max_workers
+        )
+        with self.metrics.step("run", stage="pipeline"):
+            stage_results = scheduler.run()
+
+        # 所有阶段（线程或进程）的耗时统一取调度器从提交到处理完结果的墙钟时间
+        self.manifest.record_durations(
+            {r.name: r.duration for r in stage_results.values() if r.status == "completed"}
+        )
+        for result in scheduler.failed:
+            self.manifest.record_failed(
+                result.name, fingerprints[result.name], result.error, result.duration
+            )
+        self.manifest.save()
 
         print("-" * 40)
-        return {"commits_count": len(self.commits), "status": "完成"}
+        self.metrics.export(self.data_dir)
+        print(f"导出 pipeline_metrics.json / pipeline_metrics.csv")
+        if scheduler.failed:
+            first = scheduler.failed[0]
+            names = ", ".join(r.name for r in scheduler.failed)
+            raise AnalyzerError(f"阶段执行失败: {names}（可使用 --resume 从检查点继续）") from first.error
+
+        return {
+            "commits_count": len(self.commits),
+            "status": "完成",
+            "stage_durations": {name: r.duration for name, r in stage_results.items()},
+            "restored": restored,
+        }
 
 
-def main() -> int:
+def _python_files(repo_path, data_dir) -> List[Path]:
+    """
+    发现仓库中待分析的 Python 文件
+    剪枝虚拟环境、node_modules、构建目录等，遵循 .gitignore，文件列表缓存在 data/json/file_index.json
+
+    参数:
+        repo_path: 仓库路径
+        data_dir: 数据目录
+    """
+    from utils.discovery import FileDiscovery
+
+    return FileDiscovery(
+        Path(repo_path),
+        include=("*.py",),
+        max_size=MAX_SOURCE_FILE_SIZE,
+        cache_path=Path(data_dir) / "json" / "file_index.json",
+    ).files()
+
+
+def _analyze_ast_files(repo_path: str, data_dir: str, workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    AST 分析（模块级函数，可在子进程中执行）
+    超过单文件资源上限的文件写入 data/json/quarantine_ast.json，后续运行直接跳过
+
+    参数:
+        repo_path: 仓库路径
+        data_dir: 数据目录，函数/类行在解析过程中逐文件流式写入 csv/ast_analysis.csv
+        workers: 解析进程数，默认为 CPU 数；1 表示在当前进程串行解析
+
+    返回:
+        results / table / skipped / files_count / metrics
+    """
+    from analyzers.ast_analyzer import ASTAnalyzer
+    from utils.bounded_pool import Quarantine
+    from utils.streaming import CSVStreamWriter
+
+    metrics = PipelineMetrics()
+    quarantine = Quarantine(Path(data_dir) / "json" / "quarantine_ast.json")
+    with metrics.stage("analyze_ast") as record:
+        analyzer = ASTAnalyzer(repo_path, compact=True, columnar=True)
+        with metrics.step("discover"):
+            python_files = _python_files(repo_path, data_dir)
+
+        with metrics.step("parse"), CSVStreamWriter(
+            str(Path(data_dir) / "csv" / "ast_analysis.csv"), ASTAnalyzer.STREAM_HEADERS
+        ) as sink:
+            analyzer.add_sink(sink)
+            analyzer.analyze_files(
+                python_files,
+                workers=workers,
+                time_limit=FILE_TIME_LIMIT,
+                memory_limit=FILE_MEMORY_LIMIT,
+                quarantine=quarantine,
+            )
+            quarantine.save()
+
+        with metrics.step("export"):
+            results = analyzer.get_results()
+            table = analyzer.to_table()
+            calls = analyzer.call_table()
+            calls.export_csv(str(Path(data_dir) / "csv" / "call_graph.csv"))
+
+        record.count("files_parsed", len(python_files) - len(analyzer.skipped_files))
+        record.count("files_skipped", len(analyzer.skipped_files))
+        record.count("files_quarantined", len(quarantine.entries))
+        record.count("functions", results["functions_count"])
+        record.count("calls", len(calls))
+
+    return {
+        "results": results,
+        "table": table,
+        "calls": calls,
+        "skipped": analyzer.skipped_files,
+        "files_count": len(python_files),
+        "metrics": metrics.to_dicts(),
+    }
+
+
+def _run_dynamic_tracing(repo_path: str, output_dir: str, data_dir: str, traces_dir: str) -> Dict[str, Any]:
+    """
+    动态追踪（模块级函数，在子进程中执行）
+    CliRunner.invoke 会替换进程全局的 sys.stdout/sys.stdin，与其他阶段同进程并发时会吞掉它们的输出
+
+    返回:
+        metrics: 本阶段的指标记录
+    """
+    analyzer = RepositoryAnalyzer(
+        repo_path, output_dir=output_dir, data_dir=data_dir, traces_dir=traces_dir, use_processes=False
+    )
+    with analyzer.metrics.stage("run_dynamic_tracing"):
+        analyzer.run_dynamic_tracing()
+    return {"metrics": analyzer.metrics.to_dicts()}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Typer 仓库分析器")
+    parser.add_argument("--repo", help="目标仓库路径（默认使用 constants.TARGET_REPO_PATH）")
+    parser.add_argument("--stages", type=_stage_list, help="只运行这些阶段，逗号分隔")
+    parser.add_argument("--skip", type=_stage_list, default=[], help="跳过这些阶段，逗号分隔")
+    parser.add_argument("--workers", type=int, default=4, help="同时运行的阶段数，1 表示串行")
+    parser.add_argument("--batch", metavar="LIST_FILE", help="批量模式：仓库列表文件，每行一个路径")
+    parser.add_argument("--output-root", default="batch_output", help="批量模式的输出根目录")
+    parser.add_argument("--jobs", type=int, help="批量模式的进程数，默认为 CPU 数")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--resume", action="store_true", help="输入未变化的阶段从检查点恢复")
+    mode.add_argument("--force", action="store_true", help="忽略检查点和缓存，全部重新计算")
+    return parser.parse_args(argv)
+
+
+def _stage_list(value: str) -> List[str]:
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.batch:
+        return _run_batch(args)
     try:
-        analyzer = RepositoryAnalyzer()
-        results = analyzer.analyze()
+        analyzer = RepositoryAnalyzer(args.repo)
+        results = analyzer.analyze(
+            max_workers=args.workers,
+            stages=args.stages,
+            skip=args.skip,
+            resume=args.resume,
+            force=args.force,
+        )
         print(f"分析完成，共处理 {results['commits_count']} 个提交")
         return 0
     except ConfigurationError as e:
@@ -770,5 +1215,23 @@ def main() -> int:
         return 1
 
 
+def _run_batch(args: argparse.Namespace) -> int:
+    from batch import BatchAnalyzer, read_repo_list
+
+    batch = BatchAnalyzer(
+        read_repo_list(args.batch),
+        output_root=args.output_root,
+        workers=args.jobs,
+        stage_workers=args.workers,
+        stages=args.stages,
+        skip=args.skip,
+        resume=args.resume,
+        force=args.force,
+    )
+    totals = batch.run()["totals"]
+    print(f"批量分析完成: {totals['succeeded']}/{totals['repos']} 个仓库成功")
+    return 0 if totals["failed"] == 0 else 1
+
+
 if __name__ == "__main__":
     sys.exit(main())
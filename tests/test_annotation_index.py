@@ -0,0 +1,73 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest
+from pathlib import Path
+from analyzers.libcst_analyzer import LibCSTAnalyzer
+
+
+class TestAnnotationIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_repo_index")
+        self.test_dir.mkdir(exist_ok=True)
+        with open(self.test_dir / "a.py", "w") as f:
+            f.write(
+                "from typing import Dict, List, Optional\n"
+                "def load(path: str, opts: Dict[str, int]) -> Optional[str]:\n"
+                "    pass\n"
+                "def save(path: str, items: List[int]) -> None:\n"
+                "    pass\n"
+            )
+        with open(self.test_dir / "b.py", "w") as f:
+            f.write(
+                "def load(path: List[str]) -> Dict[str, str]:\n"
+                "    pass\n"
+            )
+        self.analyzer = LibCSTAnalyzer(str(self.test_dir), backend="ast")
+        for name in ("a.py", "b.py"):
+            self.analyzer.analyze_file(self.test_dir / name)
+
+    def tearDown(self):
+        import shutil
+
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_stats_from_index(self):
+        stats = self.analyzer.get_annotation_stats()
+        self.assertEqual(stats["注解总数"], 8)
+        self.assertEqual(stats["参数注解数"], 5)
+        self.assertEqual(stats["返回值注解数"], 3)
+        self.assertEqual(stats["泛型类型"], {"Optional": 1, "Dict": 2, "List": 2})
+
+    def test_queries(self):
+        by_param = self.analyzer.query_annotations(arg_name="path")
+        self.assertEqual(len(by_param), 3)
+
+        in_file = self.analyzer.query_annotations(file_path="a.py", function_name="load")
+        self.assertEqual([a.arg_name for a in in_file], ["return", "path", "opts"])
+
+        lists = self.analyzer.query_annotations(generic="List", function_name="load")
+        self.assertEqual([(a.file_path, a.arg_name) for a in lists], [("b.py", "path")])
+
+        everywhere = self.analyzer.query_annotations(function_name="load")
+        self.assertEqual(len(everywhere), 5)
+
+    def test_index_updates_incrementally(self):
+        index = self.analyzer.index
+        with open(self.test_dir / "c.py", "w") as f:
+            f.write("def extra(x: List[int]): pass\n")
+        self.analyzer.analyze_file(self.test_dir / "c.py")
+        self.assertIs(self.analyzer.index, index)
+        self.assertEqual(index.generic_counts()["List"], 3)
+        self.assertEqual(len(self.analyzer.extract_annotations(limit=2)), 2)
+        self.assertEqual(
+            self.analyzer.find_annotations("c.py", function_name="extra"),
+            index.by_function[("c.py", "extra")],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest
+import csv
+from pathlib import Path
+from analyzers.ast_analyzer import ASTAnalyzer, CompactFunctionInfo
+
+
+class TestASTCompact(unittest.TestCase):
+    def setUp(self):
+        self.test_code = '''
+import os
+from typing import List
+
+@staticmethod
+def documented(a, b, c):
+    """A fairly long docstring for the sample function"""
+    return a
+
+class Sample(object):
+    """Class doc"""
+
+    @property
+    def value(self):
+        return 1
+'''
+        self.test_dir = Path("test_repo_compact")
+        self.test_dir.mkdir(exist_ok=True)
+        self.test_file = self.test_dir / "sample.py"
+        with open(self.test_file, "w") as f:
+            f.write(self.test_code)
+
+    def tearDown(self):
+        import shutil
+
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+        for name in ("compact.csv", "full.csv"):
+            if Path(name).exists():
+                Path(name).unlink()
+
+    def test_compact_records(self):
+        analyzer = ASTAnalyzer(str(self.test_dir), compact=True)
+        analyzer.analyze_file(self.test_file)
+
+        func = next(f for f in analyzer.functions if f.name == "documented")
+        self.assertIsInstance(func, CompactFunctionInfo)
+        self.assertFalse(hasattr(func, "__dict__"))
+        self.assertEqual(func.args_count, 3)
+        self.assertEqual(func.docstring_len, len("A fairly long docstring for the sample function"))
+        self.assertEqual(func.decorators, ("staticmethod",))
+
+        self.assertIs(
+            analyzer.functions[1].decorators[0],
+            sys.intern("property"),
+        )
+
+    def test_compact_export_matches_full(self):
+        full = ASTAnalyzer(str(self.test_dir))
+        full.analyze_file(self.test_file)
+        full.export_to_csv("full.csv")
+
+        compact = ASTAnalyzer(str(self.test_dir), compact=True)
+        compact.analyze_file(self.test_file)
+        compact.export_to_csv("compact.csv")
+
+        with open("full.csv", encoding="utf-8") as f1, open("compact.csv", encoding="utf-8") as f2:
+            self.assertEqual(list(csv.reader(f1)), list(csv.reader(f2)))
+        self.assertEqual(full.get_results(), compact.get_results())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest
+import csv
+from pathlib import Path
+from analyzers.ast_analyzer import ASTAnalyzer
+
+
+class TestASTResultTable(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_repo_table")
+        (self.test_dir / "pkg").mkdir(parents=True, exist_ok=True)
+        with open(self.test_dir / "pkg" / "a.py", "w") as f:
+            f.write(
+                "def simple():\n"
+                "    return 1\n"
+                "\n"
+                "def branchy(x, y):\n"
+                "    if x:\n"
+                "        return 1\n"
+                "    for i in y:\n"
+                "        if i:\n"
+                "            pass\n"
+                "    return 0\n"
+            )
+        with open(self.test_dir / "b.py", "w") as f:
+            f.write(
+                "class Thing:\n"
+                "    '''doc'''\n"
+                "    async def run(self):\n"
+                "        while True:\n"
+                "            break\n"
+            )
+
+        self.analyzer = ASTAnalyzer(str(self.test_dir), columnar=True)
+        for path in sorted(self.test_dir.rglob("*.py")):
+            self.analyzer.analyze_file(path)
+
+    def tearDown(self):
+        import shutil
+
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+        if Path("table_output.csv").exists():
+            Path("table_output.csv").unlink()
+
+    def test_aggregates(self):
+        table = self.analyzer.to_table()
+        self.assertEqual(table.functions_count, 3)
+        self.assertEqual(table.classes_count, 1)
+        self.assertAlmostEqual(table.mean_complexity(), (1 + 4 + 2) / 3)
+        self.assertEqual(table.percentile(50), 2.0)
+        self.assertEqual([f["name"] for f in table.top_k(2)], ["branchy", "run"])
+
+    def test_per_file_rollup(self):
+        rollup = self.analyzer.to_table().per_file()
+        self.assertEqual(rollup["pkg/a.py"]["functions"], 2)
+        self.assertEqual(rollup["pkg/a.py"]["max_complexity"], 4)
+        self.assertEqual(rollup["b.py"]["classes"], 1)
+        self.assertEqual(rollup["b.py"]["total_complexity"], 2)
+
+    def test_csv_matches_row_mode(self):
+        self.analyzer.export_to_csv("table_output.csv")
+        with open("table_output.csv", encoding="utf-8") as f:
+            columnar_rows = list(csv.reader(f))
+
+        self.analyzer.columnar = False
+        self.analyzer.export_to_csv("table_output.csv")
+        with open("table_output.csv", encoding="utf-8") as f:
+            row_rows = list(csv.reader(f))
+
+        self.assertEqual(columnar_rows, row_rows)
+        self.assertEqual(columnar_rows[-1][1], "class")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest
+import json
+import subprocess
+from pathlib import Path
+from batch import BatchAnalyzer, read_repo_list
+
+
+class TestBatchAnalyzer(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_batch_repos").resolve()
+        self.repos = []
+        for name in ("alpha", "beta"):
+            repo = self.test_dir / name
+            repo.mkdir(parents=True, exist_ok=True)
+            with open(repo / "mod.py", "w") as f:
+                f.write("def f(a: int) -> int:\n    return a\n\nclass C:\n    pass\n")
+            subprocess.run(["git", "init", "-q", str(repo)], check=True)
+            self.repos.append(str(repo))
+        self.output_root = self.test_dir / "out"
+
+    def tearDown(self):
+        import shutil
+
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_repo_list_file(self):
+        list_file = self.test_dir / "repos.txt"
+        with open(list_file, "w", encoding="utf-8") as f:
+            f.write("# repos\n/a/repo\n\n/b/repo  # trailing comment\n")
+        self.assertEqual(read_repo_list(str(list_file)), ["/a/repo", "/b/repo"])
+
+    def test_repo_slug_distinguishes_same_name(self):
+        a = BatchAnalyzer.repo_slug("/x/typer")
+        b = BatchAnalyzer.repo_slug("/y/typer")
+        self.assertTrue(a.startswith("typer-"))
+        self.assertNotEqual(a, b)
+
+    def test_batch_run(self):
+        batch = BatchAnalyzer(
+            self.repos + [str(self.test_dir / "missing")],
+            output_root=str(self.output_root),
+            workers=2,
+            stages=["analyze_ast"],
+        )
+        summary = batch.run()
+
+        self.assertEqual([r["repo_path"] for r in summary["repos"]], batch.repo_paths)
+        self.assertEqual(summary["totals"]["succeeded"], 2)
+        self.assertEqual(summary["totals"]["failed"], 1)
+        self.assertEqual(summary["totals"]["total_functions"], 2)
+        self.assertIn("ConfigurationError", summary["repos"][2]["error"])
+
+        for result in summary["repos"][:2]:
+            data_dir = Path(result["work_dir"]) / "data"
+            with open(data_dir / "csv" / "ast_analysis.csv", encoding="utf-8") as f:
+                rows = [line.rstrip("\n").split(",") for line in f]
+            self.assertEqual(rows[0][0], "file")
+            self.assertEqual([row[:3] for row in rows[1:]], [["mod.py", "f", "function"], ["mod.py", "C", "class"]])
+        with open(self.output_root / "batch_summary.json", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["totals"]["repos"], 3)
+        self.assertTrue((self.output_root / "batch_summary.csv").exists())
+
+    def test_dependency_stage_pulls_in_ast(self):
+        batch = BatchAnalyzer(
+            self.repos[:1], output_root=str(self.output_root), workers=1,
+            stages=["analyze_dependencies"],
+        )
+        result = batch.run()["repos"][0]
+        self.assertEqual(result["error"], "")
+        self.assertEqual(result["total_functions"], 1)
+        data_dir = Path(result["work_dir"]) / "data"
+        self.assertTrue((data_dir / "json" / "dependency_graph.jsonl.gz").exists())
+        self.assertTrue((data_dir / "json" / "file_index.json").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest
+import signal
+import time
+from pathlib import Path
+from analyzers.ast_analyzer import ASTAnalyzer
+from utils.bounded_pool import BoundedWorkerPool, Quarantine, run_serial
+
+
+def _task(spec):
+    kind, value = spec
+    if kind == "double":
+        return value * 2
+    if kind == "spin":
+        deadline = time.monotonic() + value
+        while time.monotonic() < deadline:
+            pass
+        return "finished"
+    if kind == "stuck":
+        # 屏蔽 SIGALRM，模拟卡在 C 扩展中无法被软超时中断
+        signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+        time.sleep(value)
+        return "finished"
+    if kind == "alloc":
+        return len(bytearray(value))
+    if kind == "crash":
+        os._exit(3)
+    raise ValueError(value)
+
+
+class TestBoundedWorkerPool(unittest.TestCase):
+    def test_results_in_input_order(self):
+        pool = BoundedWorkerPool(_task, workers=2)
+        outcomes = list(pool.map([("double", i) for i in range(10)], chunksize=3))
+        self.assertEqual([o.result for o in outcomes], [i * 2 for i in range(10)])
+        self.assertTrue(all(o.status == "ok" for o in outcomes))
+
+    def test_soft_timeout(self):
+        pool = BoundedWorkerPool(_task, workers=1, time_limit=0.2)
+        outcomes = list(pool.map([("spin", 5), ("double", 1)]))
+        self.assertEqual([o.status for o in outcomes], ["timeout", "ok"])
+        self.assertEqual(pool.restarts, 0)
+
+    @unittest.skipUnless(hasattr(signal, "pthread_sigmask"), "需要 pthread_sigmask")
+    def test_hard_timeout_restarts_worker(self):
+        pool = BoundedWorkerPool(_task, workers=1, time_limit=0.2, hard_timeout=0.5)
+        started = time.monotonic()
+        outcomes = list(pool.map([("double", 1), ("stuck", 30), ("double", 2)], chunksize=3))
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertEqual([o.status for o in outcomes], ["ok", "timeout", "ok"])
+        self.assertEqual(outcomes[2].result, 4)
+        self.assertEqual(pool.restarts, 1)
+
+    def test_crash_and_error(self):
+        pool = BoundedWorkerPool(_task, workers=2)
+        outcomes = list(pool.map([("crash", 0), ("boom", "bad"), ("double", 3)]))
+        self.assertEqual([o.status for o in outcomes], ["crashed", "error", "ok"])
+        self.assertIn("ValueError", outcomes[1].error)
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "RLIMIT_AS 仅在 Linux 上可靠")
+    def test_memory_limit(self):
+        pool = BoundedWorkerPool(_task, workers=1, memory_limit=1 << 30)
+        outcomes = list(pool.map([("alloc", 4 << 30), ("alloc", 1024)]))
+        self.assertEqual([o.status for o in outcomes], ["memory", "ok"])
+
+
+class TestRunSerial(unittest.TestCase):
+    def test_soft_timeout_in_main_thread(self):
+        outcomes = list(run_serial(_task, [("spin", 5), ("double", 1)], time_limit=0.2))
+        self.assertEqual([o.status for o in outcomes], ["timeout", "ok"])
+        self.assertEqual(outcomes[1].result, 2)
+        self.assertLess(outcomes[0].duration, 2)
+
+    def test_errors_become_outcomes(self):
+        outcomes = list(run_serial(_task, [("boom", "bad"), ("double", 2)], time_limit=1))
+        self.assertEqual([o.status for o in outcomes], ["error", "ok"])
+        self.assertIn("ValueError", outcomes[0].error)
+
+    def test_timer_cancelled_before_yield(self):
+        for outcome in run_serial(_task, [("double", 1)], time_limit=0.05):
+            self.assertEqual(signal.getitimer(signal.ITIMER_REAL), (0.0, 0.0))
+            # 超过时间上限的结果处理不会被 FileTimeout 打断
+            time.sleep(0.1)
+            self.assertEqual(outcome.status, "ok")
+
+
+class _SlowAnalyzer(ASTAnalyzer):
+    def _collect_file(self, file_path):
+        if file_path.name == "huge.py":
+            _task(("spin", 5))
+        if file_path.name == "broken.py":
+            raise RuntimeError("visitor bug")
+        return super()._collect_file(file_path)
+
+
+class TestQuarantine(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_quarantine_repo")
+        self.test_dir.mkdir(exist_ok=True)
+        self.files = []
+        for name, body in (("ok.py", "def f(): pass\n"), ("huge.py", "X = 1\n")):
+            path = self.test_dir / name
+            path.write_text(body)
+            self.files.append(path)
+        self.store = self.test_dir / "quarantine.json"
+
+    def tearDown(self):
+        import shutil
+
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_persisted_until_file_changes(self):
+        quarantine = Quarantine(self.store)
+        quarantine.add(self.files[1], "超过 60s 时间上限")
+        quarantine.save()
+
+        reloaded = Quarantine(self.store)
+        kept, skipped = reloaded.partition(self.files)
+        self.assertEqual(kept, [self.files[0]])
+        self.assertEqual(skipped, [(self.files[1], "超过 60s 时间上限")])
+
+        self.files[1].write_text("X = 2\nY = 3\n")
+        self.assertIsNone(reloaded.reason(self.files[1]))
+
+    def test_analyzer_skips_quarantined_files(self):
+        quarantine = Quarantine(self.store)
+        quarantine.add(self.files[1], "超过内存上限")
+        analyzer = ASTAnalyzer(str(self.test_dir))
+        analyzer.analyze_files(self.files, workers=2, time_limit=5, quarantine=quarantine)
+        self.assertEqual([f.name for f in analyzer.functions], ["f"])
+        self.assertEqual(len(analyzer.skipped_files), 1)
+        self.assertTrue(analyzer.skipped_files[0].reason.startswith("已隔离"))
+
+    def test_serial_path_applies_time_limit(self):
+        quarantine = Quarantine(self.store)
+        analyzer = _SlowAnalyzer(str(self.test_dir))
+        analyzer.analyze_files(self.files, workers=1, time_limit=0.2, quarantine=quarantine)
+        self.assertEqual([f.name for f in analyzer.functions], ["f"])
+        self.assertIn("时间上限", analyzer.skipped_files[0].reason)
+        self.assertIsNotNone(quarantine.reason(self.files[1]))
+
+    def test_serial_path_skips_errors_without_quarantine(self):
+        broken = self.test_dir / "broken.py"
+        broken.write_text("X = 1\n")
+        quarantine = Quarantine(self.store)
+        analyzer = _SlowAnalyzer(str(self.test_dir))
+        analyzer.analyze_files([self.files[0], broken], workers=1, time_limit=5, quarantine=quarantine)
+        self.assertEqual([f.name for f in analyzer.functions], ["f"])
+        self.assertIn("RuntimeError", analyzer.skipped_files[0].reason)
+        self.assertIsNone(quarantine.reason(broken))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,6 +6,8 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 import unittest
 from pathlib import Path
 from analyzers.ast_analyzer import ASTAnalyzer
+from analyzers.call_graph import CallGraphTable
+from analyzers.dependency_analyzer import DependencyAnalyzer
 
 
 class TestCallGraph(unittest.TestCase):
@@ -37,6 +39,130 @@ def func_b():
         self.assertIn("func_a", func_names)
         self.assertIn("func_b", func_names)
 
+    def test_calls_recorded(self):
+        self.analyzer.analyze_file(self.test_file)
+        self.assertEqual(
+            self.analyzer.calls,
+            [("calls.py", [("func_a", "func_b", 3, 0), ("func_b", "print", 6, 3)])],
+        )
+        self.assertEqual(self.analyzer.get_results()["calls_count"], 2)
+
+
+class TestCallResolution(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_repo_call_resolution")
+        files = {
+            "pkg/__init__.py": "",
+            "pkg/helpers.py": "def slugify(text):\n    return text.lower()\n",
+            "pkg/models.py": """
+import os.path
+import numpy as np
+from . import helpers
+from .helpers import slugify as slug
+from collections import OrderedDict
+
+
+class Model:
+    def save(self):
+        self.validate()
+        self.missing()
+        path = os.path.join("a", "b")
+        return slug(path)
+
+    def validate(self):
+        def check():
+            return helpers.slugify("x")
+        return check()
+
+
+def build():
+    model = Model()
+    model.save()
+    data = np.zeros(3)
+    return OrderedDict(), len(data), build()
+
+
+build()
+""",
+        }
+        for rel, content in files.items():
+            path = self.test_dir / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content, encoding="utf-8")
+        self.analyzer = ASTAnalyzer(str(self.test_dir))
+        self.analyzer.analyze_files(sorted(self.test_dir.rglob("*.py")), workers=1)
+
+    def tearDown(self):
+        import shutil
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def calls_of(self, rel):
+        return {(a, b, kind) for path, calls in self.analyzer.calls if path == rel for a, b, _, kind in calls}
+
+    def test_resolution(self):
+        calls = self.calls_of("pkg/models.py")
+        expected = {
+            ("Model.save", "Model.validate", 1),
+            ("Model.save", "self.missing", 4),
+            ("Model.save", "os.path.join", 2),
+            ("Model.save", ".helpers.slugify", 2),
+            ("Model.validate.check", ".helpers.slugify", 2),
+            ("Model.validate", "Model.validate.check", 0),
+            ("build", "Model", 0),
+            ("build", "model.save", 4),
+            ("build", "np.zeros", 4),
+            ("build", "collections.OrderedDict", 2),
+            ("build", "len", 3),
+            ("build", "build", 0),
+            ("<module>", "build", 0),
+        }
+        self.assertEqual(calls - {c for c in calls if c[1] == "numpy.zeros"}, expected - {("build", "np.zeros", 4)})
+        self.assertIn(("build", "numpy.zeros", 2), calls)
+
+    def test_table_and_chains(self):
+        table = self.analyzer.call_table()
+        self.assertIsInstance(table, CallGraphTable)
+        self.assertEqual(len(table), sum(len(c) for _, c in self.analyzer.calls))
+        self.assertEqual(table.kind_counts()["builtin"], 1)
+
+        chains = table.call_chains(limit=None)
+        pairs = {(c["source"], c["target"]): c["value"] for c in chains}
+        self.assertEqual(pairs[("pkg/models.py::Model.save", ".helpers.slugify")], 1)
+        self.assertEqual(pairs[("pkg/models.py::Model.save", "pkg/models.py::Model.validate")], 1)
+        self.assertNotIn(("pkg/models.py::build", "pkg/models.py::build"), pairs)
+        self.assertNotIn(("pkg/models.py::build", "len"), pairs)
+        self.assertEqual(len(table.call_chains(limit=3)), 3)
+
+    def test_same_names_in_different_files(self):
+        table = CallGraphTable.from_records([
+            ("pkg/a.py", [("main", "helper", 2, 0), ("helper", "main", 5, 0)]),
+            ("pkg/b.py", [("main", "helper", 2, 0)]),
+        ])
+        pairs = {(c["source"], c["target"]) for c in table.call_chains(limit=None)}
+        self.assertEqual(pairs, {
+            ("pkg/a.py::main", "pkg/a.py::helper"),
+            ("pkg/a.py::helper", "pkg/a.py::main"),
+            ("pkg/b.py::main", "pkg/b.py::helper"),
+        })
+        self.assertEqual(len(table.symbols), 4)
+
+    def test_feeds_dependency_graph(self):
+        dependency = DependencyAnalyzer(str(self.test_dir))
+        dependency.build_index(sorted(self.test_dir.rglob("*.py")))
+        dependency.add_calls(self.analyzer.call_table())
+        edges = set(dependency.call_graph.edges())
+        self.assertEqual(
+            edges,
+            {("pkg/models.py", "pkg/helpers.py"), ("pkg/models.py", "os"),
+             ("pkg/models.py", "numpy"), ("pkg/models.py", "collections")},
+        )
+
+    def test_parallel_matches_serial(self):
+        parallel = ASTAnalyzer(str(self.test_dir))
+        parallel.analyze_files(sorted(self.test_dir.rglob("*.py")), workers=2)
+        self.assertEqual(parallel.calls, self.analyzer.calls)
+
 
 if __name__ == "__main__":
     unittest.main()
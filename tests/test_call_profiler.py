@@ -0,0 +1,245 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest
+import importlib.util
+import csv
+import time
+from pathlib import Path
+from analyzers.call_profiler import (
+    HIST_BUCKETS, CallProfiler, EventRing, bucket_bounds, duration_bucket, monitoring_available,
+)
+from analyzers.dynamic_tracer import DynamicTracer, demo_app
+
+HAS_TYPER = importlib.util.find_spec("typer") is not None
+
+
+def leaf(n):
+    return n * 2
+
+
+def sleeper():
+    time.sleep(0.01)
+
+
+def parent():
+    total = 0
+    for i in range(5):
+        total += leaf(i)
+    sleeper()
+    return total
+
+
+def fib(n):
+    return n if n < 2 else fib(n - 1) + fib(n - 2)
+
+
+def failing():
+    raise ValueError("boom")
+
+
+def catcher():
+    try:
+        failing()
+    except ValueError:
+        return "caught"
+
+
+class TestEventRing(unittest.TestCase):
+    def test_wraps_in_order(self):
+        ring = EventRing(4)
+        for i in range(6):
+            ring.append(i * 10, i % 2, i)
+        self.assertEqual(len(ring), 4)
+        self.assertEqual(ring.dropped, 2)
+        timestamps, kinds, codes = ring.to_arrays()
+        self.assertEqual(timestamps.tolist(), [20, 30, 40, 50])
+        self.assertEqual(kinds.tolist(), [0, 1, 0, 1])
+        self.assertEqual(codes.tolist(), [2, 3, 4, 5])
+
+    def test_invalid_capacity(self):
+        with self.assertRaises(ValueError):
+            EventRing(0)
+
+
+class TestDurationHistogram(unittest.TestCase):
+    def test_buckets_cover_values(self):
+        previous = 0
+        for ns in list(range(5000)) + [10 ** 6, 10 ** 9, 2 ** 63 - 1]:
+            bucket = duration_bucket(ns)
+            low, high = bucket_bounds(bucket)
+            self.assertTrue(low <= ns < high, ns)
+            self.assertLess(bucket, HIST_BUCKETS)
+            self.assertGreaterEqual(bucket, previous)
+            previous = bucket
+            # 桶宽不超过下界的 1/8
+            self.assertLessEqual(high - low, max(1, low // 8))
+
+    def test_percentile_from_histogram(self):
+        profiler = CallProfiler(backend="setprofile")
+        profiler.profile(leaf, 1)
+        cid = next(i for i, code in enumerate(profiler.codes) if code is leaf.__code__)
+        histogram = profiler.histograms[cid]
+        histogram[:] = type(histogram)("I", bytes(4 * HIST_BUCKETS))
+        for ns in [1_000] * 90 + [1_000_000] * 10:
+            histogram[duration_bucket(ns)] += 1
+        self.assertAlmostEqual(profiler.percentile(cid, 50), 1_000, delta=1_000 // 8)
+        self.assertAlmostEqual(profiler.percentile(cid, 95), 1_000_000, delta=1_000_000 // 8)
+        self.assertEqual(len(histogram), HIST_BUCKETS)
+
+
+class TestCallProfiler(unittest.TestCase):
+    BACKEND = "setprofile"
+
+    def by_name(self, profiler):
+        return {row.name.rsplit(".", 1)[-1]: row for row in profiler.stats()}
+
+    def test_counts_and_times(self):
+        profiler = CallProfiler(backend=self.BACKEND)
+        self.assertEqual(profiler.profile(parent), 20)
+        self.assertEqual(profiler.backend, self.BACKEND)
+        stats = self.by_name(profiler)
+
+        self.assertEqual(stats["parent"].calls, 1)
+        self.assertEqual(stats["leaf"].calls, 5)
+        self.assertEqual(stats["sleeper"].calls, 1)
+        self.assertGreaterEqual(stats["sleeper"].inclusive_ns, 10_000_000)
+        # parent 的独占时间不包含 sleeper 的休眠
+        self.assertLess(stats["parent"].exclusive_ns, stats["sleeper"].inclusive_ns)
+        self.assertGreaterEqual(stats["parent"].inclusive_ns, stats["sleeper"].inclusive_ns)
+        self.assertTrue(stats["parent"].name.endswith("test_call_profiler.parent"))
+
+    def test_recursion_counts_outermost_inclusive(self):
+        profiler = CallProfiler(backend=self.BACKEND)
+        profiler.profile(fib, 10)
+        row = self.by_name(profiler)["fib"]
+        self.assertEqual(row.calls, 177)
+        self.assertEqual(row.inclusive_ns, row.exclusive_ns)
+
+    def test_exceptions_keep_stack_balanced(self):
+        profiler = CallProfiler(backend=self.BACKEND)
+        self.assertEqual(profiler.profile(catcher), "caught")
+        stats = self.by_name(profiler)
+        self.assertEqual(stats["failing"].calls, 1)
+        self.assertEqual(stats["catcher"].calls, 1)
+        self.assertEqual(profiler._stack, [])
+
+    def test_ring_events(self):
+        profiler = CallProfiler(capacity=8, backend=self.BACKEND)
+        profiler.profile(parent)
+        events = list(profiler.events())
+        self.assertEqual(len(events), 8)
+        self.assertEqual(profiler.ring.dropped, 14 - 8)
+        timestamps = [e[0] for e in events]
+        self.assertEqual(timestamps, sorted(timestamps))
+        self.assertEqual(events[-1][1:], ("return", events[-1][2]))
+        self.assertTrue(events[-1][2].endswith(".parent"))
+
+    def test_include_filter(self):
+        profiler = CallProfiler(include=("json",), backend=self.BACKEND)
+        with profiler:
+            import json
+
+            json.dumps({"a": [1, 2]})
+            parent()
+        names = [row.name for row in profiler.stats()]
+        self.assertTrue(names)
+        self.assertTrue(all(name.startswith("json") for name in names))
+
+    def test_reset(self):
+        profiler = CallProfiler(backend=self.BACKEND)
+        profiler.profile(parent)
+        profiler.reset()
+        self.assertEqual(profiler.stats(), [])
+        self.assertEqual(len(profiler.ring), 0)
+
+    def test_auto_backend(self):
+        profiler = CallProfiler()
+        profiler.profile(parent)
+        if monitoring_available():
+            expected = "monitoring"
+        else:
+            expected = "settrace" if sys.gettrace() is None else "setprofile"
+        self.assertEqual(profiler.backend, expected)
+        self.assertEqual(self.by_name(profiler)["leaf"].calls, 5)
+        self.assertIsNone(sys.getprofile())
+        self.assertIsNone(sys.gettrace())
+
+    def test_invalid_backend(self):
+        with self.assertRaises(ValueError):
+            CallProfiler(backend="pysnooper")
+
+
+class TestCallProfilerSettrace(TestCallProfiler):
+    BACKEND = "settrace"
+
+    def test_profiler_restart_ignores_stale_frames(self):
+        profiler = CallProfiler(backend=self.BACKEND)
+
+        def outer():
+            profiler.stop()
+            profiler.start()
+            return leaf(1)
+
+        profiler.profile(outer)
+        stats = self.by_name(profiler)
+        self.assertEqual(stats["leaf"].calls, 1)
+        self.assertEqual(profiler._stack, [])
+
+
+@unittest.skipUnless(monitoring_available(), "sys.monitoring 需要 Python 3.12+")
+@unittest.skipUnless(HAS_TYPER, "typer 未安装")
+class TestProfilerOverhead(unittest.TestCase):
+    def test_monitoring_overhead_bound(self):
+        from typer.testing import CliRunner
+
+        app = demo_app()
+        runner = CliRunner()
+        commands = [["hello", "World", "--count", "3"], ["goodbye", "World", "--formal"], ["--help"]]
+
+        def workload():
+            for _ in range(10):
+                for args in commands:
+                    runner.invoke(app, args)
+
+        def best(func, repeat=5):
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        workload()
+        baseline = best(workload)
+        profiled = best(lambda: CallProfiler(include=("typer", "click"), backend="monitoring").profile(workload))
+        self.assertLess(profiled / baseline, 2.0)
+
+
+class TestTracerProfile(unittest.TestCase):
+    def setUp(self):
+        self.tracer = DynamicTracer(trace_dir="test_profile_traces")
+
+    def tearDown(self):
+        import shutil
+
+        if Path("test_profile_traces").exists():
+            shutil.rmtree("test_profile_traces")
+
+    def test_profile_exports_csv(self):
+        with self.tracer.profile("unit") as profiler:
+            parent()
+        self.assertFalse(profiler.running)
+
+        output_file = self.tracer.trace_dir / "profile_unit.csv"
+        with open(output_file, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        functions = {row["function"].rsplit(".", 1)[-1]: row for row in rows}
+        self.assertEqual(functions["leaf"]["calls"], "5")
+        self.assertEqual(self.tracer.get_trace_summary()["profiles"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
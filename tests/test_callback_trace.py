@@ -0,0 +1,143 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest
+import json
+import time
+import importlib.util
+from pathlib import Path
+from analyzers.dynamic_tracer import DynamicTracer, EventSampler
+
+HAS_TYPER = importlib.util.find_spec("typer") is not None
+
+
+def step(i):
+    return i * i
+
+
+def handler(count, delay=0.0):
+    time.sleep(delay)
+    return sum(step(i) for i in range(count))
+
+
+def twins():
+    squares = [step(i) for i in range(2)]
+    return squares, [i for i in range(2)]
+
+
+def broken():
+    raise RuntimeError("bad state")
+
+
+class TestEventSampler(unittest.TestCase):
+    def test_uniform_and_bounded(self):
+        sampler = EventSampler(8)
+        for i in range(100):
+            if sampler.wants():
+                sampler.add(i)
+            else:
+                sampler.skip()
+        self.assertLessEqual(len(sampler.events), 8)
+        self.assertEqual(sampler.events[0], 0)
+        steps = {b - a for a, b in zip(sampler.events, sampler.events[1:])}
+        self.assertEqual(steps, {sampler.stride})
+        self.assertEqual(sampler.dropped, 100 - len(sampler.events))
+
+
+class TestCallbackTrace(unittest.TestCase):
+    def setUp(self):
+        self.tracer = DynamicTracer(trace_dir="test_callback_traces")
+
+    def tearDown(self):
+        import shutil
+
+        if Path("test_callback_traces").exists():
+            shutil.rmtree("test_callback_traces")
+        if Path("test_callback_report.json").exists():
+            Path("test_callback_report.json").unlink()
+
+    def test_duplicate_qualnames_keep_their_lines(self):
+        trace = self.tracer.trace_callback(twins, "twins")
+        lines = {
+            event.line_no for event in trace.execution_path if event.function_name.endswith("twins.<locals>.<listcomp>")
+        }
+        # 两个推导式是同名的不同代码对象，各自保留自己的行号
+        self.assertEqual(len(lines), 2)
+
+    def test_callback_is_invoked_and_timed(self):
+        trace = self.tracer.trace_callback(handler, "click", 4, delay=0.01)
+        self.assertEqual(trace.result, 0 + 1 + 4 + 9)
+        self.assertIsNone(trace.error)
+        self.assertGreaterEqual(trace.duration_ns, 10_000_000)
+        self.assertLess(trace.start_time, trace.end_time)
+
+        functions = [e.function_name.rsplit(".", 1)[-1] for e in trace.execution_path]
+        self.assertEqual(functions[0], "handler")
+        self.assertEqual(functions.count("step"), 8)
+        self.assertNotIn("_run_callback", functions)
+        self.assertEqual(trace.execution_path[0].event_type, "call")
+        self.assertEqual(trace.execution_path[-1].event_type, "return")
+        self.assertEqual(trace.execution_path[0].source_line, "def handler(count, delay=0.0):")
+
+    def test_execution_path_is_bounded(self):
+        trace = self.tracer.trace_callback(handler, "bulk", 1000, max_events=50)
+        self.assertLessEqual(len(trace.execution_path), 50)
+        self.assertGreater(trace.dropped_events, 0)
+        timestamps = [e.timestamp for e in trace.execution_path]
+        self.assertEqual(timestamps, sorted(timestamps))
+
+    def test_errors_are_recorded(self):
+        trace = self.tracer.trace_callback(broken, "error")
+        self.assertIn("bad state", trace.error)
+        self.assertIsNone(trace.result)
+        self.assertIsNotNone(trace.duration_ns)
+
+    def test_sample_tracer(self):
+        trace = self.tracer.trace_callback(handler, "slow", 10, delay=0.05, tracer="sample", interval=0.002)
+        self.assertEqual(trace.result, sum(i * i for i in range(10)))
+        self.assertTrue(trace.execution_path)
+        self.assertTrue(all(e.event_type == "sample" for e in trace.execution_path))
+
+    def test_invalid_tracer(self):
+        with self.assertRaises(ValueError):
+            self.tracer.trace_callback(handler, "x", 1, tracer="snoop")
+
+    def test_report_includes_latency(self):
+        self.tracer.trace_callback(handler, "click", 3)
+        self.tracer.export_callback_report(Path("test_callback_report.json"))
+        with open("test_callback_report.json", encoding="utf-8") as f:
+            report = json.load(f)
+        self.assertEqual(report["callbacks"][0]["name"], "handler")
+        self.assertGreater(report["callbacks"][0]["duration_ns"], 0)
+        self.assertEqual(self.tracer.analyze_callback_patterns()["callback_types"], {"click": 1})
+
+    def test_object_with_callback(self):
+        class App:
+            def callback(self, value):
+                return value + 1
+
+        trace = self.tracer.trace_typer_callback(App(), "custom", 41)
+        self.assertEqual(trace.callback_name, "typer_custom_callback")
+        self.assertEqual(trace.result, 42)
+
+    @unittest.skipUnless(HAS_TYPER, "typer 未安装")
+    def test_typer_registered_callback(self):
+        import typer
+
+        app = typer.Typer()
+        self.assertIsNone(self.tracer.trace_typer_callback(app).duration_ns)
+
+        @app.callback()
+        def main(verbose: bool = False):
+            return "verbose" if verbose else "quiet"
+
+        trace = self.tracer.trace_typer_callback(app, "main", verbose=True)
+        self.assertEqual(trace.result, "verbose")
+        self.assertEqual(trace.trigger_event, "app_execution")
+        self.assertTrue(trace.execution_path[0].function_name.endswith("main"))
+
+
+if __name__ == "__main__":
+    unittest.main()
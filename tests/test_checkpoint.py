@@ -0,0 +1,190 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest
+import json
+from pathlib import Path
+from exceptions import ConfigurationError
+import subprocess
+from utils.checkpoint import RunManifest, pipeline_fingerprints, plan_stages, repo_fingerprint
+from utils.scheduler import Stage
+
+
+def _noop():
+    pass
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_checkpoint_data")
+        (self.test_dir / "json").mkdir(parents=True, exist_ok=True)
+        self.stages = [
+            Stage("commits", _noop, outputs=("commits",)),
+            Stage("ast", _noop, outputs=("ast",)),
+            Stage("charts", _noop, inputs=("commits", "ast"), outputs=("charts",)),
+            Stage("summary", _noop, inputs=("commits",)),
+        ]
+
+    def tearDown(self):
+        import shutil
+
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def _complete_all(self, manifest, fingerprints):
+        for name, fp in fingerprints.items():
+            manifest.record_completed(name, fp, {"value": name})
+
+    def _names(self, stages):
+        return [s.name for s in stages]
+
+    def test_manifest_round_trip(self):
+        manifest = RunManifest(self.test_dir)
+        manifest.repo_fingerprint = "abc"
+        manifest.record_completed("commits", "fp1", {"commits": [1, 2, 3]}, 1.5)
+        manifest.save()
+
+        reloaded = RunManifest(self.test_dir)
+        self.assertEqual(reloaded.repo_fingerprint, "abc")
+        self.assertTrue(reloaded.is_valid("commits", "fp1"))
+        self.assertFalse(reloaded.is_valid("commits", "fp2"))
+        self.assertEqual(reloaded.load_checkpoint("commits"), {"commits": [1, 2, 3]})
+
+        with open(self.test_dir / "json" / "run_manifest.json", encoding="utf-8") as f:
+            entry = json.load(f)["stages"]["commits"]
+        self.assertEqual(entry["status"], "completed")
+        self.assertEqual(entry["duration"], 1.5)
+
+    def test_record_durations(self):
+        manifest = RunManifest(self.test_dir)
+        manifest.record_completed("ast", "fp", {})
+        manifest.record_durations({"ast": 2.5, "missing": 1.0})
+        manifest.save()
+
+        with open(self.test_dir / "json" / "run_manifest.json", encoding="utf-8") as f:
+            stages = json.load(f)["stages"]
+        self.assertEqual(stages["ast"]["duration"], 2.5)
+        self.assertNotIn("missing", stages)
+
+    def test_failed_stage_not_valid(self):
+        manifest = RunManifest(self.test_dir)
+        manifest.record_completed("charts", "fp", {})
+        manifest.record_failed("charts", "fp", RuntimeError("boom"))
+        self.assertFalse(manifest.is_valid("charts", "fp"))
+        self.assertIn("boom", manifest.stages["charts"]["error"])
+
+    def test_fingerprint_propagates_downstream(self):
+        a = pipeline_fingerprints(self.stages, "head1")
+        b = pipeline_fingerprints(self.stages, "head2")
+        self.assertTrue(all(a[n] != b[n] for n in a))
+        self.assertEqual(a, pipeline_fingerprints(self.stages, "head1"))
+
+    def test_resume_reuses_completed_stages(self):
+        manifest = RunManifest(self.test_dir)
+        fps = pipeline_fingerprints(self.stages, "head")
+        self._complete_all(manifest, {n: fps[n] for n in ("commits", "ast")})
+        manifest.record_failed("charts", fps["charts"], RuntimeError("late failure"))
+
+        run, restore = plan_stages(self.stages, manifest, fps, resume=True)
+        self.assertEqual(self._names(run), ["charts", "summary"])
+        self.assertEqual(self._names(restore), ["commits", "ast"])
+
+    def test_changed_inputs_rerun(self):
+        manifest = RunManifest(self.test_dir)
+        self._complete_all(manifest, pipeline_fingerprints(self.stages, "old"))
+        fps = pipeline_fingerprints(self.stages, "new")
+        run, restore = plan_stages(self.stages, manifest, fps, resume=True)
+        self.assertEqual(len(run), 4)
+        self.assertEqual(restore, [])
+
+    def test_selected_stage_pulls_missing_upstream(self):
+        manifest = RunManifest(self.test_dir)
+        fps = pipeline_fingerprints(self.stages, "head")
+        manifest.record_completed("commits", fps["commits"], {})
+
+        run, restore = plan_stages(self.stages, manifest, fps, only=["charts"])
+        self.assertEqual(self._names(run), ["ast", "charts"])
+        self.assertEqual(self._names(restore), ["commits"])
+
+    def test_skip_and_force(self):
+        manifest = RunManifest(self.test_dir)
+        fps = pipeline_fingerprints(self.stages, "head")
+        self._complete_all(manifest, fps)
+
+        run, restore = plan_stages(self.stages, manifest, fps, skip=["ast"], force=True)
+        self.assertEqual(self._names(run), ["commits", "charts", "summary"])
+        self.assertEqual(restore, [])
+
+    def test_unknown_stage_rejected(self):
+        manifest = RunManifest(self.test_dir)
+        fps = pipeline_fingerprints(self.stages, "head")
+        with self.assertRaises(ConfigurationError):
+            plan_stages(self.stages, manifest, fps, only=["nope"])
+
+    def test_cli_arguments(self):
+        from main import parse_args
+
+        args = parse_args(["--stages", "analyze_ast, summary", "--skip", "run_z3_analysis", "--resume"])
+        self.assertEqual(args.stages, ["analyze_ast", "summary"])
+        self.assertEqual(args.skip, ["run_z3_analysis"])
+        self.assertTrue(args.resume)
+        self.assertFalse(args.force)
+        with self.assertRaises(SystemExit):
+            parse_args(["--resume", "--force"])
+
+
+class TestRepoFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.repo = Path("test_checkpoint_repo")
+        self.repo.mkdir(parents=True, exist_ok=True)
+        (self.repo / "a.py").write_text("x = 1\n", encoding="utf-8")
+
+    def tearDown(self):
+        import shutil
+
+        if self.repo.exists():
+            shutil.rmtree(self.repo)
+
+    def git(self, *args):
+        subprocess.run(
+            ["git", "-C", str(self.repo), "-c", "user.name=t", "-c", "user.email=t@t", *args],
+            check=True, capture_output=True,
+        )
+
+    def test_dirty_content_changes_fingerprint(self):
+        self.git("init", "-q")
+        self.git("add", "a.py")
+        self.git("commit", "-q", "-m", "init")
+        clean = repo_fingerprint(self.repo)
+        self.assertNotIn("+", clean)
+
+        (self.repo / "a.py").write_text("x = 2\n", encoding="utf-8")
+        first = repo_fingerprint(self.repo)
+        # 同一个文件再次修改，git status 不变，但指纹必须变化
+        (self.repo / "a.py").write_text("x = 3\n", encoding="utf-8")
+        second = repo_fingerprint(self.repo)
+        self.assertNotEqual(first, clean)
+        self.assertNotEqual(first, second)
+
+        (self.repo / "new.py").write_text("", encoding="utf-8")
+        self.assertNotEqual(repo_fingerprint(self.repo), second)
+
+    def test_non_git_directory(self):
+        import tempfile
+
+        # 当前目录本身位于 Git 仓库中，非 Git 目录需要建在仓库之外
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "a.py").write_text("x = 1\n", encoding="utf-8")
+            first = repo_fingerprint(root)
+            self.assertTrue(first.startswith("files+"))
+            self.assertEqual(repo_fingerprint(root), first)
+            (root / "b.py").write_text("", encoding="utf-8")
+            self.assertNotEqual(repo_fingerprint(root), first)
+            self.assertEqual(repo_fingerprint(root / "missing"), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
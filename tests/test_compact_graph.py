@@ -0,0 +1,73 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest
+import random
+import networkx as nx
+from analyzers.compact_graph import CompactGraph
+
+
+class TestCompactGraph(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.reference = nx.DiGraph()
+        self.graph = CompactGraph()
+        for i in range(300):
+            self.reference.add_node(f"n{i}")
+            self.graph.add_node(f"n{i}")
+        for _ in range(600):
+            u, v = f"n{rng.randrange(300)}", f"n{rng.randrange(300)}"
+            self.reference.add_edge(u, v)
+            self.graph.add_edge(u, v)
+
+    def test_edges_deduplicated(self):
+        self.assertFalse(self.graph.add_edge("n0", "n1") and self.graph.add_edge("n0", "n1"))
+        self.reference.add_edge("n0", "n1")
+        self.assertEqual(self.graph.number_of_edges(), self.reference.number_of_edges())
+        self.assertTrue(self.graph.has_edge("n0", "n1"))
+        self.assertFalse(self.graph.has_edge("n0", "missing"))
+
+    def test_degree_stats(self):
+        stats = self.graph.degree_stats()
+        n = self.reference.number_of_nodes()
+        self.assertAlmostEqual(stats["avg_degree"], sum(d for _, d in self.reference.degree()) / n)
+        self.assertEqual(stats["max_in_degree"], max(d for _, d in self.reference.in_degree()))
+        self.assertEqual(stats["max_out_degree"], max(d for _, d in self.reference.out_degree()))
+
+    def test_strongly_connected_components(self):
+        expected = sorted(sorted(c) for c in nx.strongly_connected_components(self.reference))
+        actual = sorted(sorted(c) for c in self.graph.strongly_connected_components())
+        self.assertEqual(actual, expected)
+
+    def test_reachability(self):
+        for name in ("n0", "n17", "n299"):
+            self.assertEqual(self.graph.ancestors(name), nx.ancestors(self.reference, name))
+            self.assertEqual(self.graph.descendants(name), nx.descendants(self.reference, name))
+
+    def test_deep_chain_without_recursion_limit(self):
+        graph = CompactGraph()
+        for i in range(5000):
+            graph.add_edge(f"m{i}", f"m{i + 1}")
+        graph.add_edge("m5000", "m0")
+        components = graph.strongly_connected_components()
+        self.assertEqual(len(components), 1)
+        self.assertEqual(len(graph.ancestors("m0")), 5000)
+
+    def test_clear_out_edges(self):
+        out = len(self.graph.successors("n5"))
+        self.graph.clear_out_edges("n5")
+        self.assertEqual(self.graph.successors("n5"), [])
+        self.assertEqual(self.graph.number_of_edges(), self.reference.number_of_edges() - out)
+        self.assertEqual(int(self.graph.out_degree()[self.graph.ids["n5"]]), 0)
+
+    def test_to_networkx(self):
+        self.graph.add_node("requests", type="external", stdlib=False)
+        graph = self.graph.to_networkx()
+        self.assertEqual(set(graph.edges()), set(self.reference.edges()))
+        self.assertEqual(graph.nodes["requests"], {"type": "external", "stdlib": False})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest
+import shutil
+from pathlib import Path
+from analyzers.dependency_analyzer import DependencyAnalyzer
+from analyzers.import_resolver import ImportResolver, ModuleIndex
+
+
+class TestImportResolver(unittest.TestCase):
+    def setUp(self):
+        self.index = ModuleIndex([
+            "src/pkg/__init__.py", "src/pkg/a.py", "src/pkg/sub/__init__.py",
+            "src/pkg/sub/b.py", "scripts/run.py", "setup.py",
+        ])
+        self.resolver = ImportResolver(self.index)
+
+    def test_module_index(self):
+        self.assertEqual(self.index.lookup("pkg.sub.b"), "src/pkg/sub/b.py")
+        self.assertEqual(self.index.lookup("src.pkg.sub.b"), "src/pkg/sub/b.py")
+        self.assertEqual(self.index.lookup("pkg"), "src/pkg/__init__.py")
+        self.assertEqual(self.index.lookup("run"), "scripts/run.py")
+        self.assertEqual(self.index.package_of("src/pkg/sub/b.py"), "pkg.sub")
+        self.assertEqual(self.index.package_of("src/pkg/sub/__init__.py"), "pkg.sub")
+
+    def test_absolute_imports(self):
+        self.assertEqual(self.resolver.resolve_import("pkg.sub.b"), ("file", "src/pkg/sub/b.py"))
+        self.assertEqual(self.resolver.resolve_import("pkg.a.helper"), ("file", "src/pkg/a.py"))
+        self.assertEqual(self.resolver.resolve_import("os.path"), ("external", "os"))
+        self.assertEqual(
+            self.resolver.resolve_from("src/pkg/a.py", "pkg", ["sub", "VERSION"]),
+            [("file", "src/pkg/sub/__init__.py"), ("file", "src/pkg/__init__.py")],
+        )
+
+    def test_relative_imports(self):
+        self.assertEqual(
+            self.resolver.resolve_from("src/pkg/sub/b.py", None, ["a"], level=2),
+            [("file", "src/pkg/a.py")],
+        )
+        self.assertEqual(
+            self.resolver.resolve_from("src/pkg/sub/b.py", "a", ["func"], level=2),
+            [("file", "src/pkg/a.py")],
+        )
+        self.assertEqual(
+            self.resolver.resolve_from("src/pkg/sub/__init__.py", None, ["b"], level=1),
+            [("file", "src/pkg/sub/b.py")],
+        )
+        self.assertEqual(
+            self.resolver.resolve_from("src/pkg/a.py", None, ["x"], level=3),
+            [("unresolved", "...")],
+        )
+
+
+class TestDependencyAnalyzer(unittest.TestCase):
+    backend = "networkx"
+
+    def setUp(self):
+        self.test_dir = Path("test_repo_dependency")
+        files = {
+            "app/__init__.py": "from . import models\n",
+            "app/models.py": "import os\nfrom .utils import slugify\n",
+            "app/utils.py": "import requests\nfrom app import models\n",
+            "app/views.py": "from .models import Model\nfrom ..outside import x\n",
+            "main.py": "import app.views\n",
+            ".venv/lib/dep.py": "import app\n",
+        }
+        for rel, content in files.items():
+            path = self.test_dir / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content, encoding="utf-8")
+        self.analyzer = DependencyAnalyzer(str(self.test_dir), backend=self.backend)
+        self.analyzer.analyze_repository()
+
+    def tearDown(self):
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_file_edges(self):
+        graph = self.analyzer.graph
+        self.assertTrue(graph.has_edge("app/__init__.py", "app/models.py"))
+        self.assertTrue(graph.has_edge("app/models.py", "app/utils.py"))
+        self.assertTrue(graph.has_edge("main.py", "app/views.py"))
+        self.assertNotIn(".venv/lib/dep.py", graph)
+        self.assertEqual(self.analyzer.external_packages(), {"os": True, "requests": False})
+        self.assertEqual(self.analyzer.unresolved, {"app/views.py": ["..outside"]})
+
+    def test_cycles_and_impact(self):
+        self.assertEqual(self.analyzer.find_cycles(), [["app/models.py", "app/utils.py"]])
+        self.assertEqual(
+            self.analyzer.impacted_by("app/utils.py"),
+            {"app/__init__.py", "app/models.py", "app/views.py", "main.py"},
+        )
+        self.assertEqual(self.analyzer.impacted_by("main.py"), set())
+
+    def test_reanalyze_replaces_edges(self):
+        (self.test_dir / "app" / "utils.py").write_text("import json\n", encoding="utf-8")
+        self.analyzer.analyze_imports(self.test_dir / "app" / "utils.py")
+        self.assertEqual(self.analyzer.imports["app/utils.py"], ["json"])
+        self.assertEqual(self.analyzer.find_cycles(), [])
+
+    def test_discovery_limits(self):
+        (self.test_dir / "generated.py").write_text("x = 1\n" * 100, encoding="utf-8")
+        cache = self.test_dir / "cache" / "file_index.json"
+        analyzer = DependencyAnalyzer(str(self.test_dir), backend=self.backend, max_size=200, cache_path=cache)
+        names = [p.name for p in analyzer.discover_files()]
+        self.assertNotIn("generated.py", names)
+        self.assertIn("views.py", names)
+        self.assertTrue(cache.exists())
+
+    def test_stats(self):
+        stats = self.analyzer.get_stats()
+        self.assertEqual(stats["file_nodes"], 5)
+        self.assertEqual(stats["external_packages"], 2)
+        self.assertEqual(stats["unresolved_imports"], 1)
+        self.assertEqual(stats["total_edges"], 7)
+        self.assertAlmostEqual(stats["avg_degree"], 2.0)
+        self.assertEqual(stats["max_in_degree"], 3)
+
+
+class TestDependencyAnalyzerCompact(TestDependencyAnalyzer):
+    backend = "compact"
+
+    def test_to_networkx(self):
+        graph = self.analyzer.to_networkx()
+        self.assertEqual(graph.number_of_edges(), 7)
+        self.assertEqual(graph.nodes["requests"], {"type": "external", "stdlib": False})
+        self.assertEqual(graph.nodes["main.py"], {"type": "file"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest
+import shutil
+from pathlib import Path
+from analyzers.dependency_analyzer import DependencyAnalyzer
+from analyzers.dependency_query import DependencyQuery
+
+
+class TestDependencyQuery(unittest.TestCase):
+    backend = "networkx"
+
+    def setUp(self):
+        self.test_dir = Path("test_repo_dependency_query")
+        self.write("core/__init__.py", "")
+        self.write("core/base.py", "import json\n")
+        self.write("core/models.py", "from .base import Base\n")
+        self.write("core/views.py", "from . import models\nfrom .forms import Form\n")
+        self.write("core/forms.py", "from .views import render\n")
+        self.write("cli.py", "from core.views import main\n")
+        self.write("tools.py", "import os\n")
+        self.analyzer = DependencyAnalyzer(str(self.test_dir), backend=self.backend)
+        self.analyzer.analyze_repository()
+        self.query = DependencyQuery(self.analyzer)
+
+    def tearDown(self):
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def write(self, rel, content):
+        path = self.test_dir / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+
+    def test_dependents_cached(self):
+        expected = {"core/models.py", "core/views.py", "core/forms.py", "cli.py"}
+        self.assertEqual(self.query.dependents("core/base.py"), expected)
+        self.assertEqual(self.query.dependents("core/base.py"), expected)
+        self.assertEqual(self.query.stats(), {"cached": 1, "hits": 1, "misses": 1})
+        self.assertEqual(self.query.dependents("json"), {"core/base.py"} | expected)
+        self.assertEqual(
+            self.query.affected(["tools.py", "missing.py"]), {"tools.py"}
+        )
+
+    def test_incremental_invalidation(self):
+        for node in ("core/base.py", "core/models.py", "tools.py", "os", "cli.py"):
+            self.query.dependents(node)
+
+        # tools.py 开始导入 core.models：tools 能到达的节点失效，cli.py/tools.py 的闭包保留
+        self.write("tools.py", "import os\nimport core.models\n")
+        stale = self.query.update_file("tools.py")
+        self.assertEqual(stale, {"core/base.py", "core/models.py", "os"})
+        self.assertIn("tools.py", self.query.dependents("core/base.py"))
+        self.query.dependents("core/models.py")
+
+        # views.py 不再导入 models：依赖 views 才能到达 models/base 的闭包失效
+        self.write("core/views.py", "from .forms import Form\n")
+        stale = self.query.update_file(self.test_dir / "core" / "views.py")
+        self.assertEqual(stale, {"core/base.py", "core/models.py"})
+
+        fresh = DependencyQuery(self.analyzer)
+        for node in ("core/base.py", "core/models.py", "tools.py", "os", "cli.py"):
+            self.assertEqual(self.query.dependents(node), fresh.dependents(node))
+
+    def test_import_chain(self):
+        self.assertEqual(
+            self.query.import_chain("cli.py", "json"),
+            ["cli.py", "core/views.py", "core/models.py", "core/base.py", "json"],
+        )
+        self.assertIsNone(self.query.import_chain("tools.py", "core/base.py"))
+        self.assertIsNone(self.query.import_chain("cli.py", "missing.py"))
+
+    def test_topological_layers(self):
+        self.assertEqual(
+            self.query.topological_layers(),
+            [
+                ["core/__init__.py", "core/base.py", "tools.py"],
+                ["core/models.py"],
+                ["core/forms.py", "core/views.py"],
+                ["cli.py"],
+            ],
+        )
+
+
+class TestDependencyQueryCompact(TestDependencyQuery):
+    backend = "compact"
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest
+import shutil
+import subprocess
+from pathlib import Path
+from utils.discovery import FileDiscovery, GitIgnore
+
+
+class TestFileDiscovery(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_discovery_repo")
+        self.write("pkg/__init__.py", "")
+        self.write("pkg/core.py", "x = 1\n")
+        self.write("pkg/big.py", "#" * 5000)
+        self.write("docs/notes.md", "notes")
+        self.write("scripts/gen_out.py", "")
+        self.write(".venv/lib/site.py", "")
+        self.write("node_modules/a/b.py", "")
+        self.write("build/lib/pkg/core.py", "")
+        self.write("pkg/__pycache__/core.py", "")
+        self.write("pkg.egg-info/x.py", "")
+
+    def tearDown(self):
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def write(self, rel, content):
+        path = self.test_dir / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+
+    def relative(self, discovery):
+        return [p.relative_to(self.test_dir).as_posix() for p in discovery.files()]
+
+    def test_prunes_default_dirs(self):
+        files = self.relative(FileDiscovery(self.test_dir, source="walk"))
+        self.assertEqual(files, ["pkg/__init__.py", "pkg/big.py", "pkg/core.py", "scripts/gen_out.py"])
+
+    def test_include_exclude_and_max_size(self):
+        discovery = FileDiscovery(
+            self.test_dir, include=("*.py", "*.md"), exclude=("scripts/*",), max_size=1000, source="walk"
+        )
+        self.assertEqual(self.relative(discovery), ["docs/notes.md", "pkg/__init__.py", "pkg/core.py"])
+
+    def test_gitignore_walk(self):
+        self.write(".gitignore", "# generated\n*_out.py\ndocs/\n")
+        self.write("pkg/.gitignore", "big.py\n")
+        files = self.relative(FileDiscovery(self.test_dir, include=("*",), source="walk"))
+        self.assertEqual(files, [".gitignore", "pkg/.gitignore", "pkg/__init__.py", "pkg/core.py"])
+
+    def test_git_ls_files(self):
+        if shutil.which("git") is None:
+            self.skipTest("git 不可用")
+        self.write(".gitignore", "*_out.py\n")
+        subprocess.run(["git", "init", "-q", str(self.test_dir)], check=True)
+        files = self.relative(FileDiscovery(self.test_dir, source="git"))
+        self.assertEqual(files, ["pkg/__init__.py", "pkg/big.py", "pkg/core.py"])
+
+    def test_cache_invalidated_by_directory_mtime(self):
+        cache = self.test_dir / "cache" / "file_index.json"
+        first = FileDiscovery(self.test_dir, source="walk", exclude_dirs=(".venv",), cache_path=cache)
+        first.files()
+        self.assertFalse(first.cache_hit)
+
+        second = FileDiscovery(self.test_dir, source="walk", exclude_dirs=(".venv",), cache_path=cache)
+        self.assertEqual(second.files(), first.files())
+        self.assertTrue(second.cache_hit)
+
+        self.write("pkg/sub/new.py", "")
+        os.utime(self.test_dir / "pkg", ns=(0, 0))
+        third = FileDiscovery(self.test_dir, source="walk", exclude_dirs=(".venv",), cache_path=cache)
+        self.assertIn(self.test_dir / "pkg" / "sub" / "new.py", third.files())
+        self.assertFalse(third.cache_hit)
+
+    def test_cache_keyed_on_options(self):
+        cache = self.test_dir / "cache" / "file_index.json"
+        FileDiscovery(self.test_dir, source="walk", cache_path=cache).files()
+        other = FileDiscovery(self.test_dir, include=("*.md",), source="walk", cache_path=cache)
+        self.assertEqual(self.relative(other), ["docs/notes.md"])
+        self.assertFalse(other.cache_hit)
+
+    def test_concurrent_cache_writes(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        cache = self.test_dir / "cache" / "file_index.json"
+
+        def discover(_):
+            return self.relative(FileDiscovery(self.test_dir, source="walk", cache_path=cache))
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(discover, range(16)))
+        self.assertTrue(all(files == results[0] for files in results))
+        self.assertEqual([p.name for p in cache.parent.iterdir()], ["file_index.json"])
+
+
+class TestGitIgnore(unittest.TestCase):
+    def test_negation_and_dir_only(self):
+        ignore = GitIgnore()
+        ignore.rules = [("", "*.log", False, False, False), ("", "keep.log", True, False, False),
+                        ("", "out", False, True, False), ("sub", "a/b.py", False, False, True)]
+        self.assertTrue(ignore.ignored("x/debug.log", False))
+        self.assertFalse(ignore.ignored("x/keep.log", False))
+        self.assertTrue(ignore.ignored("x/out", True))
+        self.assertFalse(ignore.ignored("x/out", False))
+        self.assertTrue(ignore.ignored("sub/a/b.py", False))
+        self.assertFalse(ignore.ignored("a/b.py", False))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest
+import csv
+import subprocess
+import importlib.util
+from pathlib import Path
+from analyzers.call_profiler import CallProfiler
+from analyzers.dynamic_tracer import CommandRun, DynamicTracer
+from main import RepositoryAnalyzer
+
+HAS_TYPER = importlib.util.find_spec("typer") is not None
+
+
+def build(n):
+    return [str(i) * 8 for i in range(n)]
+
+
+def workload():
+    for n in (10, 200, 50):
+        build(n)
+
+
+class TestExecutionSummary(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_execution_summary")
+        repo = self.test_dir / "repo"
+        repo.mkdir(parents=True, exist_ok=True)
+        subprocess.run(["git", "init", "-q", str(repo)], check=True)
+        self.analyzer = RepositoryAnalyzer(
+            str(repo),
+            output_dir=str(self.test_dir / "output"),
+            data_dir=str(self.test_dir / "data"),
+            traces_dir=str(self.test_dir / "traces"),
+        )
+        self.tracer = DynamicTracer(str(self.test_dir / "data" / "traces"))
+
+    def tearDown(self):
+        import shutil
+
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def read_rows(self):
+        with open(self.test_dir / "data" / "csv" / "execution_summary.csv", newline="", encoding="utf-8") as f:
+            return list(csv.reader(f))
+
+    def test_rows_come_from_profiler(self):
+        profiler = CallProfiler(backend="setprofile", track_blocks=True)
+        profiler.profile(workload)
+        runs = [CommandRun("hello World", 0, 1_500_000), CommandRun("--bad", 2, 900_000)]
+
+        self.analyzer._export_extended_execution_summary(self.tracer, profiler, runs)
+        rows = self.read_rows()
+        self.assertEqual(rows[0], ["Category", "Metric", "Value", "Description"])
+
+        functions = {row[1].rsplit(".", 1)[-1]: row for row in rows if row[0] == "Function Call"}
+        self.assertLessEqual({"workload", "build"}, set(functions))
+        self.assertEqual(functions["build"][2], "3")
+        self.assertIn("p95", functions["build"][3])
+        self.assertIn("net blocks delta", functions["build"][3])
+
+        commands = [row for row in rows if row[0] == "Command Run"]
+        self.assertEqual([row[1:3] for row in commands], [["hello World", "0"], ["--bad", "2"]])
+        self.assertFalse(any(row[0] == "Variable Change" for row in rows))
+        self.assertNotIn("typer.main.run", [row[1] for row in rows])
+
+    def test_blocks_omitted_when_not_tracked(self):
+        profiler = CallProfiler(backend="setprofile")
+        profiler.profile(workload)
+
+        self.analyzer._export_extended_execution_summary(self.tracer, profiler)
+        descriptions = [row[3] for row in self.read_rows() if row[0] == "Function Call"]
+        self.assertTrue(descriptions)
+        self.assertFalse(any("net blocks" in desc for desc in descriptions))
+
+    def test_without_profiler(self):
+        self.analyzer._export_extended_execution_summary(self.tracer)
+        rows = self.read_rows()
+        self.assertTrue(rows[1:])
+        self.assertTrue(all(row[0] == "Summary" for row in rows[1:]))
+
+    @unittest.skipUnless(HAS_TYPER, "typer 未安装")
+    def test_run_typer_commands(self):
+        profiler, runs = self.tracer.run_typer_commands([("hello", "World", "--count", "2"), ("--help",)])
+        self.assertEqual([run.exit_code for run in runs], [0, 0])
+        self.assertTrue(all(run.duration_ns > 0 for run in runs))
+        names = [stat.name for stat in profiler.stats()]
+        self.assertIn("typer.testing.CliRunner.invoke", names)
+        self.assertFalse(profiler.track_blocks)
+        self.assertTrue((self.tracer.trace_dir / "profile_typer_commands.csv").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest
+import json
+import gzip
+import random
+import shutil
+from pathlib import Path
+import networkx as nx
+import numpy as np
+from analyzers.compact_graph import CompactGraph
+from analyzers.dependency_analyzer import DependencyAnalyzer
+from analyzers.graph_io import GraphReader, detect_format, load_graph, write_graph
+
+
+class TestGraphIO(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_graph_io_output")
+        self.test_dir.mkdir(exist_ok=True)
+        rng = random.Random(3)
+        self.graph = CompactGraph()
+        for i in range(200):
+            self.graph.add_node(f"pkg/mod_{i}.py")
+        self.graph.add_node("os", type="external", stdlib=True)
+        self.graph.add_node("numpy", type="external")
+        for _ in range(1000):
+            self.graph.add_edge(f"pkg/mod_{rng.randrange(200)}.py", f"pkg/mod_{rng.randrange(200)}.py")
+        self.graph.add_edge("pkg/mod_0.py", "os")
+        self.graph.add_edge("pkg/mod_1.py", "numpy")
+        self.expected = self.graph.to_networkx()
+
+    def tearDown(self):
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def assertSameGraph(self, graph):
+        self.assertEqual(set(graph.edges()), set(self.expected.edges()))
+        self.assertEqual(dict(graph.nodes(data=True)), dict(self.expected.nodes(data=True)))
+
+    def test_detect_format(self):
+        self.assertEqual(detect_format("g.jsonl.gz"), "jsonl")
+        self.assertEqual(detect_format("g.bin"), "binary")
+        with self.assertRaises(ValueError):
+            detect_format("g.txt")
+
+    def test_round_trip_all_formats(self):
+        for name in ("g.jsonl", "g.jsonl.gz", "g.bin", "g.bin.gz"):
+            path = self.test_dir / name
+            self.assertEqual(write_graph(self.graph, path), self.graph.number_of_edges())
+            self.assertSameGraph(load_graph(path, backend="networkx"))
+            self.assertSameGraph(load_graph(path).to_networkx())
+
+    def test_networkx_source(self):
+        path = self.test_dir / "g.bin"
+        write_graph(self.expected, path)
+        self.assertSameGraph(load_graph(path).to_networkx())
+
+    def test_reader_is_lazy(self):
+        path = self.test_dir / "g.bin"
+        write_graph(self.graph, path)
+        reader = GraphReader(path, chunk_size=100)
+        self.assertEqual(len(reader), 202)
+        self.assertEqual(reader.edge_count, self.graph.number_of_edges())
+        self.assertIsInstance(reader.edge_array(), np.memmap)
+        chunks = list(reader.edges())
+        self.assertTrue(all(len(c) <= 100 for c in chunks))
+        self.assertEqual(sum(len(c) for c in chunks), reader.edge_count)
+
+    def test_jsonl_layout(self):
+        path = self.test_dir / "g.jsonl.gz"
+        write_graph(self.graph, path)
+        with gzip.open(path, "rt") as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(lines[0]["nodes"], 202)
+        self.assertEqual(lines[201], {"kind": "node", "id": "os", "type": "external", "stdlib": True})
+        self.assertEqual(sum(1 for r in lines if r.get("kind") == "edge"), self.graph.number_of_edges())
+
+    def test_compression_smaller(self):
+        write_graph(self.graph, self.test_dir / "g.jsonl")
+        write_graph(self.graph, self.test_dir / "g.bin")
+        write_graph(self.graph, self.test_dir / "g.bin.gz")
+        sizes = {p.name: p.stat().st_size for p in self.test_dir.iterdir()}
+        self.assertLess(sizes["g.bin"], sizes["g.jsonl"] / 4)
+        self.assertLess(sizes["g.bin.gz"], sizes["g.bin"])
+
+    def test_empty_graph(self):
+        path = self.test_dir / "empty.bin"
+        write_graph(CompactGraph(), path)
+        self.assertEqual(load_graph(path).number_of_nodes(), 0)
+
+    def test_analyzer_export(self):
+        repo = self.test_dir / "repo"
+        (repo / "pkg").mkdir(parents=True)
+        (repo / "pkg" / "__init__.py").write_text("from . import a\n", encoding="utf-8")
+        (repo / "pkg" / "a.py").write_text("import json\n", encoding="utf-8")
+        for backend in DependencyAnalyzer.BACKENDS:
+            analyzer = DependencyAnalyzer(str(repo), backend=backend)
+            analyzer.analyze_repository()
+            analyzer.export_graph_data(str(self.test_dir / f"{backend}.jsonl.gz"))
+            analyzer.export_graph_data(str(self.test_dir / f"{backend}.json"))
+            loaded = load_graph(self.test_dir / f"{backend}.jsonl.gz", backend="networkx")
+            self.assertEqual(set(loaded.edges()), set(analyzer.to_networkx().edges()))
+            with open(self.test_dir / f"{backend}.json", encoding="utf-8") as f:
+                self.assertEqual(len(nx.node_link_graph(json.load(f)).edges()), 2)
+            analyzer.export_graph_data(str(self.test_dir / f"{backend}.json.gz"))
+            with gzip.open(self.test_dir / f"{backend}.json.gz", "rt", encoding="utf-8") as f:
+                self.assertEqual(len(nx.node_link_graph(json.load(f)).edges()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+HEAVY = (
+    "matplotlib", "seaborn", "pandas", "numpy", "plotly", "wordcloud",
+    "z3", "pysnooper", "libcst", "networkx", "pydriller", "requests",
+)
+
+
+def imported_modules(statement):
+    """用 python -X importtime 执行语句，返回 顶层包名 -> 累计导入耗时（微秒）"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        try:
+            modules[name.strip()] = int(cumulative)
+        except ValueError:
+            continue  # 表头
+    return modules
+
+
+class TestImportTime(unittest.TestCase):
+    def assertNotLoaded(self, statement, allowed=()):
+        loaded = {name.split(".")[0] for name in imported_modules(statement)}
+        heavy = sorted(loaded.intersection(HEAVY).difference(allowed))
+        self.assertEqual(heavy, [], f"{statement!r} 加载了重型依赖")
+
+    def test_main_entry_is_light(self):
+        modules = imported_modules("import main")
+        self.assertNotLoaded("import main")
+        self.assertLess(modules["main"], 500_000)
+
+    def test_packages_are_lazy(self):
+        self.assertNotLoaded("import collectors")
+        self.assertNotLoaded("import visualizers")
+        self.assertNotLoaded("import analyzers.dynamic_tracer")
+
+    def test_stage_loads_only_its_dependencies(self):
+        self.assertNotLoaded("from collectors import CommitCollector", allowed=("pydriller",))
+        self.assertNotLoaded("from collectors import GitHubCollector", allowed=("requests",))
+        self.assertNotLoaded(
+            "from visualizers.generator import VisualizationGenerator",
+            allowed=("matplotlib", "numpy"),
+        )
+
+    def test_lazy_exports_resolve(self):
+        import collectors
+        import visualizers
+
+        self.assertEqual(collectors.CommitInfo.__name__, "CommitInfo")
+        self.assertIn("DataExporter", dir(collectors))
+        self.assertIn("TrendsChart", visualizers.__all__)
+        with self.assertRaises(AttributeError):
+            collectors.Missing
+
+
+if __name__ == "__main__":
+    unittest.main()
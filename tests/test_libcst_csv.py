@@ -39,6 +39,18 @@ def test_func(x: int):
             content = f.read()
             self.assertIn("test_func", content)
 
+    def test_bare_name_and_qualname_columns(self):
+        with open(self.test_file, "w") as f:
+            f.write("class Handler:\n    def handle(self, event: str) -> None:\n        pass\n")
+        self.analyzer.analyze_file(self.test_file)
+        self.analyzer.export_to_csv("types.csv")
+
+        with open("types.csv", newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(list(rows[0].keys()), LibCSTAnalyzer.CSV_HEADERS)
+        self.assertEqual({row["函数"] for row in rows}, {"handle"})
+        self.assertEqual({row["限定名"] for row in rows}, {"Handler.handle"})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,52 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest
+from pathlib import Path
+from analyzers.libcst_analyzer import LibCSTAnalyzer
+
+
+class TestLibCSTParallel(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_repo_parallel")
+        self.test_dir.mkdir(exist_ok=True)
+        self.files = []
+        for i in range(6):
+            path = self.test_dir / f"mod{i}.py"
+            with open(path, "w") as f:
+                f.write(
+                    f"def typed_{i}(a: int, b: str = '') -> bool:\n"
+                    f"    return True\n\n"
+                    f"def untyped_{i}(x, y):\n"
+                    f"    return x\n"
+                )
+            self.files.append(path)
+        bad = self.test_dir / "bad.py"
+        with open(bad, "w") as f:
+            f.write("def broken(")
+        self.files.append(bad)
+
+    def tearDown(self):
+        import shutil
+
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_parallel_matches_serial(self):
+        serial = LibCSTAnalyzer(str(self.test_dir))
+        serial.analyze_files(self.files, workers=1)
+
+        parallel = LibCSTAnalyzer(str(self.test_dir))
+        parallel.analyze_files(self.files, workers=2, chunksize=2)
+
+        self.assertEqual(serial.type_annotations, parallel.type_annotations)
+        self.assertEqual(serial.coverage_data, parallel.coverage_data)
+        self.assertEqual(serial.calculate_coverage(), parallel.calculate_coverage())
+        self.assertEqual(len(parallel.errors), 1)
+        self.assertEqual(len(parallel.skipped_files), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
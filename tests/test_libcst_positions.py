@@ -0,0 +1,118 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest
+from pathlib import Path
+from analyzers.libcst_analyzer import LibCSTAnalyzer
+
+
+class TestLibCSTPositions(unittest.TestCase):
+    def setUp(self):
+        self.test_code = """from typing import Dict
+
+
+class Handler:
+    @staticmethod
+    def handle(
+        event: str,
+        payload: Dict[
+            str, int
+        ],
+        retries,
+    ) -> bool:
+        return True
+
+
+async def run(flag: bool) -> None:
+    pass
+"""
+        self.test_dir = Path("test_repo_positions")
+        (self.test_dir / "pkg").mkdir(parents=True, exist_ok=True)
+        self.test_file = self.test_dir / "pkg" / "handler.py"
+        with open(self.test_file, "w") as f:
+            f.write(self.test_code)
+        self.relative = str(Path("pkg") / "handler.py")
+
+    def tearDown(self):
+        import shutil
+
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_line_numbers(self):
+        analyzer = LibCSTAnalyzer(str(self.test_dir), positions=True)
+        analyzer.analyze_file(self.test_file)
+
+        lines = {(a.function_name, a.arg_name): a.line_no for a in analyzer.type_annotations}
+        self.assertEqual(lines[("Handler.handle", "event")], 7)
+        self.assertEqual(lines[("Handler.handle", "payload")], 8)
+        self.assertEqual(lines[("Handler.handle", "return")], 12)
+        self.assertEqual(lines[("run", "flag")], 16)
+
+    def test_lines_default_to_zero(self):
+        analyzer = LibCSTAnalyzer(str(self.test_dir))
+        analyzer.analyze_file(self.test_file)
+        self.assertTrue(all(a.line_no == 0 for a in analyzer.type_annotations))
+        self.assertEqual(analyzer.index.by_line, {})
+
+    def test_file_index_lookups(self):
+        analyzer = LibCSTAnalyzer(str(self.test_dir), positions=True)
+        analyzer.analyze_file(self.test_file)
+
+        entry = analyzer.get_file_annotations(self.relative)
+        self.assertEqual(entry.functions["Handler.handle"]["total_params"], 3)
+        self.assertEqual(entry.functions["Handler.handle"]["annotated_params"], 2)
+        self.assertEqual(entry.functions["run"]["return_annotated"], 1)
+        self.assertEqual(entry.coverage["total_functions"], 2)
+
+        handle = analyzer.find_annotations(self.relative, function_name="Handler.handle")
+        self.assertEqual([a.arg_name for a in handle], ["return", "event", "payload"])
+        at_line = analyzer.find_annotations(self.relative, line_no=16)
+        self.assertEqual([a.arg_name for a in at_line], ["return", "flag"])
+        at_line = analyzer.find_annotations(self.relative, function_name="Handler.handle", line_no=7)
+        self.assertEqual([a.arg_name for a in at_line], ["event"])
+        self.assertEqual(analyzer.find_annotations("missing.py"), [])
+
+    def test_backends_agree_on_positions(self):
+        results = []
+        for backend in ("libcst", "ast"):
+            analyzer = LibCSTAnalyzer(str(self.test_dir), backend=backend, positions=True)
+            analyzer.analyze_files([self.test_file], workers=1)
+            results.append(analyzer)
+
+        # 多行注解的文本格式不同（ast.unparse 会规范化），位置和统计必须一致
+        positions = [
+            [(a.function_name, a.arg_name, a.line_no) for a in r.type_annotations]
+            for r in results
+        ]
+        self.assertEqual(positions[0], positions[1])
+        self.assertEqual(
+            results[0].get_file_annotations(self.relative).functions,
+            results[1].get_file_annotations(self.relative).functions,
+        )
+
+    def test_same_method_name_in_different_classes(self):
+        with open(self.test_file, "w") as f:
+            f.write(
+                "class A:\n"
+                "    def __init__(self, x: int):\n"
+                "        def inner(y: str) -> None: pass\n"
+                "class B:\n"
+                "    def __init__(self, x, y: str) -> None: pass\n"
+            )
+        for backend in ("libcst", "ast"):
+            analyzer = LibCSTAnalyzer(str(self.test_dir), backend=backend)
+            analyzer.analyze_files([self.test_file], workers=1)
+            functions = analyzer.get_file_annotations(self.relative).functions
+            self.assertEqual(set(functions), {"A.__init__", "A.__init__.inner", "B.__init__"}, backend)
+            self.assertEqual(functions["A.__init__"]["annotated_params"], 1)
+            self.assertEqual(functions["B.__init__"]["total_params"], 3)
+            self.assertEqual(functions["B.__init__"]["return_annotated"], 1)
+            found = analyzer.find_annotations(self.relative, function_name="B.__init__")
+            self.assertEqual([a.arg_name for a in found], ["return", "y"])
+
+
+if __name__ == "__main__":
+    unittest.main()
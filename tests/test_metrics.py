@@ -0,0 +1,126 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest
+import csv
+import json
+import threading
+from pathlib import Path
+from utils.metrics import PipelineMetrics, StepMetrics
+
+
+class TestPipelineMetrics(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_metrics_output")
+        (self.test_dir / "json").mkdir(parents=True, exist_ok=True)
+        (self.test_dir / "csv").mkdir(parents=True, exist_ok=True)
+
+    def tearDown(self):
+        import shutil
+
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_stage_and_step_records(self):
+        metrics = PipelineMetrics()
+        with metrics.stage("analyze_ast") as record:
+            with metrics.step("parse"):
+                sum(i * i for i in range(20000))
+            metrics.count("files_parsed", 3)
+            metrics.count("files_parsed")
+        self.assertEqual(record.counters, {"files_parsed": 4})
+
+        step, stage = metrics.records
+        self.assertEqual((step.stage, step.step), ("analyze_ast", "parse"))
+        self.assertEqual((stage.stage, stage.step), ("analyze_ast", ""))
+        self.assertGreaterEqual(stage.wall_time, step.wall_time)
+        self.assertGreater(stage.cpu_time, 0)
+        self.assertIsNone(stage.tracemalloc_peak_kb)
+
+    def test_child_process_cpu_time(self):
+        import subprocess
+
+        metrics = PipelineMetrics()
+        with metrics.stage("analyze_ast") as record:
+            subprocess.run([sys.executable, "-c", "sum(i * i for i in range(3_000_000))"], check=True)
+        self.assertGreater(record.child_cpu_time, 0.05)
+        self.assertLess(record.cpu_time, record.child_cpu_time)
+        self.assertEqual(metrics.totals()["child_cpu_time"], record.child_cpu_time)
+
+    def test_count_outside_stage_ignored(self):
+        metrics = PipelineMetrics()
+        metrics.count("commits_read", 10)
+        self.assertEqual(metrics.records, [])
+
+    def test_counters_are_per_thread(self):
+        metrics = PipelineMetrics()
+        barrier = threading.Barrier(2)
+
+        def run(name, n):
+            with metrics.stage(name):
+                barrier.wait()
+                metrics.count("items", n)
+
+        threads = [threading.Thread(target=run, args=(f"s{n}", n)) for n in (1, 2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        counts = {r.stage: r.counters["items"] for r in metrics.records}
+        self.assertEqual(counts, {"s1": 1, "s2": 2})
+        self.assertEqual(metrics.totals()["counters"], {"items": 3})
+
+    def test_tracemalloc_peak(self):
+        metrics = PipelineMetrics(trace_memory=True)
+        try:
+            with metrics.stage("alloc"):
+                data = [bytes(1024) for _ in range(1000)]
+            del data
+        finally:
+            metrics.close()
+        self.assertGreater(metrics.records[0].tracemalloc_peak_kb, 900)
+
+    def test_merge_round_trip(self):
+        child = PipelineMetrics()
+        with child.stage("analyze_ast") as record:
+            record.count("files_parsed", 2)
+        parent = PipelineMetrics()
+        parent.merge(child.to_dicts())
+        self.assertIsInstance(parent.records[0], StepMetrics)
+        self.assertEqual(parent.records[0].counters, {"files_parsed": 2})
+
+    def test_export(self):
+        metrics = PipelineMetrics()
+        with metrics.stage("collect_commits"):
+            metrics.count("commits_read", 5)
+            with metrics.step("export"):
+                pass
+        metrics.export(self.test_dir)
+
+        with open(self.test_dir / "json" / "pipeline_metrics.json", encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual(data["totals"]["stages"], 1)
+        self.assertEqual(data["totals"]["counters"], {"commits_read": 5})
+        self.assertEqual(len(data["records"]), 2)
+
+        with open(self.test_dir / "csv" / "pipeline_metrics.csv", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(list(rows[0].keys()), PipelineMetrics.CSV_HEADERS)
+        self.assertEqual(json.loads(rows[1]["counters"]), {"commits_read": 5})
+
+    def test_github_request_counter(self):
+        import requests
+        from requests.hooks import dispatch_hook
+        from collectors.github_collector import GitHubCollector
+
+        collector = GitHubCollector()
+        for _ in range(3):
+            dispatch_hook("response", collector.session.hooks, requests.Response())
+        self.assertEqual(collector.request_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
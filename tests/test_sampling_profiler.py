@@ -0,0 +1,107 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest
+import threading
+import time
+from pathlib import Path
+from analyzers.dynamic_tracer import CallbackTrace, DynamicTracer
+from analyzers.sampling_profiler import SamplingProfiler
+
+
+def spin(seconds):
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += 1
+    return total
+
+
+def hot_path():
+    return spin(0.15)
+
+
+def outer():
+    return hot_path()
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_collapsed_stacks(self):
+        sampler = SamplingProfiler(interval=0.002)
+        self.assertGreater(sampler.profile(outer), 0)
+        self.assertFalse(sampler.running)
+        self.assertGreater(sampler.samples, 10)
+
+        collapsed = sampler.collapsed()
+        self.assertEqual(sum(collapsed.values()), sampler.samples)
+        chains = [stack for stack in collapsed if "outer" in stack]
+        self.assertTrue(chains)
+        frames = [name.rsplit(".", 1)[-1] for name in chains[0].split(";")]
+        self.assertEqual(frames[frames.index("outer"):frames.index("outer") + 3], ["outer", "hot_path", "spin"])
+        self.assertFalse(any("sampling_profiler.SamplingProfiler" in stack for stack in collapsed))
+
+        counts = {name.rsplit(".", 1)[-1]: (own, total) for name, own, total in sampler.function_counts()}
+        self.assertGreater(counts["spin"][0], 0)
+        self.assertEqual(counts["outer"][0], 0)
+        self.assertGreaterEqual(counts["outer"][1], counts["spin"][1])
+
+        hot = sampler.hot_stacks(1)[0]
+        self.assertTrue(hot["function"].endswith(".spin"))
+        self.assertTrue(hot["source"])
+        self.assertLess(sampler.overhead(), 0.5)
+
+    def test_only_target_thread_by_default(self):
+        thread = threading.Thread(target=spin, args=(0.1,))
+        sampler = SamplingProfiler(interval=0.002)
+        with sampler:
+            thread.start()
+            time.sleep(0.1)
+            thread.join()
+        self.assertFalse(any(stack.endswith(".spin") for stack in sampler.collapsed()))
+
+        sampler = SamplingProfiler(interval=0.002, all_threads=True)
+        thread = threading.Thread(target=spin, args=(0.1,))
+        with sampler:
+            thread.start()
+            thread.join()
+        self.assertTrue(any(stack.endswith(".spin") for stack in sampler.collapsed()))
+
+    def test_invalid_interval(self):
+        with self.assertRaises(ValueError):
+            SamplingProfiler(interval=0)
+
+
+class TestTracerSampling(unittest.TestCase):
+    def setUp(self):
+        self.tracer = DynamicTracer(trace_dir="test_sample_traces")
+
+    def tearDown(self):
+        import shutil
+
+        if Path("test_sample_traces").exists():
+            shutil.rmtree("test_sample_traces")
+
+    def test_sample_callback(self):
+        trace = self.tracer.sample_callback(spin, "unit", 0.1, interval=0.002, limit=3)
+        self.assertIsInstance(trace, CallbackTrace)
+        self.assertEqual(trace.callback_name, "spin")
+        self.assertLess(trace.start_time, trace.end_time)
+        self.assertTrue(trace.execution_path)
+        self.assertLessEqual(len(trace.execution_path), 3)
+        event = trace.execution_path[0]
+        self.assertEqual(event.event_type, "sample")
+        self.assertTrue(event.function_name.endswith(".spin"))
+        self.assertGreater(event.locals["samples"], 0)
+
+        folded = self.tracer.trace_dir / "sample_callback_spin.folded"
+        lines = folded.read_text(encoding="utf-8").splitlines()
+        stack, count = lines[0].rsplit(" ", 1)
+        self.assertTrue(stack.endswith(".spin"))
+        self.assertGreater(int(count), 0)
+        self.assertEqual(self.tracer.get_trace_summary()["samples"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest
+import threading
+import time
+from functools import partial
+from exceptions import ConfigurationError
+from utils.scheduler import Stage, StageScheduler
+
+
+class TestStageScheduler(unittest.TestCase):
+    def setUp(self):
+        self.order = []
+        self.lock = threading.Lock()
+
+    def _record(self, name, delay=0.0):
+        def run():
+            time.sleep(delay)
+            with self.lock:
+                self.order.append(name)
+
+        return run
+
+    def test_dependencies_respected(self):
+        stages = [
+            Stage("summary", self._record("summary"), inputs=("a", "b")),
+            Stage("a", self._record("a", 0.05), outputs=("a",)),
+            Stage("b", self._record("b"), outputs=("b",)),
+        ]
+        results = StageScheduler(stages, max_workers=3).run()
+        self.assertEqual(self.order[-1], "summary")
+        self.assertTrue(all(r.status == "completed" for r in results.values()))
+
+    def test_independent_stages_overlap(self):
+        stages = [Stage(f"s{i}", self._record(f"s{i}", 0.2), outputs=(f"o{i}",)) for i in range(3)]
+        start = time.perf_counter()
+        StageScheduler(stages, max_workers=3).run()
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_single_worker_keeps_declaration_order(self):
+        stages = [Stage(n, self._record(n), outputs=(n,)) for n in ("x", "y", "z")]
+        StageScheduler(stages, max_workers=1).run()
+        self.assertEqual(self.order, ["x", "y", "z"])
+
+    def test_exclusive_group_never_overlaps(self):
+        active = []
+        peak = []
+
+        def chart():
+            with self.lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with self.lock:
+                active.pop()
+
+        stages = [Stage(f"c{i}", chart, exclusive="pyplot") for i in range(3)]
+        StageScheduler(stages, max_workers=3).run()
+        self.assertEqual(max(peak), 1)
+
+    def test_exclusive_group_covers_process_stages(self):
+        stages = [
+            Stage("pool_a", partial(time.sleep, 0.3), executor="process", exclusive="cpu_pool"),
+            Stage("pool_b", self._record("pool_b", 0.1), exclusive="cpu_pool"),
+            Stage("other", self._record("other")),
+        ]
+        results = StageScheduler(stages, max_workers=3).run()
+        first, second = results["pool_a"], results["pool_b"]
+        self.assertGreaterEqual(second.started_at, first.started_at + first.duration)
+        # 其他阶段不受互斥组影响
+        self.assertLess(results["other"].started_at, first.started_at + first.duration)
+
+    def test_failure_skips_downstream(self):
+        def boom():
+            raise RuntimeError("boom")
+
+        stages = [
+            Stage("a", boom, outputs=("a",)),
+            Stage("b", self._record("b"), inputs=("a",), outputs=("b",)),
+            Stage("c", self._record("c"), inputs=("b",)),
+            Stage("d", self._record("d")),
+        ]
+        scheduler = StageScheduler(stages, max_workers=2)
+        results = scheduler.run()
+        self.assertEqual(results["a"].status, "failed")
+        self.assertIsInstance(results["a"].error, RuntimeError)
+        self.assertEqual(results["b"].status, "skipped")
+        self.assertEqual(results["c"].status, "skipped")
+        self.assertEqual(results["d"].status, "completed")
+        self.assertEqual([r.name for r in scheduler.failed], ["a"])
+
+    def test_process_stage_result_applied(self):
+        received = []
+        stages = [
+            Stage("pow", partial(pow, 2, 10), outputs=("n",), executor="process",
+                  on_result=received.append),
+            Stage("after", self._record("after"), inputs=("n",)),
+        ]
+        results = StageScheduler(stages, max_workers=2).run()
+        self.assertEqual(received, [1024])
+        self.assertEqual(results["after"].status, "completed")
+
+    def test_cycle_rejected(self):
+        stages = [
+            Stage("a", self._record("a"), inputs=("b",), outputs=("a",)),
+            Stage("b", self._record("b"), inputs=("a",), outputs=("b",)),
+        ]
+        with self.assertRaises(ConfigurationError):
+            StageScheduler(stages)
+
+    def test_duplicate_output_rejected(self):
+        stages = [
+            Stage("a", self._record("a"), outputs=("x",)),
+            Stage("b", self._record("b"), outputs=("x",)),
+        ]
+        with self.assertRaises(ConfigurationError):
+            StageScheduler(stages)
+
+
+if __name__ == "__main__":
+    unittest.main()
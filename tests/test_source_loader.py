@@ -0,0 +1,77 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest
+from pathlib import Path
+from utils.source_loader import SourceLoader
+from analyzers.ast_analyzer import ASTAnalyzer
+from analyzers.libcst_analyzer import LibCSTAnalyzer
+
+
+class TestSourceLoader(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_repo_loader")
+        self.test_dir.mkdir(exist_ok=True)
+
+        self.latin1_file = self.test_dir / "latin1.py"
+        with open(self.latin1_file, "wb") as f:
+            f.write(
+                "# -*- coding: latin-1 -*-\n"
+                "def café(x: int) -> str:\n"
+                "    return 'déjà'\n".encode("latin-1")
+            )
+
+        self.bom_file = self.test_dir / "bom.py"
+        with open(self.bom_file, "wb") as f:
+            f.write(b"\xef\xbb\xbfdef with_bom(a: int):\n    pass\n")
+
+        self.bad_file = self.test_dir / "bad.py"
+        with open(self.bad_file, "w") as f:
+            f.write("def broken(")
+
+    def tearDown(self):
+        import shutil
+
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_encoding_cookie(self):
+        loader = SourceLoader()
+        with loader.open_bytes(self.latin1_file) as data:
+            self.assertEqual(loader.detect_encoding(data), "iso-8859-1")
+        self.assertIn("déjà", loader.read_text(self.latin1_file))
+
+        analyzer = ASTAnalyzer(str(self.test_dir))
+        analyzer.analyze_file(self.latin1_file)
+        analyzer.analyze_file(self.bom_file)
+        names = [f.name for f in analyzer.functions]
+        self.assertEqual(names, ["café", "with_bom"])
+        self.assertEqual(analyzer.skipped_files, [])
+
+    def test_libcst_honors_encoding(self):
+        analyzer = LibCSTAnalyzer(str(self.test_dir))
+        analyzer.analyze_file(self.latin1_file)
+        analyzer.analyze_file(self.bom_file)
+        functions = {a.function_name for a in analyzer.type_annotations}
+        self.assertEqual(functions, {"café", "with_bom"})
+
+    def test_mmap_path(self):
+        loader = SourceLoader(mmap_threshold=1)
+        tree = loader.parse_ast(self.latin1_file)
+        self.assertIsNotNone(tree)
+        self.assertIn("déjà", loader.read_text(self.latin1_file))
+
+    def test_skipped_reasons(self):
+        loader = SourceLoader()
+        self.assertIsNone(loader.parse_ast(self.bad_file))
+        self.assertIsNone(loader.parse_ast(self.test_dir / "missing.py"))
+        report = loader.report()
+        self.assertEqual(len(report), 2)
+        self.assertTrue(report[0]["reason"].startswith("SyntaxError"))
+        self.assertTrue(report[1]["reason"].startswith("FileNotFoundError"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest
+import csv
+import json
+from pathlib import Path
+from analyzers.ast_analyzer import ASTAnalyzer
+from analyzers.libcst_analyzer import LibCSTAnalyzer
+from utils.streaming import CSVStreamWriter, JSONLStreamWriter, StreamingWriter, open_stream_writer
+
+
+class TestStreamingExport(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_repo_streaming")
+        self.test_dir.mkdir(exist_ok=True)
+        self.files = []
+        for i in range(3):
+            path = self.test_dir / f"m{i}.py"
+            with open(path, "w") as f:
+                f.write(f"def f{i}(a: int, b) -> str:\n    pass\n\nclass C{i}:\n    pass\n")
+            self.files.append(path)
+        self.outputs = [Path(n) for n in ("stream.csv", "stream.jsonl", "report.jsonl", "full.csv")]
+
+    def tearDown(self):
+        import shutil
+
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+        for path in self.outputs:
+            if path.exists():
+                path.unlink()
+
+    def test_ast_rows_written_per_file(self):
+        analyzer = ASTAnalyzer(str(self.test_dir), compact=True)
+        with JSONLStreamWriter("stream.jsonl") as sink:
+            analyzer.add_sink(sink)
+            analyzer.analyze_file(self.files[0])
+            # 每个文件分析完成后即已刷新到磁盘
+            with open("stream.jsonl", encoding="utf-8") as f:
+                self.assertEqual(len(f.readlines()), 2)
+            for path in self.files[1:]:
+                analyzer.analyze_file(path)
+
+        with open("stream.jsonl", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]["file"], "m0.py")
+        self.assertEqual(rows[1]["type"], "class")
+
+    def test_libcst_stream_matches_export(self):
+        analyzer = LibCSTAnalyzer(str(self.test_dir))
+        with CSVStreamWriter("stream.csv", LibCSTAnalyzer.CSV_HEADERS) as sink:
+            analyzer.add_sink(sink)
+            analyzer.analyze_files(self.files, workers=1)
+        analyzer.export_to_csv("full.csv")
+
+        with open("stream.csv", encoding="utf-8") as f1, open("full.csv", encoding="utf-8") as f2:
+            self.assertEqual(list(csv.reader(f1)), list(csv.reader(f2)))
+
+    def test_coverage_report_jsonl(self):
+        analyzer = LibCSTAnalyzer(str(self.test_dir))
+        analyzer.analyze_files(self.files, workers=1)
+        analyzer.export_coverage_report(Path("report.jsonl"))
+
+        with open("report.jsonl", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(rows[0]["类型"], "覆盖率统计")
+        self.assertEqual(rows[0]["函数总数"], 3)
+        self.assertEqual(sum(1 for r in rows if r["类型"] == "注解"), 6)
+
+    def test_base_writer_is_abstract(self):
+        with self.assertRaises(TypeError):
+            StreamingWriter("stream.jsonl")
+
+    def test_open_stream_writer(self):
+        writer = open_stream_writer("stream.jsonl")
+        self.assertIsInstance(writer, JSONLStreamWriter)
+        writer.close()
+        with self.assertRaises(ValueError):
+            open_stream_writer("stream.csv")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest
+from pathlib import Path
+import numpy as np
+from analyzers.call_profiler import CallProfiler
+from analyzers.dynamic_tracer import DynamicTracer
+from analyzers.trace_format import (
+    EVENT_CALL, EVENT_LINE, EVENT_RETURN, RECORD_DTYPE, TraceReader, TraceWriter, is_binary_trace,
+)
+
+
+def child(n):
+    return n + 1
+
+
+def root():
+    return [child(i) for i in range(3)]
+
+
+def twins():
+    return [i for i in range(2)], [child(i) for i in range(2)]
+
+
+class TestTraceFormat(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_trace_format")
+        self.test_dir.mkdir(exist_ok=True)
+        self.path = self.test_dir / "events.trace"
+
+    def tearDown(self):
+        import shutil
+
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def write_sample(self, **kwargs):
+        with TraceWriter(self.path, **kwargs) as writer:
+            main = writer.code_id("app.main", "app.py", 1)
+            helper = writer.code_id("app.helper", "app.py", 10)
+            self.assertEqual(writer.code_id("app.main", "app.py", 1), main)
+            writer.write(100, EVENT_CALL, main, 1)
+            writer.write(110, EVENT_LINE, main, 2)
+            writer.write(120, EVENT_CALL, helper, 10)
+            writer.write(130, EVENT_RETURN, helper, 11)
+            writer.write(140, EVENT_RETURN, main, 3)
+
+    def test_round_trip(self):
+        self.write_sample(buffer_size=2)
+        self.assertTrue(is_binary_trace(self.path))
+
+        reader = TraceReader(self.path)
+        self.assertEqual(len(reader), 5)
+        self.assertEqual(reader.strings, ["app.main", "app.py", "app.helper"])
+        self.assertEqual(reader.code_info(1), {"function": "app.helper", "filename": "app.py", "lineno": 10})
+        events = list(reader)
+        self.assertEqual(events[0], (100, "call", "app.main", 1))
+        self.assertEqual(events[2].function, "app.helper")
+        self.assertEqual([e.event for e in events], ["call", "line", "call", "return", "return"])
+
+    def test_structured_array_is_memory_mapped(self):
+        self.write_sample()
+        reader = TraceReader(self.path, chunk_size=2)
+        records = reader.records()
+        self.assertIsInstance(records, np.memmap)
+        self.assertEqual(records.dtype, RECORD_DTYPE)
+        self.assertEqual(records["timestamp"].tolist(), [100, 110, 120, 130, 140])
+        self.assertEqual([len(chunk) for chunk in reader.chunks()], [2, 2, 1])
+        self.assertEqual(reader.event_counts(), {"call": 2, "return": 2, "line": 1, "exception": 0})
+        self.assertEqual(reader.call_counts(), {"app.main": 1, "app.helper": 1})
+        self.assertEqual(reader.time_range(), (100, 140))
+
+    def test_write_array(self):
+        records = np.zeros(1000, dtype=RECORD_DTYPE)
+        records["timestamp"] = np.arange(1000)
+        records["event"] = np.arange(1000) % 2
+        with TraceWriter(self.path) as writer:
+            writer.code_id("f")
+            writer.write(-1, EVENT_LINE, 0, 7)
+            writer.write_array(records)
+        reader = TraceReader(self.path, chunk_size=64)
+        self.assertEqual(len(reader), 1001)
+        self.assertEqual(reader.records()["timestamp"][-1], 999)
+        self.assertEqual(reader.call_counts(), {"f": 500})
+
+    def test_empty_and_invalid(self):
+        with TraceWriter(self.path):
+            pass
+        reader = TraceReader(self.path)
+        self.assertEqual(list(reader), [])
+        self.assertEqual(reader.time_range(), (0, 0))
+
+        truncated = self.test_dir / "truncated.trace"
+        truncated.write_bytes(self.path.read_bytes()[:-3])
+        with self.assertRaises(ValueError):
+            TraceReader(truncated)
+
+        text = self.test_dir / "text.log"
+        text.write_text("not a trace", encoding="utf-8")
+        self.assertFalse(is_binary_trace(text))
+        with self.assertRaises(ValueError):
+            TraceReader(text)
+
+    def test_profiler_export(self):
+        profiler = CallProfiler(backend="setprofile")
+        profiler.profile(root)
+        self.assertEqual(profiler.export_trace(self.path), len(profiler.ring))
+
+        reader = TraceReader(self.path)
+        counts = {name.rsplit(".", 1)[-1]: count for name, count in reader.call_counts().items()}
+        self.assertEqual(counts["root"], 1)
+        self.assertEqual(counts["child"], 3)
+        self.assertEqual(reader.records()["line"][0], root.__code__.co_firstlineno)
+
+    def test_profiler_export_merged_code_objects(self):
+        profiler = CallProfiler(backend="setprofile")
+        profiler.profile(twins)
+        names = profiler.function_names()
+        self.assertEqual(len(names), len(set(names)) + 1)
+
+        profiler.export_trace(self.path)
+        reader = TraceReader(self.path)
+        self.assertEqual(len(reader.codes), len(set(names)))
+        counts = {name.rsplit(".", 1)[-1]: count for name, count in reader.call_counts().items()}
+        self.assertEqual(counts["<listcomp>"], 2)
+        self.assertEqual(counts["child"], 2)
+        self.assertEqual(len(list(reader)), len(profiler.ring))
+
+    def test_tracer_parses_binary_trace(self):
+        tracer = DynamicTracer(str(self.test_dir))
+        with tracer.profile("unit"):
+            root()
+        trace_path = self.test_dir / "profile_unit.trace"
+        entries = tracer.parse_trace_log(trace_path)
+        self.assertEqual(entries[0]["type"], "call")
+        self.assertTrue(entries[0]["function"].endswith(".root"))
+        self.assertIsInstance(entries[0]["timestamp"], int)
+        self.assertEqual(tracer.get_trace_summary()["binary_traces"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
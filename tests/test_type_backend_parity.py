@@ -0,0 +1,118 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import unittest
+from pathlib import Path
+from analyzers.libcst_analyzer import LibCSTAnalyzer
+
+PARITY_SOURCES = {
+    "plain.py": """
+def func_no_types(a, b):
+    return a + b
+
+def func_with_types(x: int, y: str) -> bool:
+    return True
+
+def func_partial(a: int, b) -> None:
+    pass
+""",
+    "generics.py": """
+from typing import Callable, Dict, List, Optional, Union
+
+def complex_func(items: List[str], mapping: Dict[str, int]) -> Optional[str]:
+    return items[0] if items else None
+
+def nested_generics(cb: Callable[[int, str], None], v: Union[int, List[Dict[str, int]]]) -> 'Forward':
+    pass
+
+def new_style(a: list[int] | None = None, *, b: dict[str, tuple[int, ...]]) -> int | str:
+    pass
+""",
+    "signatures.py": """
+def everything(p: int, /, q: str, *args: int, k: bool = False, **kwargs: object) -> None:
+    pass
+
+def bare_star(a, *, flag: bool):
+    pass
+
+async def fetch(url: str, timeout: float = 1.0) -> bytes:
+    return b""
+
+lambda_default = lambda x: x
+""",
+    "nested.py": """
+class Service:
+    def method(self, value: int) -> int:
+        def inner(z: float) -> float:
+            return z
+        return value
+
+    @staticmethod
+    def helper(a, b: 'Service'):
+        pass
+
+    class Inner:
+        async def run(self) -> None:
+            pass
+
+def outer(cb=lambda y: y):
+    def first(a: int):
+        pass
+    def second(b: str) -> str:
+        return b
+""",
+    "empty.py": "\n\n",
+    "comments.py": "# only a comment\n",
+    "broken.py": "def broken(",
+}
+
+
+class TestTypeBackendParity(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_repo_parity")
+        self.test_dir.mkdir(exist_ok=True)
+        self.files = []
+        for name, code in PARITY_SOURCES.items():
+            path = self.test_dir / name
+            with open(path, "w") as f:
+                f.write(code)
+            self.files.append(path)
+
+    def tearDown(self):
+        import shutil
+
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def _analyze(self, backend):
+        analyzer = LibCSTAnalyzer(str(self.test_dir), backend=backend)
+        analyzer.analyze_files(self.files, workers=1)
+        return analyzer
+
+    def test_annotations_identical(self):
+        libcst_result = self._analyze("libcst")
+        ast_result = self._analyze("ast")
+        self.assertEqual(libcst_result.type_annotations, ast_result.type_annotations)
+
+    def test_coverage_identical(self):
+        libcst_result = self._analyze("libcst")
+        ast_result = self._analyze("ast")
+        self.assertEqual(libcst_result.coverage_data, ast_result.coverage_data)
+        self.assertEqual(libcst_result.calculate_coverage(), ast_result.calculate_coverage())
+        self.assertEqual(
+            libcst_result.get_annotation_stats(), ast_result.get_annotation_stats()
+        )
+
+    def test_errors_reported(self):
+        self.assertEqual(len(self._analyze("ast").errors), 1)
+        self.assertEqual(len(self._analyze("libcst").errors), 1)
+
+    def test_invalid_backend(self):
+        with self.assertRaises(ValueError):
+            LibCSTAnalyzer(str(self.test_dir), backend="regex")
+
+
+if __name__ == "__main__":
+    unittest.main()
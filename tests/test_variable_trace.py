@@ -4,6 +4,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 import unittest
+import functools
 from analyzers.dynamic_tracer import DynamicTracer
 
 
@@ -23,10 +24,47 @@ class TestVariableTrace(unittest.TestCase):
             y = x * 2
             return y
 
-        self.tracer.trace_function_vars(sample_func, watch_vars=["x", "y"])
+        trace = self.tracer.trace_function_vars(sample_func, ["x", "y"], 2, 3)
+        self.assertEqual(trace.result, 10)
+        self.assertGreater(trace.duration_ns, 0)
 
-        expected_log = self.tracer.trace_dir / "vars_sample_func.log"
-        pass
+        changes = [e.locals for e in trace.execution_path if e.event_type == "var"]
+        self.assertEqual(changes, [{"x": "5"}, {"y": "10"}])
+        self.assertEqual(trace.execution_path[0].event_type, "call")
+        self.assertEqual(trace.execution_path[-1].locals, {"return": "10"})
+        self.assertEqual(trace.execution_path[1].source_line, "x = a + b")
+
+    def test_all_locals_and_bound(self):
+        def loop(n):
+            total = 0
+            for i in range(n):
+                total += i
+            return total
+
+        trace = self.tracer.trace_function_vars(loop, None, 500, max_events=20)
+        self.assertEqual(trace.result, sum(range(500)))
+        self.assertLessEqual(len(trace.execution_path), 20)
+        self.assertGreater(trace.dropped_events, 0)
+        self.assertEqual(trace.execution_path[0].event_type, "call")
+        self.assertTrue(all(e.event_type in ("call", "var", "return") for e in trace.execution_path))
+        self.assertIsNone(sys.gettrace())
+
+    def test_partial_and_callable_instance(self):
+        def scale(factor, value):
+            doubled = value * factor
+            return doubled
+
+        class Scaler:
+            def __call__(self, value):
+                doubled = value * 2
+                return doubled
+
+        for func in (functools.partial(scale, 2), Scaler()):
+            trace = self.tracer.trace_function_vars(func, ["doubled"], 4)
+            self.assertEqual(trace.result, 8)
+            self.assertEqual(trace.callback_name, type(func).__name__)
+            changes = [e.locals for e in trace.execution_path if e.event_type == "var"]
+            self.assertEqual(changes, [{"doubled": "8"}])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,386 @@
+"""
+资源受限的工作进程池
+对每个文件施加时间和内存上限：工作进程内用 SIGALRM 和 RLIMIT_AS 做软限制，
+父进程监控硬超时并终止、重建卡死的工作进程；超限的文件写入持久化隔离清单
+"""
+
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from multiprocessing.connection import wait
+from pathlib import Path
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows：只有父进程的硬超时生效
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# 会导致文件被隔离的结果状态
+QUARANTINE_STATUSES = ("timeout", "memory", "crashed")
+
+
+class FileTimeout(BaseException):
+    """
+    单个文件超时
+    继承 BaseException，避免被分析器内部的 except Exception 吞掉
+    """
+
+
+@dataclass
+class TaskOutcome:
+    """单个任务的执行结果"""
+
+    item: Any  # 任务参数（通常是文件路径）
+    status: str  # ok / error / timeout / memory / crashed
+    result: Any = None  # status 为 ok 时的返回值
+    error: str = ""  # 失败原因
+    duration: float = 0.0  # 耗时（秒）
+
+
+def _raise_timeout(signum, frame):
+    raise FileTimeout()
+
+
+def _limit_memory(memory_limit: Optional[int]):
+    if memory_limit and resource is not None:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            memory_limit = min(memory_limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, hard))
+
+
+def _worker_main(conn, func, initializer, initargs, time_limit, memory_limit):
+    """工作进程主循环：每次接收一批任务，逐个执行并逐个回传结果"""
+    _limit_memory(memory_limit)
+    if initializer is not None:
+        initializer(*initargs)
+    use_alarm = bool(time_limit) and hasattr(signal, "setitimer")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+
+    while True:
+        try:
+            chunk = conn.recv()
+        except EOFError:
+            break
+        if chunk is None:
+            break
+        for item in chunk:
+            started = time.perf_counter()
+            try:
+                if use_alarm:
+                    signal.setitimer(signal.ITIMER_REAL, time_limit)
+                try:
+                    message = ("ok", func(item), "")
+                finally:
+                    if use_alarm:
+                        signal.setitimer(signal.ITIMER_REAL, 0)
+            except FileTimeout:
+                message = ("timeout", None, f"超过 {time_limit}s 时间上限")
+            except MemoryError:
+                message = ("memory", None, "超过内存上限")
+            except Exception as e:
+                message = ("error", None, f"{type(e).__name__}: {e}")
+            conn.send(message + (time.perf_counter() - started,))
+            if message[0] == "memory":
+                # 内存耗尽后进程状态不可靠，退出并由父进程重建
+                return
+
+
+def run_serial(func: Callable[[Any], Any], items: Iterable[Any],
+               time_limit: Optional[float] = None) -> Iterator[TaskOutcome]:
+    """
+    在当前进程中逐个执行任务，产出与 BoundedWorkerPool.map 相同的 TaskOutcome
+
+    时间上限通过 SIGALRM 施加，只在主线程中生效（信号处理器只能在主线程安装）；
+    计时器在产出结果前取消，调用方处理结果时不会被超时打断。
+    当前进程无法单独限制内存，只捕获 MemoryError；其他异常与进程池一样转为 error 结果
+
+    参数:
+        func: 任务函数
+        items: 任务参数
+        time_limit: 单任务软超时（秒），None 表示不限制
+    """
+    use_alarm = (
+        bool(time_limit)
+        and hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+    )
+    if time_limit and not use_alarm:
+        logger.debug("非主线程中无法使用 SIGALRM，串行执行不施加时间上限")
+    previous = signal.signal(signal.SIGALRM, _raise_timeout) if use_alarm else None
+    try:
+        for item in items:
+            started = time.perf_counter()
+            try:
+                if use_alarm:
+                    signal.setitimer(signal.ITIMER_REAL, time_limit)
+                try:
+                    outcome = TaskOutcome(item, "ok", func(item))
+                finally:
+                    if use_alarm:
+                        signal.setitimer(signal.ITIMER_REAL, 0)
+            except FileTimeout:
+                outcome = TaskOutcome(item, "timeout", error=f"超过 {time_limit}s 时间上限")
+            except MemoryError:
+                outcome = TaskOutcome(item, "memory", error="超过内存上限")
+            except Exception as e:
+                outcome = TaskOutcome(item, "error", error=f"{type(e).__name__}: {e}")
+            outcome.duration = time.perf_counter() - started
+            yield outcome
+    finally:
+        if use_alarm:
+            signal.signal(signal.SIGALRM, previous)
+
+
+class _Worker:
+    def __init__(self, ctx, args):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn,) + args, daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks: Deque[Tuple[int, Any]] = deque()
+        self.started = 0.0  # 当前任务的开始时间
+
+    def assign(self, tasks: List[Tuple[int, Any]]):
+        self.tasks.extend(tasks)
+        self.started = time.monotonic()
+        self.conn.send([item for _, item in tasks])
+
+    def stop(self, timeout: float = 1.0):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class BoundedWorkerPool:
+    """
+    资源受限的进程池
+
+    - time_limit: 每个任务的软超时，在工作进程内通过 SIGALRM 中断纯 Python 代码
+    - hard_timeout: 父进程判定任务卡死的时间（如卡在 C 扩展中），超时后终止并重建工作进程
+    - memory_limit: 每个工作进程的地址空间上限（RLIMIT_AS），超限抛出 MemoryError
+    """
+
+    def __init__(
+        self,
+        func: Callable[[Any], Any],
+        workers: Optional[int] = None,
+        time_limit: Optional[float] = None,
+        memory_limit: Optional[int] = None,
+        hard_timeout: Optional[float] = None,
+        initializer: Optional[Callable] = None,
+        initargs: Tuple = (),
+    ):
+        """
+        初始化进程池
+
+        参数:
+            func: 任务函数（模块级函数，可被序列化）
+            workers: 工作进程数，默认为 CPU 数
+            time_limit: 单任务软超时（秒），None 表示不限制
+            memory_limit: 单个工作进程的内存上限（字节），None 表示不限制
+            hard_timeout: 单任务硬超时（秒），默认为 time_limit * 2 + 5
+            initializer: 工作进程初始化函数
+            initargs: 初始化函数参数
+        """
+        self.func = func
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.time_limit = time_limit
+        self.memory_limit = memory_limit
+        if hard_timeout is None and time_limit:
+            hard_timeout = time_limit * 2 + 5
+        self.hard_timeout = hard_timeout
+        self.initializer = initializer
+        self.initargs = initargs
+        self.restarts = 0
+        self._ctx = multiprocessing.get_context("spawn")
+
+    def _spawn(self) -> _Worker:
+        return _Worker(
+            self._ctx,
+            (self.func, self.initializer, self.initargs, self.time_limit, self.memory_limit),
+        )
+
+    def map(self, items: Iterable[Any], chunksize: int = 1) -> Iterator[TaskOutcome]:
+        """
+        执行全部任务，按输入顺序产出 TaskOutcome
+
+        参数:
+            items: 任务参数
+            chunksize: 每次分派给工作进程的任务数（超时仍按单个任务计算）
+        """
+        pending: Deque[Tuple[int, Any]] = deque(enumerate(items))
+        if not pending:
+            return
+        workers = [self._spawn() for _ in range(min(self.workers, len(pending)))]
+        done: Dict[int, TaskOutcome] = {}
+        next_index = 0
+
+        try:
+            while pending or any(w.tasks for w in workers):
+                for worker in workers:
+                    if not worker.tasks and pending:
+                        worker.assign([pending.popleft() for _ in range(min(chunksize, len(pending)))])
+
+                busy = [w for w in workers if w.tasks]
+                wait([w.conn for w in busy], timeout=self._wait_timeout(busy))
+
+                for i, worker in enumerate(workers):
+                    if not worker.tasks:
+                        continue
+                    replace = self._poll(worker, done, pending)
+                    if replace:
+                        self.restarts += 1
+                        workers[i] = self._spawn()
+
+                while next_index in done:
+                    yield done.pop(next_index)
+                    next_index += 1
+        finally:
+            for worker in workers:
+                worker.stop()
+
+    def _wait_timeout(self, busy: Sequence[_Worker]) -> Optional[float]:
+        if not self.hard_timeout:
+            return None
+        now = time.monotonic()
+        remaining = min(w.started + self.hard_timeout - now for w in busy)
+        return max(0.0, remaining)
+
+    def _poll(self, worker: _Worker, done: Dict[int, TaskOutcome],
+              pending: Deque[Tuple[int, Any]]) -> bool:
+        """处理工作进程的消息，返回是否需要重建该进程"""
+        try:
+            while worker.tasks and worker.conn.poll():
+                status, result, error, duration = worker.conn.recv()
+                index, item = worker.tasks.popleft()
+                done[index] = TaskOutcome(item, status, result, error, duration)
+                worker.started = time.monotonic()
+                if status == "memory":
+                    self._requeue(worker, pending)
+                    worker.kill()
+                    return True
+        except (EOFError, OSError):
+            index, item = worker.tasks.popleft()
+            code = worker.process.exitcode
+            done[index] = TaskOutcome(item, "crashed", error=f"工作进程异常退出 (exitcode={code})")
+            self._requeue(worker, pending)
+            worker.kill()
+            return True
+
+        if worker.tasks and self.hard_timeout:
+            elapsed = time.monotonic() - worker.started
+            if elapsed >= self.hard_timeout:
+                index, item = worker.tasks.popleft()
+                logger.warning(f"任务超过硬超时 {self.hard_timeout}s，终止工作进程: {item}")
+                done[index] = TaskOutcome(
+                    item, "timeout", error=f"超过 {self.hard_timeout}s 硬超时", duration=elapsed
+                )
+                self._requeue(worker, pending)
+                worker.kill()
+                return True
+        return False
+
+    @staticmethod
+    def _requeue(worker: _Worker, pending: Deque[Tuple[int, Any]]):
+        """把被终止进程中尚未执行的任务放回队首"""
+        while worker.tasks:
+            pending.appendleft(worker.tasks.pop())
+
+
+class Quarantine:
+    """
+    隔离清单
+    以绝对路径为键记录超限文件及其修改时间和大小；文件被修改后自动解除隔离
+    """
+
+    def __init__(self, path: Path):
+        """
+        初始化清单（存在时加载）
+
+        参数:
+            path: 清单 JSON 文件路径
+        """
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"隔离清单无法读取，将重新生成: {e}")
+
+    @staticmethod
+    def _key(file_path) -> str:
+        return str(Path(file_path).resolve())
+
+    @staticmethod
+    def _signature(file_path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reason(self, file_path) -> Optional[str]:
+        """文件仍处于隔离状态时返回隔离原因，否则返回 None"""
+        entry = self.entries.get(self._key(file_path))
+        if entry is None:
+            return None
+        signature = self._signature(file_path)
+        if signature is None or list(signature) != [entry["mtime_ns"], entry["size"]]:
+            return None
+        return entry["reason"]
+
+    def add(self, file_path, reason: str):
+        """隔离文件"""
+        signature = self._signature(file_path) or (0, 0)
+        self.entries[self._key(file_path)] = {
+            "mtime_ns": signature[0],
+            "size": signature[1],
+            "reason": reason,
+            "quarantined_at": datetime.now().isoformat(),
+        }
+
+    def partition(self, file_paths: Iterable) -> Tuple[List, List[Tuple[Any, str]]]:
+        """
+        拆分为待分析文件和被隔离文件
+
+        返回:
+            (待分析文件列表, [(被隔离文件, 原因)])
+        """
+        kept, quarantined = [], []
+        for file_path in file_paths:
+            reason = self.reason(file_path)
+            if reason is None:
+                kept.append(file_path)
+            else:
+                quarantined.append((file_path, reason))
+        return kept, quarantined
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
@@ -0,0 +1,288 @@
+"""
+运行清单与阶段检查点模块
+每个阶段完成后把其产出的状态序列化到 data/checkpoints，并在 run_manifest.json 中记录输入指纹；
+再次运行时指纹未变的阶段直接从检查点恢复
+"""
+
+from typing import Any, Dict, Iterable, Optional
+from datetime import datetime
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+import pickle
+import subprocess
+import threading
+
+from exceptions import ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+
+def repo_fingerprint(repo_path: Path) -> str:
+    """
+    仓库指纹：HEAD 提交加工作区改动内容的摘要
+    已跟踪文件的改动取 git diff HEAD 的内容，未跟踪文件取路径、大小和 mtime；
+    不是 Git 仓库时对全部文件的路径、大小和 mtime 取摘要
+
+    参数:
+        repo_path: 仓库路径
+
+    返回:
+        指纹字符串，仓库不存在或无法读取时返回空字符串
+    """
+    def git(*args: str, timeout: int = 60) -> bytes:
+        return subprocess.run(
+            ["git", "-C", str(repo_path), *args],
+            capture_output=True, check=True, timeout=timeout,
+        ).stdout
+
+    try:
+        head = git("rev-parse", "HEAD", timeout=30).decode().strip()
+    except (OSError, subprocess.SubprocessError):
+        return _tree_fingerprint(repo_path)
+    try:
+        diff = git("diff", "HEAD", "--binary")
+        untracked = [p for p in git("ls-files", "--others", "--exclude-standard", "-z").decode().split("\0") if p]
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning(f"无法获取仓库指纹: {e}")
+        return ""
+    if not diff and not untracked:
+        return head
+    digest = hashlib.sha256(diff)
+    _hash_stats(digest, Path(repo_path), untracked)
+    return f"{head}+{digest.hexdigest()[:12]}"
+
+
+def _tree_fingerprint(repo_path: Path) -> str:
+    """非 Git 目录的指纹：按发现顺序对每个文件的相对路径、大小和 mtime 取摘要"""
+    from utils.discovery import FileDiscovery
+
+    root = Path(repo_path)
+    if not root.is_dir():
+        logger.warning(f"无法获取仓库指纹: {root} 不是目录")
+        return ""
+    files = [p.relative_to(root).as_posix() for p in FileDiscovery(root, include=("*",), source="walk").files()]
+    digest = hashlib.sha256()
+    _hash_stats(digest, root, files)
+    return f"files+{digest.hexdigest()[:12]}"
+
+
+def _hash_stats(digest, root: Path, files: Iterable[str]) -> None:
+    for rel in files:
+        try:
+            st = os.stat(root / rel)
+        except OSError:
+            continue
+        digest.update(f"{rel}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+
+
+def stage_fingerprint(name: str, repo_fp: str, upstream: Iterable[str]) -> str:
+    """
+    阶段输入指纹：阶段名、仓库指纹和上游阶段指纹的哈希
+
+    参数:
+        name: 阶段名称
+        repo_fp: 仓库指纹
+        upstream: 上游阶段指纹
+    """
+    payload = json.dumps([name, repo_fp, sorted(upstream)])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class RunManifest:
+    """
+    运行清单
+    记录每个阶段的输入指纹、状态、耗时和检查点路径，可被多个阶段线程并发更新
+    """
+
+    def __init__(self, data_dir: Path):
+        """
+        初始化清单（存在旧清单时加载）
+
+        参数:
+            data_dir: 数据目录，清单写入 json/run_manifest.json，检查点写入 checkpoints/
+        """
+        self.path = Path(data_dir) / "json" / "run_manifest.json"
+        self.checkpoint_dir = Path(data_dir) / "checkpoints"
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        self.repo_fingerprint = ""
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"运行清单无法读取，将重新生成: {e}")
+            return
+        self.repo_fingerprint = data.get("repo_fingerprint", "")
+        self.stages = data.get("stages", {})
+
+    def save(self):
+        """原子写入清单"""
+        with self._lock:
+            data = {
+                "repo_fingerprint": self.repo_fingerprint,
+                "updated_at": datetime.now().isoformat(),
+                "stages": self.stages,
+            }
+            tmp = self.path.with_suffix(".json.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.path)
+
+    def checkpoint_path(self, name: str) -> Path:
+        return self.checkpoint_dir / f"{name}.pkl"
+
+    def is_valid(self, name: str, fingerprint: str) -> bool:
+        """阶段是否已以相同的输入指纹成功完成，且检查点文件存在"""
+        entry = self.stages.get(name)
+        return (
+            entry is not None
+            and entry.get("status") == "completed"
+            and entry.get("fingerprint") == fingerprint
+            and self.checkpoint_path(name).exists()
+        )
+
+    def record_completed(self, name: str, fingerprint: str, state: Dict[str, Any],
+                         duration: Optional[float] = None):
+        """
+        保存阶段检查点并记录完成状态
+
+        参数:
+            name: 阶段名称
+            fingerprint: 输入指纹
+            state: 阶段产出的属性（属性名 -> 值）
+            duration: 耗时（秒）
+        """
+        path = self.checkpoint_path(name)
+        tmp = path.with_suffix(".pkl.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self._record(name, fingerprint, "completed", duration, checkpoint=str(path))
+
+    def record_failed(self, name: str, fingerprint: str, error: BaseException,
+                      duration: Optional[float] = None):
+        self._record(name, fingerprint, "failed", duration, error=f"{type(error).__name__}: {error}")
+
+    def record_durations(self, durations: Dict[str, float]):
+        """
+        用调度器度量的墙钟耗时覆盖阶段记录中的耗时（进程阶段在记录完成时还没有耗时）
+
+        参数:
+            durations: 阶段名称 -> 耗时（秒）
+        """
+        with self._lock:
+            for name, duration in durations.items():
+                if name in self.stages:
+                    self.stages[name]["duration"] = duration
+
+    def _record(self, name: str, fingerprint: str, status: str,
+                duration: Optional[float], **extra):
+        with self._lock:
+            self.stages[name] = {
+                "fingerprint": fingerprint,
+                "status": status,
+                "finished_at": datetime.now().isoformat(),
+                "duration": duration,
+                **extra,
+            }
+        self.save()
+
+    def load_checkpoint(self, name: str) -> Dict[str, Any]:
+        """读取阶段检查点"""
+        with open(self.checkpoint_path(name), "rb") as f:
+            return pickle.load(f)
+
+
+def pipeline_fingerprints(stages, repo_fp: str) -> Dict[str, str]:
+    """
+    计算流水线中每个阶段的输入指纹（上游指纹变化会传递到全部下游）
+
+    参数:
+        stages: Stage 列表
+        repo_fp: 仓库指纹
+
+    返回:
+        阶段名称 -> 指纹
+    """
+    by_name = {s.name: s for s in stages}
+    producers = {output: s.name for s in stages for output in s.outputs}
+    fingerprints: Dict[str, str] = {}
+
+    def visit(name: str) -> str:
+        if name not in fingerprints:
+            upstream = [
+                visit(producers[i]) for i in by_name[name].inputs if i in producers
+            ]
+            fingerprints[name] = stage_fingerprint(name, repo_fp, upstream)
+        return fingerprints[name]
+
+    for stage in stages:
+        visit(stage.name)
+    return fingerprints
+
+
+def plan_stages(stages, manifest: RunManifest, fingerprints: Dict[str, str],
+                only: Optional[Iterable[str]] = None, skip: Iterable[str] = (),
+                resume: bool = False, force: bool = False):
+    """
+    决定哪些阶段需要执行、哪些从检查点恢复
+
+    - 选中的阶段默认执行；resume 时指纹未变的从检查点恢复
+    - 未选中的阶段有有效检查点则恢复，否则在被选中阶段依赖时自动补充执行
+    - force 忽略全部检查点
+
+    参数:
+        stages: Stage 列表
+        manifest: 运行清单
+        fingerprints: 阶段名称 -> 指纹
+        only: 只运行的阶段名称，None 表示全部
+        skip: 跳过的阶段名称
+        resume: 是否从检查点恢复
+        force: 是否忽略检查点
+
+    返回:
+        (待执行阶段列表, 待恢复阶段列表)，均保持声明顺序
+    """
+    names = [s.name for s in stages]
+    only = list(only) if only else None
+    skip = list(skip)
+    unknown = sorted(set(only or ()).union(skip) - set(names))
+    if unknown:
+        raise ConfigurationError(f"未知的阶段: {', '.join(unknown)}（可选: {', '.join(names)}）")
+
+    wanted = set(only) if only else set(names)
+    wanted.difference_update(skip)
+
+    def valid(name: str) -> bool:
+        return not force and manifest.is_valid(name, fingerprints[name])
+
+    run = {n for n in wanted if not (resume and valid(n))}
+    restore = {n for n in names if n not in run and valid(n)}
+
+    # 被执行阶段依赖、但既未选中也没有可用检查点的上游阶段需要补充执行
+    by_name = {s.name: s for s in stages}
+    producers = {output: s.name for s in stages for output in s.outputs}
+    queue = list(run)
+    while queue:
+        for name in by_name[queue.pop()].inputs:
+            producer = producers.get(name)
+            if producer and producer not in run and producer not in restore:
+                if producer in skip:
+                    continue
+                logger.info(f"补充执行上游阶段 {producer}")
+                run.add(producer)
+                queue.append(producer)
+
+    return (
+        [s for s in stages if s.name in run],
+        [s for s in stages if s.name in restore],
+    )
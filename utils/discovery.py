@@ -0,0 +1,311 @@
+"""
+文件发现模块
+用 os.scandir 遍历仓库并尽早剪枝被忽略的目录，遵循 .gitignore（或直接使用 git ls-files），
+支持包含/排除通配符和文件大小上限，并以目录 mtime 校验的方式缓存文件列表
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from fnmatch import fnmatchcase
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+# 默认剪枝的目录（按目录名匹配，支持通配符）
+DEFAULT_EXCLUDE_DIRS = (
+    ".git", ".hg", ".svn", "__pycache__", ".venv", "venv", "node_modules",
+    "build", "dist", ".tox", ".nox", ".eggs", "*.egg-info", ".mypy_cache",
+    ".pytest_cache", "site-packages",
+)
+
+
+class GitIgnore:
+    """
+    .gitignore 规则（常用子集）
+    支持注释、取反（!）、仅目录（结尾 /）、锚定（含 /）和通配符；子目录中的 .gitignore 相对其所在目录生效
+    """
+
+    def __init__(self):
+        # (所在目录的相对路径, 模式, 是否取反, 是否仅匹配目录, 是否锚定)
+        self.rules: List[Tuple[str, str, bool, bool, bool]] = []
+
+    def load(self, ignore_file: Path, base: str = ""):
+        """
+        加载一个 .gitignore 文件
+
+        参数:
+            ignore_file: .gitignore 路径
+            base: 其所在目录相对仓库根目录的路径（根目录为空字符串）
+        """
+        try:
+            lines = ignore_file.read_text(encoding="utf-8", errors="ignore").splitlines()
+        except OSError:
+            return
+        for line in lines:
+            line = line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            self.rules.append((base, line.lstrip("/"), negate, dir_only, anchored))
+
+    def ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """判断相对路径是否被忽略（最后一条匹配的规则生效）"""
+        result = False
+        name = rel_path.rsplit("/", 1)[-1]
+        for base, pattern, negate, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if base:
+                if not rel_path.startswith(base + "/"):
+                    continue
+                local = rel_path[len(base) + 1:]
+            else:
+                local = rel_path
+            if fnmatchcase(local if anchored else name, pattern):
+                result = not negate
+        return result
+
+
+class FileDiscovery:
+    """
+    文件发现器
+
+    source="git" 时使用 git ls-files（已跟踪 + 未被忽略的未跟踪文件），由 Git 处理忽略规则；
+    source="walk" 时用 os.scandir 遍历并自行解析 .gitignore；"auto" 在 Git 仓库中优先使用 git。
+    两种方式都会再应用 exclude_dirs、包含/排除通配符和大小上限。
+    """
+
+    SOURCES = ("auto", "git", "walk")
+
+    def __init__(
+        self,
+        root: Path,
+        include: Sequence[str] = ("*.py",),
+        exclude: Sequence[str] = (),
+        exclude_dirs: Sequence[str] = DEFAULT_EXCLUDE_DIRS,
+        max_size: Optional[int] = None,
+        respect_gitignore: bool = True,
+        source: str = "auto",
+        cache_path: Optional[Path] = None,
+    ):
+        """
+        初始化文件发现器
+
+        参数:
+            root: 仓库根目录
+            include: 包含的通配符（匹配相对路径或文件名）
+            exclude: 排除的通配符（匹配相对路径或文件名）
+            exclude_dirs: 剪枝的目录名通配符
+            max_size: 文件大小上限（字节），None 表示不限制
+            respect_gitignore: 是否遵循 .gitignore
+            source: "auto" / "git" / "walk"
+            cache_path: 文件列表缓存路径，None 表示不缓存到磁盘
+        """
+        if source not in self.SOURCES:
+            raise ValueError(f"未知的文件发现方式: {source}")
+        self.root = Path(root)
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.exclude_dirs = tuple(exclude_dirs)
+        self.max_size = max_size
+        self.respect_gitignore = respect_gitignore
+        self.source = source
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.cache_hit = False
+        self._files: Optional[List[Path]] = None
+
+    def files(self) -> List[Path]:
+        """
+        获取匹配的文件列表（按相对路径排序，结果在实例内缓存）
+
+        返回:
+            文件路径列表
+        """
+        if self._files is None:
+            relative = self._load_cache()
+            self.cache_hit = relative is not None
+            if relative is None:
+                if self.cache_path is not None:
+                    # 先创建缓存目录，避免写缓存时改变其父目录的 mtime 而令缓存立即失效
+                    self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+                relative, dirs = self._discover()
+                self._save_cache(relative, dirs)
+            self._files = [self.root / rel for rel in relative]
+        return list(self._files)
+
+    def __iter__(self):
+        return iter(self.files())
+
+    def _discover(self) -> Tuple[List[str], Dict[str, int]]:
+        source = self.source
+        if source == "auto":
+            source = "git" if self.respect_gitignore and (self.root / ".git").exists() else "walk"
+        if source == "git":
+            listed = self._git_ls_files()
+            if listed is not None:
+                return self._filter_listed(listed)
+            logger.info("git ls-files 不可用，改为遍历目录")
+        return self._walk()
+
+    def _git_ls_files(self) -> Optional[List[str]]:
+        args = ["git", "-C", str(self.root), "ls-files", "-z", "--cached", "--others"]
+        if self.respect_gitignore:
+            args.append("--exclude-standard")
+        try:
+            output = subprocess.run(args, capture_output=True, check=True, timeout=300).stdout
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.debug(f"git ls-files 失败: {e}")
+            return None
+        return [p for p in output.decode("utf-8", errors="surrogateescape").split("\0") if p]
+
+    def _filter_listed(self, listed: Iterable[str]) -> Tuple[List[str], Dict[str, int]]:
+        files = []
+        dirs = {""}
+        for rel in listed:
+            parts = rel.split("/")
+            if any(self._dir_excluded(part) for part in parts[:-1]):
+                continue
+            for i in range(1, len(parts)):
+                dirs.add("/".join(parts[:i]))
+            if not self._file_matches(rel, parts[-1]):
+                continue
+            if self.max_size is not None:
+                try:
+                    # 已删除但仍在索引中的文件也在这里被过滤
+                    if os.stat(self.root / rel).st_size > self.max_size:
+                        continue
+                except OSError:
+                    continue
+            elif not (self.root / rel).is_file():
+                continue
+            files.append(rel)
+        files.sort()
+        return files, self._dir_mtimes(dirs)
+
+    def _walk(self) -> Tuple[List[str], Dict[str, int]]:
+        ignore = GitIgnore()
+        files: List[str] = []
+        dirs: Dict[str, int] = {}
+        stack = [""]
+        while stack:
+            rel_dir = stack.pop()
+            directory = self.root / rel_dir if rel_dir else self.root
+            if self.respect_gitignore:
+                ignore.load(directory / ".gitignore", rel_dir)
+            try:
+                dirs[rel_dir] = os.stat(directory).st_mtime_ns
+                entries = list(os.scandir(directory))
+            except OSError as e:
+                logger.debug(f"无法读取目录 {directory}: {e}")
+                continue
+            for entry in entries:
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if is_dir:
+                    if self._dir_excluded(entry.name):
+                        continue
+                    if self.respect_gitignore and ignore.ignored(rel, True):
+                        continue
+                    stack.append(rel)
+                    continue
+                if not self._file_matches(rel, entry.name):
+                    continue
+                if self.respect_gitignore and ignore.ignored(rel, False):
+                    continue
+                if self.max_size is not None:
+                    try:
+                        if entry.stat().st_size > self.max_size:
+                            continue
+                    except OSError:
+                        continue
+                files.append(rel)
+        files.sort()
+        return files, dirs
+
+    def _dir_excluded(self, name: str) -> bool:
+        return any(fnmatchcase(name, pattern) for pattern in self.exclude_dirs)
+
+    def _file_matches(self, rel: str, name: str) -> bool:
+        if not any(fnmatchcase(rel, p) or fnmatchcase(name, p) for p in self.include):
+            return False
+        return not any(fnmatchcase(rel, p) or fnmatchcase(name, p) for p in self.exclude)
+
+    def _dir_mtimes(self, dirs: Iterable[str]) -> Dict[str, int]:
+        mtimes = {}
+        for rel in dirs:
+            try:
+                mtimes[rel] = os.stat(self.root / rel if rel else self.root).st_mtime_ns
+            except OSError:
+                continue
+        return mtimes
+
+    def _options_key(self) -> str:
+        payload = json.dumps([
+            str(self.root.resolve()), self.include, self.exclude, self.exclude_dirs,
+            self.max_size, self.respect_gitignore, self.source,
+        ])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _extra_signature(self) -> Dict[str, int]:
+        """目录 mtime 感知不到的输入：根目录 .gitignore 和 Git 索引"""
+        signature = {}
+        for rel in (".gitignore", ".git/index"):
+            try:
+                signature[rel] = os.stat(self.root / rel).st_mtime_ns
+            except OSError:
+                continue
+        return signature
+
+    def _load_cache(self) -> Optional[List[str]]:
+        if self.cache_path is None or not self.cache_path.exists():
+            return None
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("key") != self._options_key() or data.get("extra") != self._extra_signature():
+            return None
+        # 增删文件或子目录都会改变所在目录的 mtime；只需 stat 目录，无需重新列出内容
+        for rel, mtime in data.get("dirs", {}).items():
+            try:
+                if os.stat(self.root / rel if rel else self.root).st_mtime_ns != mtime:
+                    return None
+            except OSError:
+                return None
+        return data.get("files", [])
+
+    def _save_cache(self, files: List[str], dirs: Dict[str, int]):
+        if self.cache_path is None:
+            return
+        # 缓存目录位于仓库内时，它自身的 mtime 会随每次写缓存变化，不参与校验
+        try:
+            own = self.cache_path.parent.resolve().relative_to(self.root.resolve()).as_posix()
+            dirs.pop("" if own == "." else own, None)
+        except ValueError:
+            pass
+        # 同一进程中的多个线程阶段可能同时写缓存，临时文件名必须唯一
+        fd, tmp = tempfile.mkstemp(dir=self.cache_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"key": self._options_key(), "extra": self._extra_signature(), "dirs": dirs, "files": files},
+                    f,
+                )
+            os.replace(tmp, self.cache_path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
@@ -0,0 +1,213 @@
+"""
+流水线性能指标模块
+记录每个阶段及其子步骤的墙钟时间、CPU 时间、峰值内存和计数器，导出为 JSON 和 CSV
+"""
+
+from typing import Any, Dict, Iterator, List, Optional
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+import csv
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_kb() -> Optional[int]:
+    """当前进程的峰值常驻内存（KiB），平台不支持时返回 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 以字节为单位，Linux 以 KiB 为单位
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _children_cpu_time() -> float:
+    """已回收子进程的累计 CPU 时间（秒），Windows 上恒为 0"""
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+@dataclass
+class StepMetrics:
+    """单个阶段或子步骤的指标"""
+
+    stage: str  # 阶段名称
+    step: str = ""  # 子步骤名称，阶段本身为空
+    wall_time: float = 0.0  # 墙钟时间（秒）
+    cpu_time: float = 0.0  # 当前线程的 CPU 时间（秒）
+    child_cpu_time: float = 0.0  # 期间结束并被回收的子进程 CPU 时间（秒，进程级）
+    peak_rss_kb: Optional[int] = None  # 结束时的进程峰值 RSS（KiB）
+    tracemalloc_peak_kb: Optional[float] = None  # tracemalloc 峰值（KiB），未启用时为 None
+    counters: Dict[str, int] = field(default_factory=dict)  # 计数器，如 files_parsed
+
+    def count(self, name: str, value: int = 1):
+        """累加计数器"""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+
+class PipelineMetrics:
+    """
+    流水线指标收集器
+    CPU 时间使用 time.thread_time，阶段在线程中并发执行时互不干扰，但不含进程池中工作进程的计算；
+    工作进程的 CPU 时间单独记为 child_cpu_time（os.times 的子进程时间，进程结束被回收后才计入）。
+    child_cpu_time、峰值 RSS 和 tracemalloc 是进程级数据，只有串行执行时才能精确归属到单个阶段
+    """
+
+    CSV_HEADERS = [
+        "stage", "step", "wall_time", "cpu_time", "child_cpu_time",
+        "peak_rss_kb", "tracemalloc_peak_kb", "counters",
+    ]
+
+    def __init__(self, trace_memory: bool = False):
+        """
+        初始化收集器
+
+        参数:
+            trace_memory: 是否启用 tracemalloc 统计 Python 对象分配峰值（有明显开销）
+        """
+        self.trace_memory = trace_memory
+        self.records: List[StepMetrics] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._owns_tracing = trace_memory and not tracemalloc.is_tracing()
+        if self._owns_tracing:
+            tracemalloc.start()
+
+    def close(self):
+        """停止由本收集器启动的 tracemalloc"""
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StepMetrics]:
+        """
+        度量一个阶段
+
+        参数:
+            name: 阶段名称
+
+        返回:
+            StepMetrics，可在阶段内调用 count() 记录计数
+        """
+        previous = getattr(self._local, "record", None)
+        with self._measure(StepMetrics(stage=name)) as record:
+            self._local.record = record
+            try:
+                yield record
+            finally:
+                self._local.record = previous
+
+    @contextmanager
+    def step(self, name: str, stage: Optional[str] = None) -> Iterator[StepMetrics]:
+        """
+        度量阶段内的子步骤
+
+        参数:
+            name: 子步骤名称
+            stage: 所属阶段名称，默认取当前线程正在度量的阶段
+        """
+        if stage is None:
+            current = self.current()
+            stage = current.stage if current is not None else ""
+        with self._measure(StepMetrics(stage=stage, step=name)) as record:
+            yield record
+
+    def current(self) -> Optional[StepMetrics]:
+        """当前线程正在度量的阶段记录"""
+        return getattr(self._local, "record", None)
+
+    def count(self, name: str, value: int = 1):
+        """
+        累加当前线程所在阶段的计数器，不在阶段内时忽略
+
+        参数:
+            name: 计数器名称，如 files_parsed / commits_read / http_requests / charts_rendered
+            value: 增量
+        """
+        record = self.current()
+        if record is not None:
+            record.count(name, value)
+
+    @contextmanager
+    def _measure(self, record: StepMetrics) -> Iterator[StepMetrics]:
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        children = _children_cpu_time()
+        try:
+            yield record
+        finally:
+            record.wall_time = time.perf_counter() - wall
+            record.cpu_time = time.thread_time() - cpu
+            record.child_cpu_time = _children_cpu_time() - children
+            record.peak_rss_kb = peak_rss_kb()
+            if self.trace_memory:
+                record.tracemalloc_peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+            self.add(record)
+
+    def add(self, record: StepMetrics):
+        """加入一条记录（也用于合并子进程返回的记录）"""
+        with self._lock:
+            self.records.append(record)
+
+    def merge(self, records: List[Dict[str, Any]]):
+        """合并以字典形式传回的记录"""
+        for data in records:
+            self.add(StepMetrics(**data))
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [asdict(r) for r in self.records]
+
+    def totals(self) -> Dict[str, Any]:
+        """阶段级汇总：总墙钟时间、CPU 时间和累加后的计数器"""
+        stages = [r for r in self.to_dicts() if not r["step"]]
+        counters: Dict[str, int] = {}
+        for r in stages:
+            for key, value in r["counters"].items():
+                counters[key] = counters.get(key, 0) + value
+        return {
+            "stages": len(stages),
+            "wall_time": sum(r["wall_time"] for r in stages),
+            "cpu_time": sum(r["cpu_time"] for r in stages),
+            "child_cpu_time": sum(r["child_cpu_time"] for r in stages),
+            "peak_rss_kb": peak_rss_kb(),
+            "counters": counters,
+        }
+
+    def export_json(self, output_file: str):
+        """导出 JSON：汇总 + 全部记录"""
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(
+                {"totals": self.totals(), "records": self.to_dicts()},
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+    def export_csv(self, output_file: str):
+        """导出 CSV，每条记录一行，计数器序列化为 JSON 字符串"""
+        with open(output_file, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=self.CSV_HEADERS)
+            writer.writeheader()
+            for row in self.to_dicts():
+                row["counters"] = json.dumps(row["counters"], sort_keys=True)
+                writer.writerow(row)
+
+    def export(self, data_dir: Path):
+        """导出到 data/json/pipeline_metrics.json 和 data/csv/pipeline_metrics.csv"""
+        data_dir = Path(data_dir)
+        self.export_json(str(data_dir / "json" / "pipeline_metrics.json"))
+        self.export_csv(str(data_dir / "csv" / "pipeline_metrics.csv"))
@@ -0,0 +1,203 @@
+"""
+流水线调度模块
+每个阶段声明输入与输出，调度器按依赖关系把就绪的阶段并发提交到线程池或进程池
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass
+import logging
+import multiprocessing
+import time
+
+from exceptions import ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Stage:
+    """流水线阶段"""
+
+    name: str  # 阶段名称
+    func: Callable[[], Any]  # 执行函数（进程阶段必须可序列化）
+    inputs: Tuple[str, ...] = ()  # 依赖的数据名称
+    outputs: Tuple[str, ...] = ()  # 产出的数据名称
+    executor: str = "thread"  # "thread" 或 "process"
+    on_result: Optional[Callable[[Any], None]] = None  # 在调度线程中处理返回值
+    exclusive: Optional[str] = None  # 同组阶段互斥执行（如共享 pyplot 状态的图表阶段、各自持有进程池的分析阶段）
+
+
+@dataclass
+class StageResult:
+    """阶段执行结果"""
+
+    name: str  # 阶段名称
+    status: str  # completed / failed / skipped
+    duration: float = 0.0  # 墙钟耗时（秒）
+    error: Optional[BaseException] = None  # 失败时的异常
+    started_at: float = 0.0  # 相对流水线开始的启动时间（秒）
+
+
+class StageScheduler:
+    """
+    阶段调度器
+    没有生产者的输入视为外部数据，始终可用；上游失败或被跳过时下游阶段被跳过；
+    互斥组在提交时检查，同组阶段正在运行时其余阶段留在等待队列中（线程和进程阶段都适用，且不占用工作线程）
+    """
+
+    EXECUTORS = ("thread", "process")
+
+    def __init__(self, stages: Sequence[Stage], max_workers: int = 4):
+        """
+        初始化调度器
+
+        参数:
+            stages: 阶段列表（声明顺序即同时就绪时的提交顺序）
+            max_workers: 同时运行的阶段数上限；1 表示按声明顺序串行执行
+        """
+        self.stages = list(stages)
+        self.max_workers = max(1, max_workers)
+        self.results: Dict[str, StageResult] = {}
+        self._producers: Dict[str, str] = {}
+        self._produced: set = set()
+        self._validate()
+
+    def _validate(self):
+        names = set()
+        for stage in self.stages:
+            if stage.name in names:
+                raise ConfigurationError(f"阶段名称重复: {stage.name}")
+            if stage.executor not in self.EXECUTORS:
+                raise ConfigurationError(f"未知的执行器 {stage.executor}: {stage.name}")
+            names.add(stage.name)
+            for output in stage.outputs:
+                if output in self._producers:
+                    raise ConfigurationError(
+                        f"数据 {output} 被多个阶段产出: {self._producers[output]}, {stage.name}"
+                    )
+                self._producers[output] = stage.name
+        self._check_cycles()
+
+    def _check_cycles(self):
+        deps = {
+            s.name: {self._producers[i] for i in s.inputs if i in self._producers}
+            for s in self.stages
+        }
+        visiting, done = set(), set()
+
+        def visit(name: str, path: List[str]):
+            if name in done:
+                return
+            if name in visiting:
+                raise ConfigurationError(f"阶段依赖存在环: {' -> '.join(path + [name])}")
+            visiting.add(name)
+            for dep in deps[name]:
+                visit(dep, path + [name])
+            visiting.discard(name)
+            done.add(name)
+
+        for stage in self.stages:
+            visit(stage.name, [])
+
+    def _readiness(self, stage: Stage) -> str:
+        """返回 ready / waiting / blocked"""
+        for name in stage.inputs:
+            producer = self._producers.get(name)
+            if producer is None or name in self._produced:
+                continue
+            result = self.results.get(producer)
+            if result is not None and result.status != "completed":
+                return "blocked"
+            return "waiting"
+        return "ready"
+
+    def run(self) -> Dict[str, StageResult]:
+        """
+        执行全部阶段
+
+        返回:
+            阶段名称 -> StageResult
+        """
+        pending = list(self.stages)
+        running: Dict[Future, Tuple[Stage, float]] = {}
+        processes: Optional[ProcessPoolExecutor] = None
+        busy: set = set()  # 正在运行的互斥组
+        origin = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as threads:
+            try:
+                while pending or running:
+                    for stage in list(pending):
+                        state = self._readiness(stage)
+                        if state == "blocked":
+                            pending.remove(stage)
+                            self.results[stage.name] = StageResult(stage.name, "skipped")
+                            logger.warning(f"上游失败，跳过阶段 {stage.name}")
+                        elif (
+                            state == "ready"
+                            and len(running) < self.max_workers
+                            and stage.exclusive not in busy
+                        ):
+                            pending.remove(stage)
+                            if stage.exclusive:
+                                busy.add(stage.exclusive)
+                            started = time.perf_counter()
+                            if stage.executor == "process":
+                                if processes is None:
+                                    processes = ProcessPoolExecutor(
+                                        max_workers=self.max_workers,
+                                        mp_context=multiprocessing.get_context("spawn"),
+                                    )
+                                future = processes.submit(stage.func)
+                            else:
+                                future = threads.submit(stage.func)
+                            running[future] = (stage, started)
+
+                    if not running:
+                        # 剩余阶段都被跳过，下一轮循环会清空 pending
+                        continue
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stage, started = running.pop(future)
+                        busy.discard(stage.exclusive)
+                        self._finish(stage, future, started, origin)
+            finally:
+                if processes is not None:
+                    processes.shutdown()
+
+        return self.results
+
+    def _finish(self, stage: Stage, future: Future, started: float, origin: float):
+        duration = time.perf_counter() - started
+        error = future.exception()
+        if error is None and stage.on_result is not None:
+            try:
+                stage.on_result(future.result())
+            except Exception as e:
+                error = e
+
+        if error is None:
+            self._produced.update(stage.outputs)
+            status = "completed"
+        else:
+            logger.error(f"阶段 {stage.name} 失败: {error}")
+            status = "failed"
+        self.results[stage.name] = StageResult(
+            name=stage.name,
+            status=status,
+            duration=duration,
+            error=error,
+            started_at=started - origin,
+        )
+
+    @property
+    def failed(self) -> List[StageResult]:
+        return [r for r in self.results.values() if r.status == "failed"]
@@ -0,0 +1,139 @@
+"""
+源码加载模块
+按字节读取 Python 源文件（大文件使用 mmap），遵循 PEP 263 编码声明和 BOM，
+并记录被跳过的文件及原因
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Union
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+import ast
+import io
+import logging
+import mmap
+import tokenize
+
+logger = logging.getLogger(__name__)
+
+Buffer = Union[bytes, mmap.mmap]
+
+
+@dataclass
+class SkippedFile:
+    """被跳过的文件记录"""
+
+    path: str  # 文件路径
+    reason: str  # 跳过原因
+
+
+class SourceLoader:
+    """
+    源码加载器
+    小文件直接读取字节，超过阈值的文件通过 mmap 映射，避免额外的内存拷贝
+    """
+
+    def __init__(self, mmap_threshold: int = 1 << 20):
+        """
+        初始化加载器
+
+        参数:
+            mmap_threshold: 使用 mmap 的文件大小阈值（字节），默认 1 MiB
+        """
+        self.mmap_threshold = mmap_threshold
+        self.skipped: List[SkippedFile] = []
+
+    @contextmanager
+    def open_bytes(self, file_path: Path) -> Iterator[Buffer]:
+        """
+        以字节形式打开源文件，离开上下文时释放映射
+
+        参数:
+            file_path: 文件路径
+
+        返回:
+            bytes 或 mmap 对象（两者都支持 find/切片/缓冲区协议）
+        """
+        with open(file_path, "rb") as f:
+            size = f.seek(0, io.SEEK_END)
+            f.seek(0)
+            if size < self.mmap_threshold or size == 0:
+                yield f.read()
+                return
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                yield mapped
+            finally:
+                mapped.close()
+
+    @staticmethod
+    def detect_encoding(data: Buffer) -> str:
+        """
+        按 PEP 263 检测源码编码（只读取前两行）
+
+        参数:
+            data: 源码字节
+
+        返回:
+            编码名称，带 BOM 的 UTF-8 返回 "utf-8-sig"
+        """
+        end = 0
+        for _ in range(2):
+            newline = data.find(b"\n", end)
+            if newline == -1:
+                end = len(data)
+                break
+            end = newline + 1
+        head = io.BytesIO(bytes(data[:end]))
+        encoding, _ = tokenize.detect_encoding(head.readline)
+        return encoding
+
+    def read_text(self, file_path: Path) -> Optional[str]:
+        """
+        读取并按声明的编码解码源文件
+
+        参数:
+            file_path: 文件路径
+
+        返回:
+            源码文本，失败时返回 None 并记录跳过原因
+        """
+        try:
+            with self.open_bytes(file_path) as data:
+                return str(data, self.detect_encoding(data))
+        except (OSError, SyntaxError, ValueError) as e:
+            self.skip(file_path, e)
+            return None
+
+    def parse_ast(self, file_path: Path) -> Optional[ast.AST]:
+        """
+        将源文件字节直接交给 ast.parse（由解析器处理编码声明）
+
+        参数:
+            file_path: 文件路径
+
+        返回:
+            AST 根节点，失败时返回 None 并记录跳过原因
+        """
+        try:
+            with self.open_bytes(file_path) as data:
+                return ast.parse(data, filename=str(file_path))
+        except (OSError, SyntaxError, ValueError, RecursionError, MemoryError) as e:
+            self.skip(file_path, e)
+            return None
+
+    def skip(self, file_path: Path, reason: Union[str, BaseException]):
+        """记录被跳过的文件"""
+        if isinstance(reason, BaseException):
+            reason = f"{type(reason).__name__}: {reason}"
+        logger.debug(f"跳过 {file_path}: {reason}")
+        self.skipped.append(SkippedFile(path=str(file_path), reason=reason))
+
+    def report(self) -> List[Dict[str, Any]]:
+        """
+        获取跳过文件报告
+
+        返回:
+            包含 path 和 reason 的字典列表
+        """
+        return [{"path": s.path, "reason": s.reason} for s in self.skipped]
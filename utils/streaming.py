@@ -0,0 +1,123 @@
+"""
+流式导出模块
+逐行写出 CSV / JSON Lines，分析过程中即可被下游读取，内存占用与数据规模无关
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+from abc import ABC, abstractmethod
+from pathlib import Path
+import csv
+import json
+
+
+class StreamingWriter(ABC):
+    """
+    流式写入器基类
+    作为上下文管理器使用；每写入 flush_every 行或调用 flush() 时刷新到磁盘；子类实现 _write
+    """
+
+    def __init__(self, output_path: str, flush_every: int = 1000):
+        """
+        初始化写入器
+
+        参数:
+            output_path: 输出文件路径
+            flush_every: 自动刷新的行数间隔
+        """
+        self.output_path = Path(output_path)
+        self.flush_every = flush_every
+        self.rows_written = 0
+        self._file = None
+
+    def __enter__(self) -> "StreamingWriter":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def open(self):
+        if self._file is None:
+            self._file = open(self.output_path, "w", newline="", encoding="utf-8")
+            self._write_header()
+        return self
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def write_row(self, row: Dict[str, Any]):
+        """写入一行"""
+        self._write(row)
+        self.rows_written += 1
+        if self.rows_written % self.flush_every == 0:
+            self.flush()
+
+    def write_rows(self, rows: Iterable[Dict[str, Any]]):
+        """写入多行"""
+        for row in rows:
+            self.write_row(row)
+
+    def _write_header(self):
+        pass
+
+    @abstractmethod
+    def _write(self, row: Dict[str, Any]):
+        """把一行写入已打开的文件"""
+
+
+class CSVStreamWriter(StreamingWriter):
+    """CSV 流式写入器"""
+
+    def __init__(self, output_path: str, fieldnames: List[str], flush_every: int = 1000):
+        super().__init__(output_path, flush_every)
+        self.fieldnames = fieldnames
+        self._writer = None
+
+    def _write_header(self):
+        self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames)
+        self._writer.writeheader()
+
+    def _write(self, row: Dict[str, Any]):
+        self._writer.writerow(row)
+
+
+class JSONLStreamWriter(StreamingWriter):
+    """JSON Lines 流式写入器，每行一个 JSON 对象"""
+
+    def _write(self, row: Dict[str, Any]):
+        self._file.write(json.dumps(row, ensure_ascii=False, default=str))
+        self._file.write("\n")
+
+
+def open_stream_writer(
+    output_path: str,
+    fieldnames: Optional[List[str]] = None,
+    fmt: Optional[str] = None,
+    flush_every: int = 1000,
+) -> StreamingWriter:
+    """
+    按格式（或文件扩展名）创建并打开流式写入器
+
+    参数:
+        output_path: 输出文件路径
+        fieldnames: CSV 列名（CSV 格式必填）
+        fmt: "csv" 或 "jsonl"，默认按扩展名推断
+        flush_every: 自动刷新的行数间隔
+
+    返回:
+        已打开的写入器
+    """
+    fmt = fmt or Path(output_path).suffix.lstrip(".").lower()
+    if fmt == "csv":
+        if not fieldnames:
+            raise ValueError("CSV 流式导出需要指定列名")
+        return CSVStreamWriter(output_path, fieldnames, flush_every).open()
+    if fmt in ("jsonl", "ndjson"):
+        return JSONLStreamWriter(output_path, flush_every).open()
+    raise ValueError(f"不支持的流式导出格式: {fmt}")
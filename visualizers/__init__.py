@@ -1,32 +1,39 @@
 """
 可视化模块
 提供各种图表生成功能
+
+图表类在首次访问时才导入（PEP 562），matplotlib / seaborn / pandas
+只在真正生成图表的阶段加载
 """
 
-from .base_charts import BaseChart
-from .author_charts import AuthorCharts
-from .trends import TrendsChart
-from .heatmap import TimeHeatmap
-from .complexity_charts import HighComplexityChart
-from .file_charts import FileHeatmap
-from .churn_charts import CodeChurnChart
-from .yearly_charts import YearlyChart
-from .issues_charts import IssuesChart
-from .contributor_charts import ContributorRadarChart
-from .pr_charts import PRCharts
-from .creative_charts import CreativeCharts
-
-__all__ = [
-    "BaseChart",
-    "AuthorCharts",
-    "TrendsChart",
-    "TimeHeatmap",
-    "HighComplexityChart",
-    "FileHeatmap",
-    "CodeChurnChart",
-    "YearlyChart",
-    "IssuesChart",
-    "ContributorRadarChart",
-    "PRCharts",
-    "CreativeCharts",
-]
+import importlib
+
+_EXPORTS = {
+    "BaseChart": ".base_charts",
+    "AuthorCharts": ".author_charts",
+    "TrendsChart": ".trends",
+    "TimeHeatmap": ".heatmap",
+    "HighComplexityChart": ".complexity_charts",
+    "FileHeatmap": ".file_charts",
+    "CodeChurnChart": ".churn_charts",
+    "YearlyChart": ".yearly_charts",
+    "IssuesChart": ".issues_charts",
+    "ContributorRadarChart": ".contributor_charts",
+    "PRCharts": ".pr_charts",
+    "CreativeCharts": ".creative_charts",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -23,12 +23,29 @@ class VisualizationGenerator:
         self.data_dir = Path(data_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.count = 0
+        self._file_lists: Dict[tuple, List[Path]] = {}
+
+    def _repo_files(self, repo_path, pattern: str = "*.py") -> List[Path]:
+        """仓库文件列表（剪枝忽略目录、遵循 .gitignore），同一生成器内按模式复用"""
+        from utils.discovery import FileDiscovery
+
+        key = (str(repo_path), pattern)
+        if key not in self._file_lists:
+            self._file_lists[key] = FileDiscovery(Path(repo_path), include=(pattern,)).files()
+        return self._file_lists[key]
 
     def generate_all(self, commits, commits_data: List[Dict], complexity_data: List[Dict],
                      repo_path: Path, contributors: List[Dict] = None,
                      ast_results: Dict = None, type_coverage: Any = None,
                      z3_results: List[Dict] = None, trace_results: Dict = None) -> int:
         self.count = 0
+        self.generate_commit_charts(commits, commits_data, repo_path)
+        self.generate_analysis_charts(complexity_data, repo_path, contributors)
+        return self.count
+
+    def generate_commit_charts(self, commits, commits_data: List[Dict], repo_path: Path) -> int:
+        """只依赖提交数据的图表 (1-15)，提交采集完成后即可生成"""
+        start = self.count
 
         # 基础图表 (1-10)
         self._gen(self._author_bar, commits_data, "01_author_bar.png")
@@ -49,8 +66,15 @@ class VisualizationGenerator:
         self._gen(self._commit_length, commits, "14_commit_length.png")
         self._gen(self._file_scatter, repo_path, "15_file_scatter.png")
 
+        return self.count - start
+
+    def generate_analysis_charts(self, complexity_data: List[Dict], repo_path: Path,
+                                 contributors: List[Dict] = None) -> int:
+        """依赖 AST、Contributors 和 Z3 结果的图表 (16-23)"""
+        start = self.count
+
         # 复杂度图表 (16-17)
-        if complexity_data:
+        if complexity_data is not None and len(complexity_data):
             self._gen(self._complexity_hist, complexity_data, "16_complexity_hist.png")
             self._gen(self._complexity_top10, complexity_data, "17_complexity_top10.png")
 
@@ -67,7 +91,7 @@ class VisualizationGenerator:
         self._gen(self._z3_constraint_bar, None, "22_z3_constraints.png")
         self._gen(self._z3_type_compat, None, "23_z3_type_compat.png")
 
-        return self.count
+        return self.count - start
 
     def _gen(self, func, data, filename: str):
         try:
@@ -285,10 +309,9 @@ class VisualizationGenerator:
     def _file_type_bar(self, repo_path, filename):
         """改用条形图"""
         types = Counter()
-        for f in repo_path.rglob("*"):
-            if f.is_file() and ".git" not in str(f):
-                ext = f.suffix or "(无扩展名)"
-                types[ext] += 1
+        for f in self._repo_files(repo_path, "*"):
+            ext = f.suffix or "(无扩展名)"
+            types[ext] += 1
         top = dict(types.most_common(12))
 
         fig, ax = plt.subplots(figsize=(12, 6))
@@ -417,13 +440,12 @@ class VisualizationGenerator:
 
     def _file_scatter(self, repo_path, filename):
         files = []
-        for f in repo_path.rglob("*.py"):
-            if ".git" not in str(f) and f.is_file():
-                try:
-                    lines = len(f.read_text(encoding='utf-8', errors='ignore').splitlines())
-                    files.append({"lines": lines, "size": f.stat().st_size})
-                except:
-                    pass
+        for f in self._repo_files(repo_path):
+            try:
+                lines = len(f.read_text(encoding='utf-8', errors='ignore').splitlines())
+                files.append({"lines": lines, "size": f.stat().st_size})
+            except:
+                pass
 
         if not files:
             raise ValueError("No Python files")
@@ -442,8 +464,13 @@ class VisualizationGenerator:
         plt.close()
 
     def _complexity_hist(self, complexity_data, filename):
-        complexities = [f.get("complexity", 0) for f in complexity_data if f.get("complexity")]
-        if not complexities:
+        if hasattr(complexity_data, "function_complexities"):
+            # ASTResultTable：直接使用 NumPy 列
+            complexities = complexity_data.function_complexities()
+            complexities = complexities[complexities > 0]
+        else:
+            complexities = [f.get("complexity", 0) for f in complexity_data if f.get("complexity")]
+        if not len(complexities):
             raise ValueError("No complexity data")
 
         fig, ax = plt.subplots(figsize=(10, 6))
@@ -458,7 +485,10 @@ class VisualizationGenerator:
         plt.close()
 
     def _complexity_top10(self, complexity_data, filename):
-        sorted_funcs = sorted([f for f in complexity_data if f.get("complexity")], key=lambda x: x["complexity"], reverse=True)[:10]
+        if hasattr(complexity_data, "top_k"):
+            sorted_funcs = [f for f in complexity_data.top_k(10) if f["complexity"]]
+        else:
+            sorted_funcs = sorted([f for f in complexity_data if f.get("complexity")], key=lambda x: x["complexity"], reverse=True)[:10]
         if not sorted_funcs:
             raise ValueError("No complexity data")
 
@@ -509,19 +539,18 @@ class VisualizationGenerator:
         """AST分析：装饰器使用统计"""
         import ast
         decorators = Counter()
-        for f in repo_path.rglob("*.py"):
-            if ".git" not in str(f):
-                try:
-                    tree = ast.parse(f.read_text(encoding='utf-8', errors='ignore'))
-                    for node in ast.walk(tree):
-                        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                            for d in node.decorator_list:
-                                if isinstance(d, ast.Name):
-                                    decorators[d.id] += 1
-                                elif isinstance(d, ast.Attribute):
-                                    decorators[d.attr] += 1
-                except:
-                    pass
+        for f in self._repo_files(repo_path):
+            try:
+                tree = ast.parse(f.read_text(encoding='utf-8', errors='ignore'))
+                for node in ast.walk(tree):
+                    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                        for d in node.decorator_list:
+                            if isinstance(d, ast.Name):
+                                decorators[d.id] += 1
+                            elif isinstance(d, ast.Attribute):
+                                decorators[d.attr] += 1
+            except:
+                pass
 
         if not decorators:
             decorators["(无装饰器)"] = 1
@@ -541,19 +570,18 @@ class VisualizationGenerator:
         """AST分析：导入模块统计"""
         import ast
         imports = Counter()
-        for f in repo_path.rglob("*.py"):
-            if ".git" not in str(f):
-                try:
-                    tree = ast.parse(f.read_text(encoding='utf-8', errors='ignore'))
-                    for node in ast.walk(tree):
-                        if isinstance(node, ast.Import):
-                            for alias in node.names:
-                                imports[alias.name.split('.')[0]] += 1
-                        elif isinstance(node, ast.ImportFrom):
-                            if node.module:
-                                imports[node.module.split('.')[0]] += 1
-                except:
-                    pass
+        for f in self._repo_files(repo_path):
+            try:
+                tree = ast.parse(f.read_text(encoding='utf-8', errors='ignore'))
+                for node in ast.walk(tree):
+                    if isinstance(node, ast.Import):
+                        for alias in node.names:
+                            imports[alias.name.split('.')[0]] += 1
+                    elif isinstance(node, ast.ImportFrom):
+                        if node.module:
+                            imports[node.module.split('.')[0]] += 1
+            except:
+                pass
 
         top = dict(imports.most_common(15))
         fig, ax = plt.subplots(figsize=(12, 6))